@@ -0,0 +1,90 @@
+# gunicorn.conf.py - picked up automatically by gunicorn when run from back/
+"""
+Server settings come from the environment (PORT, WEB_CONCURRENCY,
+GUNICORN_*), so Procfile, start.sh and the Dockerfile just run `gunicorn`.
+The defaults here (3 workers, 120s timeout) are those start.sh and the
+Dockerfile always used; the Railway start command (nixpacks.toml) keeps its
+1 worker and 45s timeout, and the Procfile its single worker, by setting
+WEB_CONCURRENCY / GUNICORN_TIMEOUT unless they are already set. Each extra
+worker costs a full copy of its writable state (L1 cache, render pool), so
+raise WEB_CONCURRENCY only where the memory allows it.
+SERVER_INTERFACE=asgi serves hammer_backendproject.asgi with uvicorn
+workers, so the async AI summary / download views don't hold a worker
+while they wait on OpenAI or S3; the default is WSGI with sync workers.
+
+Preload and warm: with preload_app the master imports Django once and runs
+hammer_backendapi.warmup.warm_up() (template bases, layout registry,
+summary styles, openai, lookup options) before forking, so workers start
+warm and share those pages copy-on-write. post_fork drops DB connections
+and the OpenAI client inherited from the master. Without preload each
+worker warms itself before accepting requests. Either way each worker
+starts its own PDF render pool (PDF_RENDER_WORKERS) in post_worker_init.
+
+Prometheus multiprocess setup: every worker writes its metric samples to
+PROMETHEUS_MULTIPROC_DIR so /metrics can aggregate across workers. The
+directory is cleared on startup and a dead worker's live files are cleaned up.
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "hammer_prometheus")
+)
+# Must exist before the preloaded app imports prometheus_client
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+if os.environ.get("SERVER_INTERFACE", "wsgi").lower() == "asgi":
+    wsgi_app = "hammer_backendproject.asgi:application"
+    worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+else:
+    wsgi_app = "hammer_backendproject.wsgi:application"
+    worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "3"))
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "2"))
+# Recycle workers now and then; the jitter keeps them from restarting together
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+
+def on_starting(server):
+    # Drop samples from previous runs; keep the files the preloaded master just opened
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    own = f"_{os.getpid()}.db"
+    for name in os.listdir(path):
+        if not name.endswith(own):
+            os.remove(os.path.join(path, name))
+
+
+def when_ready(server):
+    # Master, after the app is loaded: warm once so the workers inherit it
+    if server.cfg.preload_app:
+        from hammer_backendapi.warmup import warm_up
+        warm_up()
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from hammer_backendapi.warmup import reset_after_fork
+        reset_after_fork()
+
+
+def post_worker_init(worker):
+    # warm_up() is a no-op when the master already warmed up before forking;
+    # the render pool is per worker either way
+    from hammer_backendapi.warmup import warm_up, warm_worker
+    warm_up()
+    warm_worker()
+
+
+def child_exit(server, worker):
+    try:
+        from hammer_backendapi.metrics import mark_process_dead
+    except ImportError:
+        return
+    mark_process_dead(worker.pid)
@@ -1,10 +1,14 @@
+from django.conf import settings
 from django.contrib import admin, messages
+from django.contrib.admin.utils import get_last_value_from_parameters
 from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Count, QuerySet
+from django.utils.functional import cached_property
 from django.utils.crypto import get_random_string
 from django.utils.html import format_html
 from rest_framework.authtoken.models import Token
-import boto3
-from django.conf import settings
 from .models import (
     Teacher,
     Student,
@@ -17,22 +21,134 @@ from .models import (
     OshaType,
     FundingSource,
     State,
-    Region
+    Region,
+    IssuedCertificate,
 )
+from .views.exports import export_response
 
 # Customize Admin Site Headers
 admin.site.site_header = "If I Had A Hammer - Admin Portal"
 admin.site.site_title = "Hammer Admin"
 admin.site.index_title = "Welcome to If I Had A Hammer Administration"
 
+class AnnotatedCountsMixin:
+    """
+    Annotate related-row counts onto the changelist queryset, so a page is one
+    grouped query instead of a COUNT per row, and the count columns sort.
+    ``count_annotations`` maps annotation name -> reverse relation.
+    """
+    count_annotations = {}
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        return queryset.annotate(**{name: Count(relation) for name, relation in self.count_annotations.items()})
+
+
+class SearchableRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """
+    Related-object sidebar filter for large tables. The stock filter lists
+    every teacher/organization; this one lists only the current selection
+    plus up to ``limit`` matches for its search box, found with the related
+    admin's search_fields.
+    """
+    template = "admin/searchable_related_filter.html"
+    limit = 15
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        # No "__" in the name: ModelAdmin.lookup_allowed vets such params as field lookups
+        self.search_kwarg = f"{field_path.replace('__', '_')}_q"
+        self.search_term = (get_last_value_from_parameters(params, self.search_kwarg) or "").strip()
+        # Everything else in the query string rides along when the search box is submitted
+        self.hidden_params = [
+            (name, value)
+            for name, values in request.GET.lists()
+            if name not in (self.search_kwarg, "p")
+            for value in values
+        ]
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def expected_parameters(self):
+        return super().expected_parameters() + [self.search_kwarg]
+
+    def has_output(self):
+        return True  # the search box is shown even before there is anything to list
+
+    def queryset(self, request, queryset):
+        self.used_parameters.pop(self.search_kwarg, None)  # UI state, not a lookup
+        return super().queryset(request, queryset)
+
+    def field_choices(self, field, request, model_admin):
+        related_model = field.remote_field.model
+        objects = related_model._default_manager.all()
+        choices = list(objects.filter(pk__in=self.lookup_val or []))
+        if self.search_term:
+            related_admin = model_admin.admin_site.get_model_admin(related_model)
+            matches, _ = related_admin.get_search_results(request, objects, self.search_term)
+            ordering = self.field_admin_ordering(field, request, model_admin)
+            for obj in matches.order_by(*ordering)[:self.limit]:
+                if obj not in choices:
+                    choices.append(obj)
+        return [(obj.pk, str(obj)) for obj in choices]
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Changelist paginator for big tables. With show_full_result_count = False
+    the filtered COUNT(*) is the only count left; it is cached for
+    ADMIN_COUNT_CACHE_TTL seconds per query, and an unfiltered PostgreSQL
+    table larger than ADMIN_ESTIMATED_COUNT_ABOVE rows uses the planner's
+    row estimate (pg_class.reltuples) instead of a full scan.
+    """
+
+    def _estimated_count(self, queryset):
+        threshold = getattr(settings, "ADMIN_ESTIMATED_COUNT_ABOVE", 0)
+        connection = connections[queryset.db]
+        if not threshold or queryset.query.where or connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                           [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        if row is None or row[0] < threshold:
+            return None
+        return row[0]
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+
+        estimate = self._estimated_count(queryset)
+        if estimate is not None:
+            return estimate
+
+        from hammer_backendapi.cache import get_or_compute
+        from hammer_backendapi.singleflight import fingerprint
+        sql, params = queryset.query.sql_with_params()
+        return get_or_compute(
+            f"admin_count:{fingerprint(queryset.db, sql, params)}",
+            queryset.count,
+            getattr(settings, "ADMIN_COUNT_CACHE_TTL", 60),
+        )
+
+
+class LargeTableAdminMixin:
+    """Changelist settings for the teacher/student/file tables that grow without bound."""
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+
+
 # -------------------------
 # Teacher Admin
 # -------------------------
 @admin.register(Teacher)
-class TeacherAdmin(admin.ModelAdmin):
+class TeacherAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('full_name', 'email', 'state', 'region', 'organization', 'created_at')
     search_fields = ('full_name', 'email', 'state__name', 'region__name', 'organization__name')
-    list_filter = ('state', 'region', 'organization', 'created_at')
+    list_filter = ('state', 'region', ('organization', SearchableRelatedFieldListFilter), 'created_at')
+    list_select_related = ('state', 'region', 'organization')
+    autocomplete_fields = ('state', 'region', 'organization')
     exclude = ('user',)
     readonly_fields = ('created_at',)
     ordering = ('-created_at',)
@@ -74,19 +190,21 @@ class TeacherAdmin(admin.ModelAdmin):
 # Student Admin
 # -------------------------
 @admin.register(Student)
-class StudentAdmin(admin.ModelAdmin):
+class StudentAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('full_name', 'teacher', 'teacher_organization', 'email', 'nccer_number', 'gender_identity', 
                    'funding_source', 'start_date', 'end_date', 'complete_50_hour_training', 
                    'passed_osha_10_exam', 'osha_completion_date', 'osha_type', 
                    'hammer_math', 'employability_skills', 'job_interview_skills', 'created_at')
     search_fields = ('full_name', 'teacher__full_name', 'teacher__email', 'email', 'nccer_number')
-    list_filter = ('teacher__organization', 'teacher__state', 'teacher__region', 'teacher', 'gender_identity', 'funding_source', 'osha_type', 'complete_50_hour_training', 
+    list_filter = (('teacher__organization', SearchableRelatedFieldListFilter), 'teacher__state', 'teacher__region',
+                  ('teacher', SearchableRelatedFieldListFilter), 'gender_identity', 'funding_source', 'osha_type', 'complete_50_hour_training', 
                   'passed_osha_10_exam', 'hammer_math', 'employability_skills', 'job_interview_skills', 
                   'start_date', 'end_date', 'created_at')
     autocomplete_fields = ('teacher', 'gender_identity', 'disc_assessment_type',
                            'sixteen_types_assessment', 'enneagram_result', 'osha_type', 'funding_source')
     readonly_fields = ('created_at',)
     ordering = ('-created_at',)
+    actions = ('export_selected_csv', 'export_selected_xlsx')
     
     fieldsets = (
         ('Student Information', {
@@ -127,6 +245,14 @@ class StudentAdmin(admin.ModelAdmin):
         return "No organization"
     teacher_organization.short_description = "Organization"
     teacher_organization.admin_order_field = 'teacher__organization__name'
+
+    def export_selected_csv(self, request, queryset):
+        return export_response(request, queryset, "csv")
+    export_selected_csv.short_description = "Export selected students (CSV)"
+
+    def export_selected_xlsx(self, request, queryset):
+        return export_response(request, queryset, "xlsx")
+    export_selected_xlsx.short_description = "Export selected students (Excel)"
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related(
@@ -140,114 +266,134 @@ class StudentAdmin(admin.ModelAdmin):
 # Organization Admin
 # -------------------------
 @admin.register(Organization)
-class OrganizationAdmin(admin.ModelAdmin):
+class OrganizationAdmin(AnnotatedCountsMixin, admin.ModelAdmin):
+    count_annotations = {"teacher_total": "teacher"}
     list_display = ('name', 'teacher_count')
     search_fields = ('name',)
     ordering = ('name',)
     
     def teacher_count(self, obj):
-        return obj.teacher_set.count()
+        return obj.teacher_total
     teacher_count.short_description = "Number of Teachers"
+    teacher_count.admin_order_field = "teacher_total"
 
 
 # -------------------------
 # Assessment Type Models (Lookup Tables)
 # -------------------------
 @admin.register(GenderIdentity)
-class GenderIdentityAdmin(admin.ModelAdmin):
+class GenderIdentityAdmin(AnnotatedCountsMixin, admin.ModelAdmin):
+    count_annotations = {"student_total": "student"}
     list_display = ('gender', 'student_count')
     search_fields = ('gender',)
     ordering = ('gender',)
     
     def student_count(self, obj):
-        return obj.student_set.count()
+        return obj.student_total
     student_count.short_description = "Students"
+    student_count.admin_order_field = "student_total"
 
 
 @admin.register(DiscAssessment)
-class DiscAssessmentAdmin(admin.ModelAdmin):
+class DiscAssessmentAdmin(AnnotatedCountsMixin, admin.ModelAdmin):
+    count_annotations = {"student_total": "student"}
     list_display = ('type_name', 'student_count')
     search_fields = ('type_name',)
     ordering = ('type_name',)
     
     def student_count(self, obj):
-        return obj.student_set.count()
+        return obj.student_total
     student_count.short_description = "Students"
+    student_count.admin_order_field = "student_total"
 
 
 @admin.register(SixteenTypeAssessment)
-class SixteenTypeAssessmentAdmin(admin.ModelAdmin):
+class SixteenTypeAssessmentAdmin(AnnotatedCountsMixin, admin.ModelAdmin):
+    count_annotations = {"student_total": "student"}
     list_display = ('type_name', 'student_count')
     search_fields = ('type_name',)
     ordering = ('type_name',)
     
     def student_count(self, obj):
-        return obj.student_set.count()
+        return obj.student_total
     student_count.short_description = "Students"
+    student_count.admin_order_field = "student_total"
 
 
 @admin.register(EnneagramResult)
-class EnneagramResultAdmin(admin.ModelAdmin):
+class EnneagramResultAdmin(AnnotatedCountsMixin, admin.ModelAdmin):
+    count_annotations = {"student_total": "student"}
     list_display = ('result_name', 'student_count')
     search_fields = ('result_name',)
     ordering = ('result_name',)
     
     def student_count(self, obj):
-        return obj.student_set.count()
+        return obj.student_total
     student_count.short_description = "Students"
+    student_count.admin_order_field = "student_total"
 
 
 @admin.register(OshaType)
-class OshaTypeAdmin(admin.ModelAdmin):
+class OshaTypeAdmin(AnnotatedCountsMixin, admin.ModelAdmin):
+    count_annotations = {"student_total": "student"}
     list_display = ('name', 'student_count')
     search_fields = ('name',)
     ordering = ('name',)
     
     def student_count(self, obj):
-        return obj.student_set.count()
+        return obj.student_total
     student_count.short_description = "Students"
+    student_count.admin_order_field = "student_total"
 
 
 @admin.register(FundingSource)
-class FundingSourceAdmin(admin.ModelAdmin):
+class FundingSourceAdmin(AnnotatedCountsMixin, admin.ModelAdmin):
+    count_annotations = {"student_total": "student"}
     list_display = ('name', 'description', 'student_count')
     search_fields = ('name', 'description')
     ordering = ('name',)
     
     def student_count(self, obj):
-        return obj.student_set.count()
+        return obj.student_total
     student_count.short_description = "Students"
+    student_count.admin_order_field = "student_total"
 
 
 @admin.register(State)
-class StateAdmin(admin.ModelAdmin):
+class StateAdmin(AnnotatedCountsMixin, admin.ModelAdmin):
+    count_annotations = {"teacher_total": "teacher"}
     list_display = ('name', 'abbreviation', 'teacher_count')
     search_fields = ('name', 'abbreviation')
     ordering = ('name',)
     
     def teacher_count(self, obj):
-        return obj.teacher_set.count()
+        return obj.teacher_total
     teacher_count.short_description = "Teachers"
+    teacher_count.admin_order_field = "teacher_total"
 
 
 @admin.register(Region)
-class RegionAdmin(admin.ModelAdmin):
+class RegionAdmin(AnnotatedCountsMixin, admin.ModelAdmin):
+    count_annotations = {"teacher_total": "teacher"}
     list_display = ('name', 'teacher_count')
     search_fields = ('name',)
     ordering = ('name',)
     
     def teacher_count(self, obj):
-        return obj.teacher_set.count()
+        return obj.teacher_total
     teacher_count.short_description = "Teachers"
+    teacher_count.admin_order_field = "teacher_total"
 
 
 # -------------------------
 # Student File Admin
 # -------------------------
 @admin.register(StudentFile)
-class StudentFileAdmin(admin.ModelAdmin):
+class StudentFileAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ('original_name', 'student_name', 'content_type', 'file_size_display', 'uploaded_at', 'view_file_link', 'download_file_link')
-    list_filter = ('content_type', 'uploaded_at', 'student__teacher__organization')
+    list_filter = ('content_type', 'uploaded_at', ('student__teacher__organization', SearchableRelatedFieldListFilter))
+    list_select_related = ('student',)
+    autocomplete_fields = ('student', 'uploaded_by')
     search_fields = ('original_name', 'student__full_name', 'student__email')
     readonly_fields = ('uploaded_at', 'file_size_display', 'file_extension', 'size_bytes', 'file_preview')
     ordering = ('-uploaded_at',)
@@ -299,26 +445,12 @@ class StudentFileAdmin(admin.ModelAdmin):
             return None
         
         try:
-            s3_client = boto3.client(
-                's3',
-                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_S3_REGION_NAME
-            )
-            
-            params = {
-                'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
-                'Key': obj.file.name
-            }
-            
+            from hammer_backendapi.views.utils.s3 import presigned_get_url
+            params = {}
             if as_attachment:
                 params['ResponseContentDisposition'] = f'attachment; filename="{obj.original_name}"'
             
-            signed_url = s3_client.generate_presigned_url(
-                'get_object',
-                Params=params,
-                ExpiresIn=3600  # 1 hour
-            )
+            signed_url = presigned_get_url(obj.file.name, expires_in=3600, **params)  # 1 hour
             
             return signed_url
             
@@ -417,4 +549,36 @@ class StudentFileAdmin(admin.ModelAdmin):
         return format_html('{}<hr>{}<hr>{}', file_info, preview, buttons)
     
     file_preview.short_description = "File Preview & Actions"
-    
\ No newline at end of file
+    
+
+
+# -------------------------
+# Issued Certificate Admin (audit trail, read-only)
+# -------------------------
+@admin.register(IssuedCertificate)
+class IssuedCertificateAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('kind', 'student_name', 'template_version', 'issued_at', 'issued_by', 'download_link')
+    list_filter = ('kind', 'template_version', 'issued_at')
+    list_select_related = ('student', 'issued_by')
+    search_fields = ('student__full_name', 'student__email', 'sha256')
+    ordering = ('-issued_at',)
+    readonly_fields = ('student', 'kind', 'template_version', 'fields', 'fingerprint', 'storage_key',
+                       'sha256', 'size_bytes', 'issued_at', 'issued_by', 'download_link')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def student_name(self, obj):
+        return obj.student.full_name if obj.student else obj.fields.get('full_name', '-')
+    student_name.short_description = "Student"
+    student_name.admin_order_field = 'student__full_name'
+
+    def download_link(self, obj):
+        from hammer_backendapi import issuance
+        from django.core.files.storage import default_storage
+        url = issuance.presigned_url(obj) or default_storage.url(obj.storage_key)
+        return format_html('<a href="{}">📥 Download</a>', url)
+    download_link.short_description = "Download"
@@ -0,0 +1,403 @@
+# hammer_backendapi/analytics.py
+"""
+Outcome analytics
+-----------------
+Completion rates, certificate eligibility and pretest/posttest improvement
+per organization, region, state and funding source, by cohort year, precomputed into OutcomeSummary
+rows so the dashboard reads a few hundred small rows instead of
+aggregating Student joined to Teacher on every request.
+
+Buckets are refreshed incrementally:
+
+- Writes only mark buckets stale: saving or deleting a student marks the
+  buckets it was in and is now in; moving a teacher to another
+  organization/region/state marks the old and new buckets of their
+  students. Bulk paths call mark_students_stale() themselves. A student
+  save costs one query for the stored row (none on create), and the
+  buckets are marked with one upsert when the transaction commits, however
+  many students it saved.
+- Reads refresh first: outcome_summaries() recomputes the stale buckets
+  of the requested dimension - usually a handful - then returns rows.
+- `python manage.py refresh_outcome_analytics` refreshes everything that
+  is stale (run it periodically), and --full rebuilds every bucket, which
+  also picks up changes no signal reports (lookup rows deleted via
+  SET_NULL, raw SQL).
+
+Distributions (mean, stdev, quartiles, histograms) are computed in Python
+per bucket with the statistics module from one values_list() query per
+dimension. Only finished_count depends on the date: buckets store how many
+students end on each date, and the count up to today is summed when read,
+so it is right on any day without a refresh.
+"""
+
+import datetime
+import statistics
+import threading
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F, IntegerField, Q, Value
+from django.db.models.functions import Coalesce, ExtractYear
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from hammer_backendapi import eligibility
+from hammer_backendapi.models import (
+    FundingSource,
+    Organization,
+    OutcomeSummary,
+    Region,
+    State,
+    Student,
+    Teacher,
+)
+
+UNASSIGNED = 0
+# dimension -> Student lookup for the bucket key (None: one bucket for everyone)
+DIMENSIONS = {
+    "all": None,
+    "organization": "teacher__organization_id",
+    "region": "teacher__region_id",
+    "state": "teacher__state_id",
+    "funding_source": "funding_source_id",
+}
+LABELS = {
+    "organization": (Organization, "name"),
+    "region": (Region, "name"),
+    "state": (State, "name"),
+    "funding_source": (FundingSource, "name"),
+}
+TEACHER_DIMENSIONS = {"organization": "organization_id", "region": "region_id", "state": "state_id"}
+
+COMPLETION_COUNTS = {
+    "completed_50_hour_count": "complete_50_hour_training",
+    "passed_osha_count": "passed_osha_10_exam",
+    "hammer_math_count": "hammer_math",
+    "employability_count": "employability_skills",
+    "job_interview_count": "job_interview_skills",
+    "ruler_count": "passed_ruler_assessment",
+}
+# Students eligible for each certificate kind, from the certificate_eligibility bits
+ELIGIBLE_COUNTS = {f"eligible_{kind}_count": kind for kind in eligibility.KINDS}
+SCORE_BINS = 10     # 0-9, 10-19, ..., 90-100
+DELTA_BINS = 20     # -100..-91, ..., 90..100
+
+
+def _cohort_year():
+    return Coalesce(ExtractYear("start_date"), ExtractYear("created_at"))
+
+
+def _bucket_key(dimension):
+    lookup = DIMENSIONS[dimension]
+    if lookup is None:
+        return Value(UNASSIGNED, output_field=IntegerField())
+    return Coalesce(F(lookup), Value(UNASSIGNED), output_field=IntegerField())
+
+
+# ---- marking ----
+def _student_buckets(students):
+    """Every (dimension, key, cohort_year) bucket the given students belong to, in one query."""
+    keyed = students.annotate(
+        bucket_year=_cohort_year(),
+        **{f"bucket_{dimension}": _bucket_key(dimension) for dimension in DIMENSIONS},
+    )
+    columns = ["bucket_year", *(f"bucket_{dimension}" for dimension in DIMENSIONS)]
+    buckets = set()
+    for year, *keys in keyed.values_list(*columns).distinct().order_by():
+        buckets.update((dimension, key, year) for dimension, key in zip(DIMENSIONS, keys))
+    return buckets
+
+
+def mark_stale(buckets):
+    """Flag buckets for recomputation, creating rows for buckets seen for the first time."""
+    if not buckets:
+        return
+    now = timezone.now()
+    OutcomeSummary.objects.bulk_create(
+        [OutcomeSummary(dimension=d, key=k, cohort_year=y, stale_since=now) for d, k, y in sorted(buckets)],
+        update_conflicts=True,
+        unique_fields=["dimension", "key", "cohort_year"],
+        update_fields=["stale_since"],
+    )
+
+
+def mark_students_stale(students):
+    """For bulk writes that send no signals: mark the buckets of a Student queryset."""
+    mark_stale(_student_buckets(students))
+
+
+# ---- refreshing ----
+def _histogram(values, low, high, bins):
+    """Counts per bin; values outside [low, high] go in the first or last bin."""
+    counts = [0] * bins
+    width = (high - low) / bins
+    for value in values:
+        counts[max(0, min(int((value - low) // width), bins - 1))] += 1
+    return counts
+
+
+def _bucket_stats(rows):
+    """OutcomeSummary field values for one bucket's student rows."""
+    stats = {"student_count": len(rows), **{name: 0 for name in COMPLETION_COUNTS}}
+    eligible = Counter()
+    end_dates = Counter()
+    pretests, posttests = [], []
+    for row in rows:
+        for name, field in COMPLETION_COUNTS.items():
+            stats[name] += row[field]
+        eligible.update(eligibility.kinds(row["certificate_eligibility"]))
+        if row["end_date"]:
+            end_dates[row["end_date"].isoformat()] += 1
+        if row["pretest_score"] is not None and row["posttest_score"] is not None:
+            pretests.append(row["pretest_score"])
+            posttests.append(row["posttest_score"])
+
+    deltas = [post - pre for pre, post in zip(pretests, posttests)]
+    stats.update(
+        eligible_counts={kind: eligible[kind] for kind in eligibility.KINDS},
+        end_dates=dict(sorted(end_dates.items())),
+        scored_count=len(deltas),
+        improved_count=sum(1 for delta in deltas if delta > 0),
+        pretest_mean=statistics.fmean(pretests) if pretests else None,
+        posttest_mean=statistics.fmean(posttests) if posttests else None,
+        delta_mean=statistics.fmean(deltas) if deltas else None,
+        delta_stdev=statistics.pstdev(deltas) if deltas else None,
+        delta_p25=None, delta_median=statistics.median(deltas) if deltas else None, delta_p75=None,
+        pretest_histogram=_histogram(pretests, 0, 100, SCORE_BINS),
+        posttest_histogram=_histogram(posttests, 0, 100, SCORE_BINS),
+        delta_histogram=_histogram(deltas, -100, 100, DELTA_BINS),
+    )
+    if len(deltas) > 1:
+        stats["delta_p25"], _, stats["delta_p75"] = statistics.quantiles(deltas, n=4, method="inclusive")
+    elif deltas:
+        stats["delta_p25"] = stats["delta_p75"] = float(deltas[0])
+    return stats
+
+
+def refresh_stale(dimension=None):
+    """Recompute stale buckets (of one dimension, or all); returns how many were refreshed."""
+    dimensions = [dimension] if dimension else list(DIMENSIONS)
+    refreshed = 0
+    for name in dimensions:
+        stale = list(
+            OutcomeSummary.objects.filter(dimension=name, stale_since__isnull=False)
+            .values_list("pk", "key", "cohort_year", "stale_since")
+        )
+        if stale:
+            refreshed += _refresh(name, stale)
+    return refreshed
+
+
+def _scope(dimension, keys, years):
+    """A filter on plain (indexed) columns narrowing a refresh to the stale keys and years."""
+    scope = Q()
+    lookup = DIMENSIONS[dimension]
+    if lookup is not None:
+        scope = Q(**{f"{lookup}__in": keys - {UNASSIGNED}})
+        if UNASSIGNED in keys:
+            scope |= Q(**{f"{lookup}__isnull": True})
+    dated = Q()
+    for year in years:
+        dated |= Q(start_date__gte=datetime.date(year, 1, 1), start_date__lt=datetime.date(year + 1, 1, 1))
+    return scope & (dated | Q(start_date__isnull=True))
+
+
+def _refresh(dimension, stale):
+    keys = {key for _, key, _, _ in stale}
+    years = {year for _, _, year, _ in stale}
+    rows = (
+        Student.objects.filter(_scope(dimension, keys, years))
+        .annotate(bucket_key=_bucket_key(dimension), bucket_year=_cohort_year())
+        .filter(bucket_key__in=keys, bucket_year__in=years)
+        .values("bucket_key", "bucket_year", "end_date", "pretest_score", "posttest_score",
+                "certificate_eligibility", *COMPLETION_COUNTS.values())
+    )
+    by_bucket = defaultdict(list)
+    for row in rows.iterator(chunk_size=5000):
+        by_bucket[(row["bucket_key"], row["bucket_year"])].append(row)
+
+    now = timezone.now()
+    with transaction.atomic():
+        for pk, key, year, stale_since in stale:
+            bucket_rows = by_bucket.get((key, year))
+            # Matching stale_since: a bucket marked again meanwhile stays stale for the next refresh
+            current = OutcomeSummary.objects.filter(pk=pk, stale_since=stale_since)
+            if not bucket_rows:
+                current.delete()
+            else:
+                current.update(stale_since=None, refreshed_at=now, **_bucket_stats(bucket_rows))
+    return len(stale)
+
+
+def rebuild():
+    """Mark every bucket - existing rows and any student's - stale, then refresh them all."""
+    OutcomeSummary.objects.update(stale_since=timezone.now())
+    mark_students_stale(Student.objects.all())
+    return refresh_stale()
+
+
+# ---- reading ----
+def _rate(count, total):
+    return round(count / total, 4) if total else None
+
+
+def _finished_count(end_dates, today):
+    today = today.isoformat()
+    return sum(count for end_date, count in end_dates.items() if end_date <= today)
+
+
+def outcome_summaries(dimension, year=None, key=None):
+    """Dashboard rows for a dimension (refreshing its stale buckets first), with labels and rates."""
+    refresh_stale(dimension)
+    summaries = OutcomeSummary.objects.filter(dimension=dimension).order_by("key", "cohort_year")
+    if year is not None:
+        summaries = summaries.filter(cohort_year=year)
+    if key is not None:
+        summaries = summaries.filter(key=key)
+
+    labels = {}
+    if dimension in LABELS:
+        model, field = LABELS[dimension]
+        labels = dict(model.objects.values_list("pk", field))
+
+    today = timezone.localdate()
+    results = []
+    for summary in summaries.values():
+        total = summary["student_count"]
+        summary["finished_count"] = _finished_count(summary.pop("end_dates"), today)
+        eligible = summary.pop("eligible_counts")
+        summary.update({name: eligible.get(kind, 0) for name, kind in ELIGIBLE_COUNTS.items()})
+        results.append({
+            "key": summary["key"],
+            "label": "All students" if dimension == "all" else labels.get(summary["key"], "Unassigned"),
+            "cohort_year": summary["cohort_year"],
+            "student_count": total,
+            "counts": {name: summary[name] for name in ("finished_count", *COMPLETION_COUNTS, *ELIGIBLE_COUNTS)},
+            "rates": {
+                name.replace("_count", "_rate"): _rate(summary[name], total)
+                for name in ("finished_count", *COMPLETION_COUNTS, *ELIGIBLE_COUNTS)
+            },
+            "scores": {
+                name: summary[name]
+                for name in (
+                    "scored_count", "improved_count", "pretest_mean", "posttest_mean", "delta_mean",
+                    "delta_stdev", "delta_p25", "delta_median", "delta_p75",
+                    "pretest_histogram", "posttest_histogram", "delta_histogram",
+                )
+            },
+            "improved_rate": _rate(summary["improved_count"], summary["scored_count"]),
+            "refreshed_at": summary["refreshed_at"],
+        })
+    return results
+
+
+# ---- signals ----
+_pending = threading.local()
+
+
+def _mark_stale_on_commit(buckets):
+    """
+    mark_stale() once the transaction commits, with one upsert for every
+    student saved in it (right away outside a transaction). Each save
+    registers a flush; the first one marks everything and the rest find
+    nothing left. Buckets of a rolled-back save go out with the next
+    commit, which only costs a needless recompute.
+    """
+    pending = getattr(_pending, "buckets", None)
+    if pending is None:
+        pending = _pending.buckets = set()
+    pending |= buckets
+    transaction.on_commit(_flush_pending)
+
+
+def _flush_pending():
+    buckets = set(_pending.buckets)
+    _pending.buckets.clear()
+    mark_stale(buckets)
+
+
+def _buckets(year, teacher_keys, funding_source_id):
+    keys = {"all": UNASSIGNED, **teacher_keys, "funding_source": funding_source_id or UNASSIGNED}
+    return {(dimension, keys[dimension], year) for dimension in DIMENSIONS}
+
+
+def _teacher_keys(values):
+    return {dimension: values[field] or UNASSIGNED for dimension, field in TEACHER_DIMENSIONS.items()}
+
+
+def _instance_year(instance):
+    start_date = Student._meta.get_field("start_date").to_python(instance.start_date)
+    if start_date is not None:
+        return start_date.year
+    created_at = instance.created_at
+    return (timezone.localtime(created_at) if timezone.is_aware(created_at) else created_at).year
+
+
+@receiver(pre_save, sender=Student, dispatch_uid="analytics-student-pre-save")
+@receiver(pre_delete, sender=Student, dispatch_uid="analytics-student-pre-delete")
+def _remember_student_buckets(sender, instance, **kwargs):
+    # The stored row's buckets and teacher keys, before it moves or disappears
+    instance._outcome_state = None
+    if instance.pk:
+        row = (
+            Student.objects.filter(pk=instance.pk).annotate(bucket_year=_cohort_year())
+            .values("bucket_year", "teacher_id", "funding_source_id",
+                    *(f"teacher__{field}" for field in TEACHER_DIMENSIONS.values()))
+            .first()
+        )
+        if row is not None:
+            teacher_keys = _teacher_keys({field: row[f"teacher__{field}"] for field in TEACHER_DIMENSIONS.values()})
+            buckets = _buckets(row["bucket_year"], teacher_keys, row["funding_source_id"])
+            instance._outcome_state = (row["teacher_id"], teacher_keys, buckets)
+
+
+@receiver(post_save, sender=Student, dispatch_uid="analytics-student-save")
+def _student_saved(sender, instance, **kwargs):
+    # The new buckets come from the instance; only a newly assigned, unloaded teacher costs a query
+    state = getattr(instance, "_outcome_state", None)
+    if state is not None and state[0] == instance.teacher_id:
+        teacher_keys = state[1]
+    elif Student.teacher.is_cached(instance) and instance.teacher is not None:
+        teacher_keys = _teacher_keys({field: getattr(instance.teacher, field) for field in TEACHER_DIMENSIONS.values()})
+    else:
+        teacher_keys = _teacher_keys(
+            Teacher.objects.filter(pk=instance.teacher_id).values(*TEACHER_DIMENSIONS.values()).get()
+        )
+    buckets = _buckets(_instance_year(instance), teacher_keys, instance.funding_source_id)
+    _mark_stale_on_commit(buckets | (state[2] if state is not None else set()))
+
+
+@receiver(post_delete, sender=Student, dispatch_uid="analytics-student-delete")
+def _student_deleted(sender, instance, **kwargs):
+    state = getattr(instance, "_outcome_state", None)
+    if state is not None:
+        _mark_stale_on_commit(state[2])
+
+
+@receiver(pre_save, sender=Teacher, dispatch_uid="analytics-teacher-pre-save")
+def _remember_teacher_keys(sender, instance, **kwargs):
+    previous = Teacher.objects.filter(pk=instance.pk).values(*TEACHER_DIMENSIONS.values()).first() if instance.pk else None
+    instance._outcome_keys = previous
+
+
+@receiver(post_save, sender=Teacher, dispatch_uid="analytics-teacher-save")
+def _teacher_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_outcome_keys", None)
+    if created or not previous:
+        return
+    moved = {
+        dimension: (previous[field] or UNASSIGNED, getattr(instance, field) or UNASSIGNED)
+        for dimension, field in TEACHER_DIMENSIONS.items()
+        if previous[field] != getattr(instance, field)
+    }
+    if not moved:
+        return
+    years = set(
+        Student.objects.filter(teacher=instance).annotate(year=_cohort_year())
+        .values_list("year", flat=True).distinct().order_by()
+    )
+    mark_stale({
+        (dimension, key, year)
+        for dimension, keys in moved.items() for key in keys for year in years
+    })
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class HammerBackendapiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hammer_backendapi'
+
+    def ready(self):
+        # Connect the search index, outcome analytics, certificate eligibility
+        # and lookup-cache signals
+        from hammer_backendapi import analytics, eligibility, lookups, search  # noqa: F401
@@ -0,0 +1,269 @@
+# hammer_backendapi/cache.py
+"""
+Two-tier cache
+--------------
+LocMemCache is per process, so every gunicorn worker and Railway replica
+warmed its own copy. The default cache is now TieredCache:
+
+- L2: a shared cache alias (settings CACHES["shared"]): Redis when REDIS_URL
+  is set, otherwise a file-based cache shared by the workers on one host.
+- L1: a small in-process LRU with a short TTL in front of it, so hot keys
+  don't cost a network round trip. Other workers see a delete/overwrite
+  after at most L1_TTL seconds. Values pickling to more than
+  L1_MAX_VALUE_BYTES are read from the shared cache only. Lookups are
+  counted in hammer_cache_requests as cache="l1" and cache="shared".
+
+Helpers on top of the default cache:
+
+- get_or_compute(): stampede protection - one caller computes a missing
+  value under a lock in the shared cache, concurrent callers wait for it.
+  aget_or_compute() is the same for async views (awaitable compute, the
+  wait doesn't block the event loop). The lock needs an atomic add(), so
+  it is only taken on Redis/Memcached (across workers) or LocMemCache
+  (within the process). The file-cache fallback's add() is a
+  read-then-write that two processes can both win, so there callers just
+  compute: no cross-worker protection without Redis, only the in-process
+  coalescing of singleflight.py.
+  Both count their lookups in hammer_cache_requests, labelled with the key's
+  first segment ("admin_count", "lookups", "singleflight").
+- namespaced_key() / bump_namespace(): versioned key namespaces, so a whole
+  family of keys can be invalidated with one increment.
+"""
+
+import asyncio
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+
+from hammer_backendapi import metrics
+
+_MISSING = object()
+
+
+class TieredCache(BaseCache):
+    """In-process TTL/LRU L1 in front of a shared cache alias."""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._shared_alias = options.get("SHARED", "shared")
+        self._l1_ttl = float(options.get("L1_TTL", 5))
+        self._l1_max = int(options.get("L1_MAX_ENTRIES", 1000))
+        self._l1_max_value = int(options.get("L1_MAX_VALUE_BYTES", 64 * 1024))
+        self._l1 = OrderedDict()  # (key, version) -> (expires_at, pickled value)
+        self._l1_lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    # ---- L1 ----
+    def _l1_get(self, l1_key):
+        with self._l1_lock:
+            entry = self._l1.get(l1_key)
+            if entry is None:
+                return _MISSING
+            if entry[0] < time.monotonic():
+                del self._l1[l1_key]
+                return _MISSING
+            self._l1.move_to_end(l1_key)
+            data = entry[1]
+        return pickle.loads(data)
+
+    def _l1_set(self, l1_key, value, timeout):
+        ttl = self._l1_ttl
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            ttl = min(ttl, timeout)
+        if ttl <= 0:
+            self._l1_delete(l1_key)
+            return
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(data) > self._l1_max_value:
+            self._l1_delete(l1_key)
+            return
+        with self._l1_lock:
+            self._l1[l1_key] = (time.monotonic() + ttl, data)
+            self._l1.move_to_end(l1_key)
+            while len(self._l1) > self._l1_max:
+                self._l1.popitem(last=False)
+
+    def _l1_delete(self, l1_key):
+        with self._l1_lock:
+            self._l1.pop(l1_key, None)
+
+    def _l1_key(self, key, version):
+        return key, self.version if version is None else version
+
+    # ---- cache API ----
+    def get(self, key, default=None, version=None):
+        l1_key = self._l1_key(key, version)
+        value = self._l1_get(l1_key)
+        metrics.record_cache("l1", value is not _MISSING)
+        if value is not _MISSING:
+            return value
+        value = self.shared.get(key, _MISSING, version=version)
+        metrics.record_cache("shared", value is not _MISSING)
+        if value is _MISSING:
+            return default
+        self._l1_set(l1_key, value, DEFAULT_TIMEOUT)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self._l1_set(self._l1_key(key, version), value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self._l1_set(self._l1_key(key, version), value, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self._l1_delete(self._l1_key(key, version))
+        return self.shared.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        if self._l1_get(self._l1_key(key, version)) is not _MISSING:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._l1_delete(self._l1_key(key, version))
+        return self.shared.incr(key, delta, version=version)
+
+    def clear(self):
+        with self._l1_lock:
+            self._l1.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+
+# ---- namespaces ----
+def _namespace_key(name):
+    return f"ns:{name}"
+
+
+def namespace_version(name) -> int:
+    version = cache.get(_namespace_key(name))
+    if version is None:
+        cache.add(_namespace_key(name), 1, None)
+        version = cache.get(_namespace_key(name)) or 1
+    return version
+
+
+def namespaced_key(name, key) -> str:
+    """``name:<version>:key``; bump_namespace(name) makes every such key miss."""
+    return f"{name}:{namespace_version(name)}:{key}"
+
+
+def bump_namespace(name) -> int:
+    try:
+        return cache.incr(_namespace_key(name))
+    except ValueError:
+        cache.set(_namespace_key(name), 2, None)
+        return 2
+
+
+# ---- stampede protection ----
+# add() is atomic for every process sharing these (LocMemCache: one process)
+_ATOMIC_ADD_BACKENDS = (RedisCache, BaseMemcachedCache, LocMemCache)
+
+
+def _lock_supported():
+    backend = caches["default"]
+    if isinstance(backend, TieredCache):
+        backend = backend.shared
+    return isinstance(backend, _ATOMIC_ADD_BACKENDS)
+
+
+def _cache_name(key):
+    return key.split(":", 1)[0]
+
+
+def get_or_compute(key, compute, timeout=DEFAULT_TIMEOUT, lock_timeout=60, wait=30, should_cache=None):
+    """
+    Return the cached value for ``key``, computing it at most once at a time.
+
+    The first caller takes a lock in the shared cache (cache.add) and runs
+    ``compute()``; concurrent callers, in any worker, poll for the result
+    for up to ``wait`` seconds before computing it themselves. Without a
+    backend with an atomic add() every caller computes (see the module
+    docstring). Results for which ``should_cache(value)`` is false (e.g.
+    error content) are returned but not stored.
+    """
+    value = cache.get(key, _MISSING)
+    metrics.record_cache(_cache_name(key), value is not _MISSING)
+    if value is not _MISSING:
+        return value
+    if not _lock_supported():
+        value = compute()
+        if should_cache is None or should_cache(value):
+            cache.set(key, value, timeout)
+        return value
+
+    lock_key = f"lock:{key}"
+    deadline = time.monotonic() + wait
+    delay = 0.05
+    while True:
+        if cache.add(lock_key, 1, lock_timeout):
+            try:
+                value = compute()
+                if should_cache is None or should_cache(value):
+                    cache.set(key, value, timeout)
+                return value
+            finally:
+                cache.delete(lock_key)
+
+        time.sleep(delay)
+        delay = min(delay * 2, 0.5)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if time.monotonic() >= deadline:
+            return compute()
+
+
+async def aget_or_compute(key, compute, timeout=DEFAULT_TIMEOUT, lock_timeout=60, wait=30, should_cache=None):
+    """get_or_compute() for async callers; ``compute`` is a coroutine function."""
+    value = await cache.aget(key, _MISSING)
+    metrics.record_cache(_cache_name(key), value is not _MISSING)
+    if value is not _MISSING:
+        return value
+    if not _lock_supported():
+        value = await compute()
+        if should_cache is None or should_cache(value):
+            await cache.aset(key, value, timeout)
+        return value
+
+    lock_key = f"lock:{key}"
+    deadline = time.monotonic() + wait
+    delay = 0.05
+    while True:
+        if await cache.aadd(lock_key, 1, lock_timeout):
+            try:
+                value = await compute()
+                if should_cache is None or should_cache(value):
+                    await cache.aset(key, value, timeout)
+                return value
+            finally:
+                await cache.adelete(lock_key)
+
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.5)
+        value = await cache.aget(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if time.monotonic() >= deadline:
+            return await compute()
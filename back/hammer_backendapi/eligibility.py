@@ -0,0 +1,153 @@
+# hammer_backendapi/eligibility.py
+"""
+Certificate eligibility
+-----------------------
+Which certificates a student qualifies for, stored on the row instead of
+being worked out client-side from the whole roster:
+
+- certificate_eligibility: a bitmask of KINDS whose REQUIREMENTS are met,
+- certificates_issued: the kinds that have been printed/issued,
+- certificates_pending: eligible and not yet issued - the "ready to print"
+  queue, backed by a partial (teacher, full_name) index on rows where it
+  is non-zero, so the queue query never touches the rest of the table.
+
+Student.save() recomputes the eligibility mask (pre_save). certificates_issued
+is only ever written in SQL: saving an existing student leaves it (and
+certificates_pending) out of the UPDATE, and post_save works out the
+pending mask in SQL from the stored issued bits - so an instance loaded
+before a certificate was issued can't put the student back in the queue.
+Writes that skip save() keep the masks current themselves: the roster
+import calls apply() on each new instance before bulk_create(), the bulk
+PATCH calls refresh() - the same rules as one SQL UPDATE - on the rows it
+changed. Issuing a certificate (issuance.py) or recording a printed batch
+sets the issued bits.
+
+Bits are positions in KINDS and are stored, so new kinds go at the end.
+"""
+
+import operator
+from functools import reduce
+
+from django.db.models import BooleanField, Case, CharField, F, Q, Value, When
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from hammer_backendapi.models import Student
+
+# The certificate kinds of views/utils/certificate_layouts.json (the cover page is master-only)
+KINDS = ("portfolio", "nccer", "osha", "hammermath", "employability", "workforce")
+BITS = {kind: 1 << position for position, kind in enumerate(KINDS)}
+
+# kind -> Student fields that must all be set: True for booleans, non-empty
+# for text, non-null otherwise. Each certificate (labels as in the frontend's
+# certificateOptions.js) needs the training it attests plus every value
+# printed on it, so a queued certificate never prints "N/A":
+#
+# - portfolio, "Portfolio Overview 1-Pager": the DISC, 16 Types and
+#   Enneagram results it lists;
+# - nccer, "NCCER-HammerMath Credential": HammerMath completed and an NCCER
+#   credential number to register it under, plus the completion date;
+# - osha, "OSHA 10 Certificate": the OSHA 10 exam passed, and its date;
+# - hammermath, "HammerMath Certificate": HammerMath completed;
+# - employability, "Employability Skills": employability skills completed;
+# - workforce, "50-Hour Training Certificate": the 50-hour training completed.
+#
+# The completion date (end_date) is printed on all but the portfolio and
+# OSHA pages. Changing a rule needs a data migration recomputing the masks.
+REQUIREMENTS = {
+    "portfolio": ("disc_assessment_type", "sixteen_types_assessment", "enneagram_result"),
+    "nccer": ("hammer_math", "nccer_number", "end_date"),
+    "osha": ("passed_osha_10_exam", "osha_completion_date"),
+    "hammermath": ("hammer_math", "end_date"),
+    "employability": ("employability_skills", "end_date"),
+    "workforce": ("complete_50_hour_training", "end_date"),
+}
+
+
+def kinds(mask):
+    """The kind names set in a bitmask, in KINDS order."""
+    return [kind for kind in KINDS if mask & BITS[kind]]
+
+
+# ---- one instance ----
+def _is_met(student, name):
+    field = Student._meta.get_field(name)
+    value = getattr(student, field.attname)
+    if isinstance(field, BooleanField):
+        return value is True
+    if isinstance(field, CharField):
+        return bool(value)
+    return value is not None
+
+
+def eligibility_mask(student):
+    return sum(BITS[kind] for kind, fields in REQUIREMENTS.items() if all(_is_met(student, f) for f in fields))
+
+
+def apply(student):
+    """Set the eligibility and pending masks of an unsaved/changed instance."""
+    student.certificate_eligibility = eligibility_mask(student)
+    student.certificates_pending = student.certificate_eligibility & ~student.certificates_issued
+
+
+# ---- querysets (SQL) ----
+def _condition(name):
+    field = Student._meta.get_field(name)
+    if isinstance(field, BooleanField):
+        return Q(**{name: True})
+    if isinstance(field, CharField):
+        return Q(**{f"{name}__isnull": False}) & ~Q(**{name: ""})
+    return Q(**{f"{name}__isnull": False})
+
+
+def eligibility_expression():
+    """REQUIREMENTS as a SQL expression: the sum of each met kind's bit."""
+    return reduce(operator.add, (
+        Case(When(reduce(operator.and_, map(_condition, fields)), then=Value(BITS[kind])), default=Value(0))
+        for kind, fields in REQUIREMENTS.items()
+    ))
+
+
+def _pending_expression():
+    return F("certificate_eligibility") - F("certificate_eligibility").bitand(F("certificates_issued"))
+
+
+def refresh(students):
+    """Recompute the masks of a Student queryset in SQL (for writes that bypass save())."""
+    students.update(certificate_eligibility=eligibility_expression())
+    return students.update(certificates_pending=_pending_expression())
+
+
+def mark_issued(students, *issued_kinds):
+    """Record the kinds as issued for a Student queryset; returns the number of rows."""
+    bits = reduce(operator.or_, (BITS[kind] for kind in issued_kinds), 0)
+    students.update(certificates_issued=F("certificates_issued").bitor(bits))
+    return students.update(certificates_pending=_pending_expression())
+
+
+def certificate_queue(teacher, kind=None):
+    """The teacher's students with pending certificates (of ``kind``, or any), by name."""
+    students = Student.objects.filter(teacher=teacher, certificates_pending__gt=0)
+    if kind is not None:
+        students = students.alias(pending_kind=F("certificates_pending").bitand(BITS[kind])).filter(pending_kind__gt=0)
+    return students.order_by("full_name", "id")
+
+
+# ---- signals ----
+@receiver(pre_save, sender=Student, dispatch_uid="eligibility-student-pre-save")
+def _compute_masks(sender, instance, **kwargs):
+    apply(instance)
+
+
+@receiver(post_save, sender=Student, dispatch_uid="eligibility-student-save")
+def _refresh_partial_save(sender, instance, update_fields, **kwargs):
+    if not update_fields:
+        return  # an INSERT wrote the masks set in pre_save
+    student = Student.objects.filter(pk=instance.pk)
+    if "certificate_eligibility" not in update_fields:
+        refresh(student)
+    elif "certificates_pending" not in update_fields:
+        student.update(certificates_pending=_pending_expression())
+    else:
+        return
+    instance.refresh_from_db(fields=["certificate_eligibility", *Student.SQL_MAINTAINED_FIELDS])
@@ -0,0 +1,173 @@
+# hammer_backendapi/issuance.py
+"""
+Certificate issuance
+--------------------
+Certificates issued for a stored student are rendered once, kept in the
+default storage (S3 in production, MEDIA_ROOT locally) and recorded as an
+IssuedCertificate: who, which kind, the template version, the values
+printed on it, where the PDF lives and its sha256.
+
+issue() fingerprints (kind, template version, printed values). When a
+certificate with that fingerprint was already issued to the student, it is
+returned as-is - repeat downloads never reach PyMuPDF. A changed name, date,
+layout or template gives a new fingerprint, and so a new certificate; the
+earlier ones stay on record.
+
+Downloads go straight to S3 with a presigned URL, or are streamed from
+local storage. The PDF carries a signed verification QR code dated the day
+it was issued (verification.py). This is the only place certificates are
+signed: the values come from the stored Student row, never from a request
+body (the /api/generate/ endpoints render unsigned PDFs).
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+
+from hammer_backendapi import eligibility, verification
+from hammer_backendapi.models import IssuedCertificate, Student
+
+MASTER = "master"  # the full "generate all" set
+STORAGE_PREFIX = "certificates"
+
+
+@lru_cache(maxsize=8)
+def _file_sha256(path, mtime_ns):
+    """sha256 of a file; ``mtime_ns`` only participates in the cache key."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def template_version():
+    """Layout registry version plus a hash of the template PDF and the layout file."""
+    from hammer_backendapi.views.utils.certificate_layouts import layouts_path, registry_version
+    from hammer_backendapi.views.utils.render_pool import TEMPLATE_PATH
+
+    digest = hashlib.sha256()
+    for path in (os.path.abspath(TEMPLATE_PATH), layouts_path()):
+        digest.update(_file_sha256(path, os.stat(path).st_mtime_ns).encode())
+    return f"v{registry_version()}-{digest.hexdigest()[:16]}"
+
+
+def _layouts(kind):
+    from hammer_backendapi.views.utils.certificate_layouts import UnknownCertificateKind, get_layout, get_registry
+
+    if kind == MASTER:
+        return [layout for layout in get_registry()["layouts"].values() if layout["in_master"]]
+    layout = get_layout(kind)
+    if layout["master_only"]:
+        raise UnknownCertificateKind(kind)
+    return [layout]
+
+
+def certificate_snapshot(kind, payload):
+    """{value name: printed text} for every field of the certificate (or master set)."""
+    from hammer_backendapi.views.utils.certificate_layouts import certificate_values
+
+    values = certificate_values(payload)
+    return {
+        field["value"]: str(values.get(field["value"]) or field["default"])
+        for layout in _layouts(kind) for field in layout["fields"]
+    }
+
+
+def _fingerprint(kind, version, fields):
+    return hashlib.sha256(json.dumps([kind, version, fields], sort_keys=True).encode()).hexdigest()
+
+
+def _render_signed_pdf(kind, payload):
+    """
+    Render ``payload`` - StudentSerializer data of a stored student - with
+    its verification marks, through the render pool. Raises RenderPoolBusy
+    when the pool's queue is full.
+    """
+    from hammer_backendapi.views.utils.certificate_layouts import master_page_fields, single_certificate_fields
+    from hammer_backendapi.views.utils.pdf_master import render_master_bytes
+    from hammer_backendapi.views.utils.pdf_utils import render_certificate_bytes
+    from hammer_backendapi.views.utils.render_pool import TEMPLATE_PATH, submit_render
+
+    path = os.path.abspath(TEMPLATE_PATH)
+    if kind == MASTER:
+        page_fields_map = master_page_fields(payload)
+        verify_urls = verification.master_verify_urls(page_fields_map)
+        return submit_render(render_master_bytes, path, page_fields_map, verify_urls, kind=MASTER)
+    page_index, fields, _ = single_certificate_fields(kind, payload)
+    verify_url = verification.certificate_verify_url(kind, fields)
+    return submit_render(render_certificate_bytes, path, page_index, fields, verify_url, kind=kind)
+
+
+def issue(student, kind, user=None):
+    """
+    The student's certificate of ``kind`` (a registry kind, or MASTER) for
+    their current details: the stored one, or a new one rendered and saved
+    now. Returns (IssuedCertificate, created). Raises UnknownCertificateKind
+    and RenderPoolBusy.
+    """
+    from hammer_backendapi.serializers import StudentSerializer
+
+    payload = StudentSerializer(student).data  # what the frontend posts to /api/generate/
+    version = template_version()
+    fields = certificate_snapshot(kind, payload)
+    fingerprint = _fingerprint(kind, version, fields)
+    existing = IssuedCertificate.objects.filter(student=student, kind=kind, fingerprint=fingerprint).first()
+    if existing is not None:
+        return existing, False
+
+    pdf = _render_signed_pdf(kind, payload)
+    sha256 = hashlib.sha256(pdf).hexdigest()
+    key = f"{STORAGE_PREFIX}/{student.pk}/{kind}-{sha256[:20]}.pdf"
+    if not default_storage.exists(key):
+        key = default_storage.save(key, ContentFile(pdf))
+    try:
+        with transaction.atomic():
+            certificate = IssuedCertificate.objects.create(
+                student=student, kind=kind, template_version=version, fields=fields,
+                fingerprint=fingerprint, storage_key=key, sha256=sha256, size_bytes=len(pdf),
+                issued_by=user if user is not None and user.is_authenticated else None,
+            )
+    except IntegrityError:
+        # Issued by a concurrent request meanwhile: keep theirs, drop our copy
+        certificate = IssuedCertificate.objects.get(student=student, kind=kind, fingerprint=fingerprint)
+        if certificate.storage_key != key:
+            default_storage.delete(key)
+        return certificate, False
+
+    issued_kinds = eligibility.kinds(student.certificate_eligibility) if kind == MASTER else [kind]
+    if issued_kinds:
+        eligibility.mark_issued(Student.objects.filter(pk=student.pk), *issued_kinds)
+    return certificate, True
+
+
+def download_filename(certificate):
+    from hammer_backendapi.views.utils.certificate_layouts import UnknownCertificateKind, get_layout
+
+    if certificate.kind == MASTER:
+        name = certificate.fields.get("full_name") or "Unnamed Student"
+        return f"Certificates_Master_{name.replace(' ', '_')}.pdf"
+    try:
+        return get_layout(certificate.kind)["filename"]
+    except UnknownCertificateKind:
+        return f"{certificate.kind}_certificate.pdf"
+
+
+def presigned_url(certificate):
+    """A signed S3 URL for the stored PDF, or None when it is served from local storage."""
+    if not getattr(settings, "USE_S3", False):
+        return None
+    from hammer_backendapi.views.utils.s3 import presigned_get_url
+
+    return presigned_get_url(
+        certificate.storage_key,
+        expires_in=settings.ISSUED_CERTIFICATE_URL_TTL,
+        ResponseContentDisposition=f'attachment; filename="{download_filename(certificate)}"',
+        ResponseContentType="application/pdf",
+    )
@@ -0,0 +1,50 @@
+# hammer_backendapi/lookups.py
+"""
+Lookup options
+--------------
+The names behind the student form's dropdowns (gender identity, DISC,
+16 Types, Enneagram, OSHA type, funding source) as one dict, cached in
+the shared cache. GET /api/details/ serves it and the roster import
+resolves names through it. Saving or deleting a lookup row bumps the
+"lookups" namespace, so every worker reloads it on the next call.
+"""
+
+from django.db.models.signals import post_delete, post_save
+
+from hammer_backendapi.cache import bump_namespace, get_or_compute, namespaced_key
+from hammer_backendapi.models import (
+    DiscAssessment,
+    EnneagramResult,
+    FundingSource,
+    GenderIdentity,
+    OshaType,
+    SixteenTypeAssessment,
+)
+
+LOOKUP_MODELS = (GenderIdentity, DiscAssessment, SixteenTypeAssessment, EnneagramResult, OshaType, FundingSource)
+LOOKUP_CACHE_TTL = 60 * 60  # also invalidated whenever a lookup row is saved or deleted
+
+
+def _load_lookup_options():
+    return {
+        "gender_identities": list(GenderIdentity.objects.values("id", "gender")),
+        "disc_assessments": list(DiscAssessment.objects.values("id", "type_name")),
+        "sixteen_type_assessments": list(SixteenTypeAssessment.objects.values("id", "type_name")),
+        "enneagram_results": list(EnneagramResult.objects.values("id", "result_name")),
+        "osha_types": list(OshaType.objects.values("id", "name")),
+        "funding_sources": list(FundingSource.objects.values("id", "name", "description")),
+    }
+
+
+def lookup_options():
+    """Dropdown options for the student form, cached in the shared cache (warmed at boot)."""
+    return get_or_compute(namespaced_key("lookups", "options"), _load_lookup_options, LOOKUP_CACHE_TTL)
+
+
+def _invalidate_lookup_options(sender, **kwargs):
+    bump_namespace("lookups")
+
+
+for _model in LOOKUP_MODELS:
+    post_save.connect(_invalidate_lookup_options, sender=_model, dispatch_uid=f"lookups-save-{_model.__name__}")
+    post_delete.connect(_invalidate_lookup_options, sender=_model, dispatch_uid=f"lookups-delete-{_model.__name__}")
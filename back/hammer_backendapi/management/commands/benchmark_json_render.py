@@ -0,0 +1,90 @@
+import gzip
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from hammer_backendapi.models import (
+    DiscAssessment,
+    EnneagramResult,
+    FundingSource,
+    GenderIdentity,
+    OshaType,
+    SixteenTypeAssessment,
+    Student,
+)
+from hammer_backendapi.renderers import ORJSONRenderer
+from hammer_backendapi.serializers import StudentSerializer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _sample_students(count):
+    """Unsaved students with every related object filled in, like a real list page."""
+    disc = DiscAssessment(type_name="D - Dominance")
+    sixteen = SixteenTypeAssessment(type_name="ENTP - The Debater")
+    enneagram = EnneagramResult(result_name="Type 6 - The Loyalist")
+    osha = OshaType(name="OSHA 10 Construction")
+    gender = GenderIdentity(gender="Prefer not to say")
+    funding = FundingSource(name="WIOA", description="Workforce Innovation and Opportunity Act")
+    students = []
+    for i in range(count):
+        students.append(Student(
+            id=i + 1, full_name=f"Student Number {i}", email=f"student{i}@example.org",
+            nccer_number=f"NC{i:06d}", start_date=date(2025, 1, 6), end_date=date(2025, 6, 27),
+            osha_completion_date=date(2025, 3, 14), created_at=timezone.now(),
+            disc_assessment_type=disc, sixteen_types_assessment=sixteen, enneagram_result=enneagram,
+            osha_type=osha, gender_identity=gender, funding_source=funding,
+        ))
+    return students
+
+
+class Command(BaseCommand):
+    help = 'Bytes and CPU per student list page for the JSON renderer stacks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=50)
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        iterations = options['iterations']
+
+        try:
+            students = list(Student.objects.select_related(
+                'gender_identity', 'disc_assessment_type', 'sixteen_types_assessment',
+                'enneagram_result', 'osha_type', 'funding_source',
+            )[:page_size])
+        except DatabaseError:
+            students = []
+        source = 'database'
+        if len(students) < page_size:
+            students, source = _sample_students(page_size), 'synthetic'
+
+        # Paginated list response, as returned by StudentViewSet.list
+        data = {'count': page_size, 'next': None, 'previous': None,
+                'results': StudentSerializer(students, many=True).data}
+
+        stacks = [
+            ('DRF JSONRenderer, indent=2', lambda: JSONRenderer().render(data, renderer_context={'indent': 2})),
+            ('DRF JSONRenderer, compact', lambda: JSONRenderer().render(data)),
+            ('ORJSONRenderer', lambda: ORJSONRenderer().render(data)),
+            ('ORJSONRenderer + gzip', lambda: gzip.compress(ORJSONRenderer().render(data), 6)),
+        ]
+        if brotli is not None:
+            stacks.append(('ORJSONRenderer + brotli q5', lambda: brotli.compress(ORJSONRenderer().render(data), quality=5)))
+
+        self.stdout.write(f'{page_size} students per page ({source} data), {iterations} iterations')
+        for name, render in stacks:
+            size = len(render())
+            started = time.process_time()
+            for _ in range(iterations):
+                render()
+            cpu_us = (time.process_time() - started) / iterations * 1e6
+            self.stdout.write(f'  {name:<30} {size:>8} bytes  {cpu_us:>9.1f} us CPU/page')
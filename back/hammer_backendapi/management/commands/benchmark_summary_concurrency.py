@@ -0,0 +1,78 @@
+import asyncio
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+async def _run(url, path, token, student_id, total, concurrency):
+    import httpx
+
+    limit = asyncio.Semaphore(concurrency)
+    latencies, errors = [], {}
+
+    async def one(client):
+        async with limit:
+            started = time.perf_counter()
+            try:
+                # A fresh Idempotency-Key per request, so coalescing doesn't merge them
+                response = await client.post(
+                    path, json={'student_id': student_id},
+                    headers={'Authorization': f'Token {token}', 'Idempotency-Key': f'bench-{uuid.uuid4()}'},
+                )
+                key = None if response.status_code == 200 else f'HTTP {response.status_code}'
+            except httpx.HTTPError as e:
+                key = type(e).__name__
+            if key is None:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors[key] = errors.get(key, 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=300, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(client) for _ in range(total)))
+        wall = time.perf_counter() - started
+    return wall, latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Concurrent AI summary throughput against running servers, e.g. the same app under '
+        'WSGI and ASGI: --target wsgi=http://localhost:8000 --target asgi=http://localhost:8001'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', required=True, metavar='NAME=URL',
+                            help='Server to benchmark; repeat to compare several')
+        parser.add_argument('--token', required=True, help='API token of a teacher')
+        parser.add_argument('--student-id', type=int, required=True)
+        parser.add_argument('--requests', type=int, default=30)
+        parser.add_argument('--concurrency', type=int, default=30)
+        parser.add_argument('--path', default='/api/ai/summary/')
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['target']:
+            name, sep, url = target.partition('=')
+            if not sep or not url:
+                raise CommandError(f'--target must be NAME=URL, got {target!r}')
+            targets.append((name, url.rstrip('/')))
+
+        self.stdout.write(
+            f"{options['requests']} summary requests, {options['concurrency']} concurrent, POST {options['path']}"
+        )
+        for name, url in targets:
+            wall, latencies, errors = asyncio.run(_run(
+                url, options['path'], options['token'], options['student_id'],
+                options['requests'], options['concurrency'],
+            ))
+            line = f'  {name:<8} {len(latencies) / wall:6.2f} req/s  wall {wall:6.2f}s'
+            if latencies:
+                latencies.sort()
+                p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+                line += f'  p50 {statistics.median(latencies):6.2f}s  p95 {p95:6.2f}s'
+            if errors:
+                line += '  errors: ' + ', '.join(f'{key} x{count}' for key, count in sorted(errors.items()))
+            self.stdout.write(line)
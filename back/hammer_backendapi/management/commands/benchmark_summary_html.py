@@ -0,0 +1,163 @@
+import glob
+import json
+import os
+import re
+import timeit
+from html import unescape
+
+from django.core.management.base import BaseCommand
+
+from hammer_backendapi.views.utils.summary_html import process_summary_html
+
+SAMPLE_SUMMARY = (
+    "<p>Jordan Smith demonstrates a D - Dominance communication style, ENTP - The Debater personality, "
+    "and Type 6 - The Loyalist motivation pattern, bringing dependable problem-solving to every professional "
+    "environment through strong commitment to quality, collaboration, and continuous professional development.</p>"
+    "<h2>Work Style &amp; Communication</h2>"
+    "<p>They approach tasks directly and like to understand the goal before starting.They keep supervisors informed "
+    "with short, clear updates.</p>"
+    "<ul><li>They check their work against the plans before calling a task complete.</li>"
+    "<li>They follow instructions carefully and ask questions when something is unclear.</li>"
+    "<li>They build trust with crew members by keeping commitments.</li></ul>"
+    "<h2>Learning Style &amp; Motivation</h2>"
+    "<p>They learn best by doing, with a chance to ask why a method works.Recognition for reliable work keeps them "
+    "motivated.</p>"
+    "<ul><li>They prefer hands-on demonstrations followed by supervised practice.</li>"
+    "<li>They respond well to direct, specific feedback from supervisors.</li>"
+    "<li>They are motivated by a clear path from apprentice to journeyman.</li></ul>"
+    "<h2>Ideal Work Environment</h2>"
+    "<p>They thrive on teams with clear roles and steady communication.Structured sites with room to solve problems "
+    "suit them best.</p>"
+    "<ul><li>They prefer a steady pace with well-defined project milestones.</li>"
+    "<li>They collaborate best with a small, consistent crew.</li>"
+    "<li>They adapt to changing demands when the reasons are explained.</li></ul>"
+    "<h2>Career Development Insights</h2>"
+    "<p>Their reliability makes them a strong candidate for lead roles.They would benefit from practice delegating "
+    "tasks.Mentoring newer workers would build their leadership skills.Continued safety training will support "
+    "long-term growth.</p>"
+)
+
+
+# ---- Previous regex chain, kept verbatim as the benchmark baseline ----
+def legacy_clean_html_formatting(html_content):
+    def fix_period_spacing(match):
+        text = match.group(0)
+        text = re.sub(r'\.(?=[A-Z])', '.  ', text)
+        return text
+
+    html_content = re.sub(r'<p>(.*?)</p>', fix_period_spacing, html_content, flags=re.DOTALL)
+    html_content = re.sub(r'</li><li>', '</li>\n<li>', html_content)
+    html_content = re.sub(r'<ul><li>', '<ul>\n<li>', html_content)
+    html_content = re.sub(r'</li></ul>', '</li>\n</ul>', html_content)
+    html_content = re.sub(r'</p><h2>', '</p>\n\n<h2>', html_content)
+    html_content = re.sub(r'</h2><p>', '</h2>\n<p>', html_content)
+    html_content = re.sub(r'</ul><h2>', '</ul>\n\n<h2>', html_content)
+    html_content = re.sub(r'  +', '  ', html_content)
+    return html_content.strip()
+
+
+def legacy_validate_content_length(html):
+    if len(html) > 4500:
+        sections = html.split('<h2>')
+        if len(sections) > 1:
+            trimmed = sections[0]
+            section_count = 0
+            for section in sections[1:]:
+                if section_count < 3 and len(trimmed + '<h2>' + section) < 4200:
+                    trimmed += '<h2>' + section
+                    section_count += 1
+                else:
+                    break
+            return trimmed
+        sentences = html.split('.</p>')
+        trimmed = ""
+        for sentence in sentences:
+            if len(trimmed + sentence + '.</p>') < 4200:
+                trimmed += sentence + '.</p>'
+            else:
+                break
+        return trimmed
+    return html
+
+
+def legacy_parse_blocks(html):
+    html = re.sub(r'<!--.*?-->', '', html, flags=re.DOTALL)
+    blocks = []
+    elements = re.split(r'(<h[1-3][^>]*>.*?</h[1-3]>|<p[^>]*>.*?</p>|<ul[^>]*>.*?</ul>)', html, flags=re.DOTALL | re.IGNORECASE)
+    for element in elements:
+        element = element.strip()
+        h_match = re.match(r'<h[1-3][^>]*>(.*?)</h[1-3]>', element, re.DOTALL | re.IGNORECASE)
+        if h_match:
+            blocks.append(("heading", unescape(re.sub(r'<[^>]+>', '', h_match.group(1)).strip())))
+            continue
+        p_match = re.match(r'<p[^>]*>(.*?)</p>', element, re.DOTALL | re.IGNORECASE)
+        if p_match:
+            blocks.append(("paragraph", unescape(re.sub(r'<[^>]+>', '', p_match.group(1)).strip())))
+            continue
+        ul_match = re.match(r'<ul[^>]*>(.*?)</ul>', element, re.DOTALL | re.IGNORECASE)
+        if ul_match:
+            for li in re.findall(r'<li[^>]*>(.*?)</li>', ul_match.group(1), re.DOTALL | re.IGNORECASE):
+                blocks.append(("bullet", unescape(re.sub(r'<[^>]+>', '', li).strip())))
+    return blocks
+
+
+def legacy_chain(html):
+    html = legacy_validate_content_length(legacy_clean_html_formatting(html))
+    return html, legacy_parse_blocks(html)
+
+
+def tokenizer_chain(html):
+    processed = process_summary_html(html, max_length=4500, trim_to=4200)
+    return processed.html, processed.blocks
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the single-pass summary HTML tokenizer against the previous regex chain'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help='Summary files or directories (.html, or .json with an "html" key)')
+        parser.add_argument('--iterations', type=int, default=2000)
+
+    def _load_samples(self, paths):
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                files += sorted(glob.glob(os.path.join(path, '*.html')) + glob.glob(os.path.join(path, '*.json')))
+            else:
+                files.append(path)
+
+        samples = []
+        for path in files:
+            with open(path, 'r') as f:
+                content = f.read()
+            if path.endswith('.json'):
+                content = json.loads(content).get('html', '')
+            samples.append((os.path.basename(path), content))
+
+        if not samples:
+            samples = [
+                ('sample (compact)', SAMPLE_SUMMARY),
+                ('sample (pre-formatted)', legacy_clean_html_formatting(SAMPLE_SUMMARY)),
+                ('sample (oversized)', SAMPLE_SUMMARY * 3),
+            ]
+        return samples
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        for name, html in self._load_samples(options['paths']):
+            legacy_html, _ = legacy_chain(html)
+            new_html, blocks = tokenizer_chain(html)
+            matches = legacy_html == new_html
+
+            legacy_s = timeit.timeit(lambda: legacy_chain(html), number=iterations)
+            new_s = timeit.timeit(lambda: tokenizer_chain(html), number=iterations)
+
+            self.stdout.write(
+                f'{name}: {len(html)} chars, {len(blocks)} blocks | '
+                f'regex chain {legacy_s / iterations * 1e6:.1f}us, '
+                f'tokenizer {new_s / iterations * 1e6:.1f}us '
+                f'({legacy_s / new_s:.2f}x) | output {"identical" if matches else "DIFFERS"}'
+            )
+            if not matches:
+                self.stdout.write(self.style.WARNING(f'  regex chain: {len(legacy_html)} chars, tokenizer: {len(new_html)} chars'))
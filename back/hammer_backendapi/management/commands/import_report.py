@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a gunicorn worker does before it can serve: build the WSGI app and load the URLconf
+PROBE = (
+    "from hammer_backendproject.wsgi import application\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+
+def parse_importtime(stderr):
+    """Yield (module, self_us, cumulative_us) from `python -X importtime` output."""
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        yield fields[2].strip(), int(fields[0]), int(fields[1])
+
+
+class Command(BaseCommand):
+    help = 'Measure worker cold-start imports with `python -X importtime` and check the start-up budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help='Show the N slowest top-level packages')
+        parser.add_argument('--check', action='store_true',
+                            help='Fail if over STARTUP_IMPORT_BUDGET_MS or a deferred module is imported')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'hammer_backendproject.settings')
+
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        wall_ms = (time.perf_counter() - started) * 1000
+        if result.returncode != 0:
+            raise CommandError(f'Start-up probe failed:\n{result.stderr[-2000:]}')
+
+        modules = list(parse_importtime(result.stderr))
+        total_ms = sum(self_us for _, self_us, _ in modules) / 1000
+
+        by_package = defaultdict(int)
+        for name, self_us, _ in modules:
+            by_package[name.split('.')[0]] += self_us
+
+        budget_ms = getattr(settings, 'STARTUP_IMPORT_BUDGET_MS', 1000)
+        deferred = set(getattr(settings, 'STARTUP_DEFERRED_MODULES', ()))
+        eager = sorted(pkg for pkg in by_package if pkg in deferred)
+
+        self.stdout.write(
+            f'{len(modules)} modules, {total_ms:.0f}ms import time '
+            f'(budget {budget_ms}ms), {wall_ms:.0f}ms wall for the probe process'
+        )
+        for pkg, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f'  {self_us / 1000:8.1f}ms  {pkg}')
+
+        problems = []
+        if total_ms > budget_ms:
+            problems.append(f'import time {total_ms:.0f}ms exceeds STARTUP_IMPORT_BUDGET_MS={budget_ms}')
+        if eager:
+            problems.append(f'imported at start-up but should be deferred: {", ".join(eager)}')
+
+        for problem in problems:
+            self.stdout.write(self.style.WARNING(problem))
+        if not problems:
+            self.stdout.write(self.style.SUCCESS('Within the start-up budget'))
+        elif options['check']:
+            raise CommandError('Start-up budget check failed')
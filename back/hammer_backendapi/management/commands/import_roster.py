@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hammer_backendapi.models import Teacher
+from hammer_backendapi.roster_import import import_roster
+
+
+class Command(BaseCommand):
+    help = 'Bulk-create students for a teacher from a CSV/XLSX roster; all rows or none'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Roster file (.csv or .xlsx)')
+        parser.add_argument('--teacher', required=True, help='Teacher email or id')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; create nothing')
+
+    def handle(self, *args, **options):
+        teacher_ref = options['teacher']
+        lookup = {'pk': teacher_ref} if teacher_ref.isdigit() else {'email__iexact': teacher_ref}
+        teacher = Teacher.objects.filter(**lookup).first()
+        if teacher is None:
+            raise CommandError(f'No teacher {teacher_ref!r}')
+
+        path = Path(options['path'])
+        try:
+            result = import_roster(teacher, path.read_bytes(), path.name, dry_run=options['dry_run'])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        if result['ignored_columns']:
+            self.stdout.write(f"Ignored columns: {', '.join(result['ignored_columns'])}")
+        for error in result['errors']:
+            messages = '; '.join(f'{field}: {message}' for field, message in error['errors'].items())
+            self.stdout.write(self.style.ERROR(f"Row {error['row']}: {messages}"))
+        if result['errors']:
+            raise CommandError(f"{len(result['errors'])} of {result['rows']} rows have errors; nothing was imported")
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"{result['rows']} rows valid (dry run, nothing created)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Created {result['created']} students for {teacher.full_name}"))
@@ -0,0 +1,54 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand
+
+from hammer_backendapi import query_inspector
+
+
+class Command(BaseCommand):
+    help = 'Summarise the QueryInspectorMiddleware log: per-endpoint query counts, likely N+1 shapes and slow statements'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', help='Report log to read (default: QUERY_INSPECTOR_LOG)')
+        parser.add_argument('--endpoint', help='Only endpoints containing this text')
+        parser.add_argument('--json', action='store_true', help='Print the aggregate as JSON')
+        parser.add_argument('--clear', action='store_true', help='Delete the log after reporting')
+
+    def handle(self, *args, **options):
+        path = options['log'] or query_inspector.log_path()
+        endpoints = query_inspector.aggregate(query_inspector.read_entries(path))
+        if options['endpoint']:
+            endpoints = {k: v for k, v in endpoints.items() if options['endpoint'] in k}
+
+        if options['json']:
+            self.stdout.write(json.dumps(endpoints, indent=2))
+        elif not endpoints:
+            self.stdout.write(f'No query reports in {path}')
+        else:
+            # Endpoints with N+1 patterns first, then by average query count
+            ordered = sorted(
+                endpoints.items(),
+                key=lambda item: (not item[1]['repeated'], -item[1]['queries'] / item[1]['requests']),
+            )
+            for endpoint, stats in ordered:
+                requests = stats['requests']
+                self.stdout.write(self.style.MIGRATE_HEADING(endpoint))
+                self.stdout.write(
+                    f'  {requests} requests | avg {stats["queries"] / requests:.1f} queries '
+                    f'(max {stats["max_queries"]}) | avg {stats["query_ms"] / requests:.1f}ms in SQL'
+                )
+                for shape, info in sorted(stats['repeated'].items(), key=lambda s: -s[1]['max_count']):
+                    self.stdout.write(self.style.WARNING(
+                        f'  N+1? x{info["max_count"]} in {info["requests"]} request(s) from {info["origin"] or "unknown"}'
+                    ))
+                    self.stdout.write(f'      {shape[:300]}')
+                for shape, info in sorted(stats['slow'].items(), key=lambda s: -s[1]['max_ms']):
+                    self.stdout.write(self.style.ERROR(
+                        f'  slow: {info["count"]}x, max {info["max_ms"]:.1f}ms from {info["origin"] or "unknown"}'
+                    ))
+                    self.stdout.write(f'      {shape[:300]}')
+
+        if options['clear'] and os.path.exists(path):
+            os.remove(path)
+            self.stdout.write(self.style.SUCCESS(f'Cleared {path}'))
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from hammer_backendapi import analytics
+
+
+class Command(BaseCommand):
+    help = 'Recompute stale outcome analytics buckets (run periodically); --full rebuilds every bucket'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Rebuild all buckets, including changes no signal reported')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        refreshed = analytics.rebuild() if options['full'] else analytics.refresh_stale()
+        self.stdout.write(self.style.SUCCESS(
+            f'Refreshed {refreshed} outcome buckets in {time.perf_counter() - started:.2f}s'
+        ))
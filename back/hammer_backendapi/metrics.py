@@ -0,0 +1,161 @@
+# hammer_backendapi/metrics.py
+"""
+Prometheus metrics
+------------------
+Request latency per URL name, DB queries per request, PDF render time per
+certificate kind, PDF render pool depth and job outcomes, OpenAI
+latency/tokens/finish_reason per model, upload sizes and cache hit/miss
+counts. Exposed at /metrics (views/metrics.py).
+
+Under gunicorn each worker is a separate process, so when
+PROMETHEUS_MULTIPROC_DIR is set (gunicorn.conf.py sets it) every worker
+writes its samples to files in that directory and /metrics aggregates them.
+
+prometheus-client is optional: without it every observe_* call is a no-op
+and /metrics returns 503.
+"""
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        REGISTRY,
+        generate_latest,
+    )
+    from prometheus_client import multiprocess
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+BYTES_BUCKETS = (10_000, 100_000, 1_000_000, 5_000_000, 10_000_000, 50_000_000, 100_000_000)
+
+if PROMETHEUS_AVAILABLE:
+    REQUEST_LATENCY = Histogram(
+        "hammer_http_request_duration_seconds", "Request latency by URL name",
+        ["view", "method", "status"], buckets=LATENCY_BUCKETS,
+    )
+    REQUEST_QUERIES = Histogram(
+        "hammer_db_queries_per_request", "Database queries per request",
+        ["view"], buckets=QUERY_COUNT_BUCKETS,
+    )
+    REQUEST_QUERY_SECONDS = Histogram(
+        "hammer_db_query_seconds_per_request", "Total database time per request",
+        ["view"], buckets=LATENCY_BUCKETS,
+    )
+    PDF_RENDER_SECONDS = Histogram(
+        "hammer_pdf_render_seconds", "PDF render time by certificate kind",
+        ["kind"], buckets=LATENCY_BUCKETS,
+    )
+    # livesum: the pools of all live workers added up
+    RENDER_POOL_JOBS = Gauge(
+        "hammer_pdf_render_pool_jobs", "Admitted PDF render jobs by state (running/queued)",
+        ["state"], multiprocess_mode="livesum",
+    )
+    RENDER_POOL_WORKERS = Gauge(
+        "hammer_pdf_render_pool_workers", "PDF render pool processes (0: inline rendering)",
+        multiprocess_mode="livesum",
+    )
+    RENDER_JOBS = Counter(
+        "hammer_pdf_render_jobs", "PDF render jobs by outcome (completed/failed/rejected/timed_out)",
+        ["outcome"],
+    )
+    OPENAI_LATENCY = Histogram(
+        "hammer_openai_request_seconds", "OpenAI call latency by model",
+        ["model"], buckets=LATENCY_BUCKETS,
+    )
+    OPENAI_TOKENS = Counter(
+        "hammer_openai_tokens", "OpenAI tokens used by model and type (prompt/completion)",
+        ["model", "type"],
+    )
+    OPENAI_FINISH = Counter(
+        "hammer_openai_finish_reason", "OpenAI responses by model and finish_reason",
+        ["model", "finish_reason"],
+    )
+    UPLOAD_BYTES = Histogram(
+        "hammer_upload_bytes", "Uploaded student file sizes", buckets=BYTES_BUCKETS,
+    )
+    CACHE_REQUESTS = Counter(
+        "hammer_cache_requests", "Cache lookups by cache name and result (hit/miss)",
+        ["cache", "result"],
+    )
+
+
+def _safe(fn):
+    """Metrics must never break a request."""
+    def wrapper(*args, **kwargs):
+        if not PROMETHEUS_AVAILABLE:
+            return
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            logger.debug("metrics update failed: %s", e)
+    return wrapper
+
+
+@_safe
+def observe_request(view, method, status, seconds, query_count, query_seconds):
+    REQUEST_LATENCY.labels(view, method, str(status)).observe(seconds)
+    REQUEST_QUERIES.labels(view).observe(query_count)
+    REQUEST_QUERY_SECONDS.labels(view).observe(query_seconds)
+
+
+@_safe
+def observe_pdf_render(kind, seconds):
+    PDF_RENDER_SECONDS.labels(kind or "unknown").observe(seconds)
+
+
+@_safe
+def observe_render_pool(running, queued, workers):
+    RENDER_POOL_WORKERS.set(workers)
+    RENDER_POOL_JOBS.labels("running").set(running)
+    RENDER_POOL_JOBS.labels("queued").set(queued)
+
+
+@_safe
+def record_render_job(outcome):
+    RENDER_JOBS.labels(outcome).inc()
+
+
+@_safe
+def observe_openai(model, seconds, usage=None, finish_reason=None):
+    OPENAI_LATENCY.labels(model).observe(seconds)
+    if usage is not None:
+        OPENAI_TOKENS.labels(model, "prompt").inc(getattr(usage, "prompt_tokens", 0) or 0)
+        OPENAI_TOKENS.labels(model, "completion").inc(getattr(usage, "completion_tokens", 0) or 0)
+    OPENAI_FINISH.labels(model, finish_reason or "error").inc()
+
+
+@_safe
+def observe_upload(size_bytes):
+    UPLOAD_BYTES.observe(size_bytes)
+
+
+@_safe
+def record_cache(name, hit):
+    CACHE_REQUESTS.labels(name, "hit" if hit else "miss").inc()
+
+
+def render_latest():
+    """Return (body, content_type) for the exposition, aggregated across workers if configured."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid):
+    """Called from gunicorn's child_exit hook to clean up a dead worker's live files."""
+    if PROMETHEUS_AVAILABLE and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
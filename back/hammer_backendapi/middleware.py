@@ -0,0 +1,258 @@
+# hammer_backendapi/middleware.py
+"""
+Project middleware
+------------------
+MetricsMiddleware times every request and counts the SQL it runs (via
+connection.execute_wrapper), then records both per URL name in
+hammer_backendapi.metrics. It is async capable (ASGI); the profiling and
+query inspector middleware drop out of the chain when disabled.
+
+ProfilingMiddleware saves cProfile stats, stack samples and the query log
+of selected requests (see hammer_backendapi/profiling.py).
+
+QueryInspectorMiddleware reports N+1 query patterns and slow statements per
+endpoint (see hammer_backendapi/query_inspector.py).
+
+CompressionMiddleware brotli/gzip-compresses large JSON responses.
+"""
+
+import logging
+import random
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+from hammer_backendapi import metrics
+
+logger = logging.getLogger(__name__)
+
+BROTLI_QUALITY = 5  # close to gzip's CPU cost, noticeably smaller output
+
+
+def view_label(request) -> str:
+    """URL name if the route has one, else the route pattern (bounded label cardinality)."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.url_name or match.route or match.view_name
+
+
+class QueryCounter:
+    """execute_wrapper that counts statements and their total time."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def _enter_execute_wrapper(wrapper):
+    """Install ``wrapper`` on the calling thread's connection; returns the context manager to exit."""
+    context = connection.execute_wrapper(wrapper)
+    context.__enter__()
+    return context
+
+
+class MetricsMiddleware:
+    """
+    Sync and async capable: under ASGI it runs on the event loop instead of
+    parking a thread per request in front of async views. In async mode the
+    SQL is counted on the request's thread-sensitive thread, which is where
+    sync_to_async runs its ORM calls.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics.PROMETHEUS_AVAILABLE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        queries = QueryCounter()
+        started = time.perf_counter()
+        status = 500
+        try:
+            with connection.execute_wrapper(queries):
+                response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            metrics.observe_request(
+                view_label(request), request.method, status,
+                time.perf_counter() - started, queries.count, queries.seconds,
+            )
+
+    async def __acall__(self, request):
+        queries = QueryCounter()
+        wrapper = await sync_to_async(_enter_execute_wrapper)(queries)
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            await sync_to_async(wrapper.__exit__)(None, None, None)
+            metrics.observe_request(
+                view_label(request), request.method, status,
+                time.perf_counter() - started, queries.count, queries.seconds,
+            )
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in per-request profiling (hammer_backendapi/profiling.py).
+
+    With PROFILING_ENABLED, a staff user can profile a request by sending
+    'X-Profile: 1' or adding '?profile=1'; PROFILING_SAMPLE_RATE (0..1)
+    additionally profiles that fraction of all requests. The profile id is
+    returned in the X-Profile-Id response header. Left out of the middleware
+    chain entirely when disabled.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def _is_staff(self, request):
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return user.is_staff
+        # API clients authenticate with DRF tokens, which run after middleware
+        from rest_framework.authentication import TokenAuthentication
+        from rest_framework.exceptions import AuthenticationFailed
+        try:
+            result = TokenAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        return bool(result and result[0].is_staff)
+
+    def _trigger(self, request):
+        if request.headers.get("X-Profile") == "1" or request.GET.get("profile") == "1":
+            return "requested" if self._is_staff(request) else None
+        rate = float(getattr(settings, "PROFILING_SAMPLE_RATE", 0) or 0)
+        if rate and random.random() < rate:
+            return "sampled"
+        return None
+
+    def __call__(self, request):
+        trigger = self._trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        from hammer_backendapi.profiling import RequestProfile
+
+        profile = RequestProfile()
+        status = 500
+        profile.start()
+        try:
+            with connection.execute_wrapper(profile.queries):
+                response = self.get_response(request)
+            status = response.status_code
+        finally:
+            profile.stop()
+            try:
+                profile_id = profile.save(request, status, trigger)
+            except OSError as e:
+                logger.warning("Could not save request profile: %s", e)
+                profile_id = None
+        if profile_id:
+            response["X-Profile-Id"] = profile_id
+        return response
+
+
+class QueryInspectorMiddleware:
+    """
+    Development/staging N+1 and slow-query detector
+    (hammer_backendapi/query_inspector.py). Enabled by QUERY_INSPECTOR_ENABLED;
+    read the results with `python manage.py query_report`.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_INSPECTOR_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from hammer_backendapi import query_inspector
+
+        recorder = query_inspector.QueryRecorder()
+        status = 500
+        try:
+            with connection.execute_wrapper(recorder):
+                response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            endpoint = f"{request.method} {view_label(request)}"
+            entry = query_inspector.analyse(recorder.queries, endpoint, status)
+            if entry["repeated"] or entry["slow"]:
+                logger.warning(
+                    "%s: %d queries, %d repeated shapes, %d slow statements",
+                    endpoint, entry["query_count"], len(entry["repeated"]), len(entry["slow"]),
+                )
+            try:
+                query_inspector.append_entry(entry)
+            except OSError as e:
+                logger.warning("Could not write query inspector report: %s", e)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compress large text/JSON responses: Brotli when the client accepts it and
+    the brotli package is installed, gzip otherwise. PDFs, images and other
+    already-compressed downloads are left alone.
+    """
+
+    min_length = 1024
+    compressible_types = ("application/json", "text/", "application/javascript")
+
+    def process_response(self, request, response):
+        content_type = response.get("Content-Type", "")
+        if not content_type.startswith(self.compressible_types) or response.has_header("Content-Encoding"):
+            return response
+        if not response.streaming and len(response.content) < self.min_length:
+            return response
+        if (
+            brotli is not None
+            and not response.streaming
+            and re.search(r"\bbr\b", request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        ):
+            patch_vary_headers(response, ("Accept-Encoding",))
+            compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+            if len(compressed) < len(response.content):
+                response.content = compressed
+                response["Content-Length"] = str(len(compressed))
+                response["Content-Encoding"] = "br"
+                etag = response.get("ETag")
+                if etag and etag.startswith('"'):
+                    response["ETag"] = "W/" + etag
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+# Frozen copies of hammer_backendapi/search.py at the time of this migration:
+# later changes to that module must not change what this migration does.
+SEARCH_FIELDS = ("full_name", "email", "nccer_number")
+FTS_TABLE = "hammer_backendapi_student_fts"
+
+
+def postgres_indexes():
+    from django.contrib.postgres.indexes import GinIndex, OpClass
+    from django.contrib.postgres.search import SearchVector
+    from django.db.models.functions import Upper
+
+    indexes = [
+        GinIndex(OpClass(Upper(field), name="gin_trgm_ops"), name=f"student_{field}_trgm")
+        for field in SEARCH_FIELDS
+    ]
+    indexes.append(GinIndex(SearchVector(*SEARCH_FIELDS, config="simple"), name="student_search_vector"))
+    return indexes
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    Student = apps.get_model("hammer_backendapi", "Student")
+    if vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for index in postgres_indexes():
+            schema_editor.add_index(Student, index)
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "full_name, email, nccer_number, teacher_id UNINDEXED, tokenize='trigram')"
+        )
+        schema_editor.execute(f"DELETE FROM {FTS_TABLE}")
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, full_name, email, nccer_number, teacher_id) "
+            f"SELECT id, full_name, COALESCE(email, ''), COALESCE(nccer_number, ''), teacher_id "
+            f"FROM {Student._meta.db_table}"
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        Student = apps.get_model("hammer_backendapi", "Student")
+        for index in postgres_indexes():
+            schema_editor.remove_index(Student, index)
+    elif vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+    """Trigram/full-text indexes for student search (see hammer_backendapi/search.py)."""
+
+    dependencies = [
+        ('hammer_backendapi', '0023_update_studentfile_content_type'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
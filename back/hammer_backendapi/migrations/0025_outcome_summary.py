@@ -0,0 +1,56 @@
+# Generated by Django 5.1.4 on 2026-10-19 07:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hammer_backendapi', '0024_student_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutcomeSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('all', 'All students'), ('organization', 'Organization'), ('region', 'Region'), ('state', 'State'), ('funding_source', 'Funding source')], max_length=20)),
+                ('key', models.PositiveIntegerField(help_text='Id of the organization/region/state/funding source; 0 = unassigned')),
+                ('cohort_year', models.PositiveSmallIntegerField(help_text='Year of start_date, or of created_at without one')),
+                ('stale_since', models.DateTimeField(blank=True, null=True)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+                ('student_count', models.PositiveIntegerField(default=0)),
+                ('finished_count', models.PositiveIntegerField(default=0, help_text='end_date on or before the refresh date')),
+                ('completed_50_hour_count', models.PositiveIntegerField(default=0)),
+                ('passed_osha_count', models.PositiveIntegerField(default=0)),
+                ('hammer_math_count', models.PositiveIntegerField(default=0)),
+                ('employability_count', models.PositiveIntegerField(default=0)),
+                ('job_interview_count', models.PositiveIntegerField(default=0)),
+                ('ruler_count', models.PositiveIntegerField(default=0)),
+                ('scored_count', models.PositiveIntegerField(default=0)),
+                ('improved_count', models.PositiveIntegerField(default=0)),
+                ('pretest_mean', models.FloatField(blank=True, null=True)),
+                ('posttest_mean', models.FloatField(blank=True, null=True)),
+                ('delta_mean', models.FloatField(blank=True, null=True)),
+                ('delta_stdev', models.FloatField(blank=True, null=True)),
+                ('delta_p25', models.FloatField(blank=True, null=True)),
+                ('delta_median', models.FloatField(blank=True, null=True)),
+                ('delta_p75', models.FloatField(blank=True, null=True)),
+                ('pretest_histogram', models.JSONField(blank=True, default=list)),
+                ('posttest_histogram', models.JSONField(blank=True, default=list)),
+                ('delta_histogram', models.JSONField(blank=True, default=list)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['start_date'], name='student_start_date'),
+        ),
+        migrations.AddIndex(
+            model_name='outcomesummary',
+            index=models.Index(condition=models.Q(('stale_since__isnull', False)), fields=['dimension'], name='outcome_summary_stale'),
+        ),
+        migrations.AddConstraint(
+            model_name='outcomesummary',
+            constraint=models.UniqueConstraint(fields=('dimension', 'key', 'cohort_year'), name='outcome_summary_bucket'),
+        ),
+    ]
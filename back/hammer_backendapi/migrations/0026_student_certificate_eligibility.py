@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-19 07:32
+
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hammer_backendapi', '0025_outcome_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='certificate_eligibility',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='certificates_issued',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='certificates_pending',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(condition=models.Q(('certificates_pending__gt', 0)), fields=['teacher', 'full_name'], name='student_certificate_queue'),
+        ),
+    ]
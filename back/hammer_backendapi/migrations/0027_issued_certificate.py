@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-19 07:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hammer_backendapi', '0026_student_certificate_eligibility'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssuedCertificate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(help_text="Certificate kind, or 'master' for the full set", max_length=50)),
+                ('template_version', models.CharField(help_text='Layout registry version and template/layout file hash', max_length=64)),
+                ('fields', models.JSONField(help_text='Values printed on the certificate')),
+                ('fingerprint', models.CharField(help_text='sha256 of kind, template version and fields', max_length=64)),
+                ('storage_key', models.CharField(max_length=255)),
+                ('sha256', models.CharField(help_text='sha256 of the PDF', max_length=64)),
+                ('size_bytes', models.PositiveIntegerField(default=0)),
+                ('issued_at', models.DateTimeField(auto_now_add=True)),
+                ('issued_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('student', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='issued_certificates', to='hammer_backendapi.student')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('student', 'kind', 'fingerprint'), name='issued_certificate_unique')],
+            },
+        ),
+    ]
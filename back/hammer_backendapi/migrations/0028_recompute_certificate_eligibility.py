@@ -0,0 +1,42 @@
+# Computes the certificate masks of existing students with the rules of
+# hammer_backendapi/eligibility.py at the time of writing. The rules are
+# copied here, not imported, so later rule changes don't rewrite history;
+# they come with their own data migration.
+
+import operator
+from functools import reduce
+
+from django.db import migrations
+from django.db.models import Case, F, Q, Value, When
+
+KINDS = ("portfolio", "nccer", "osha", "hammermath", "employability", "workforce")
+
+REQUIREMENTS = {
+    "portfolio": Q(disc_assessment_type__isnull=False, sixteen_types_assessment__isnull=False, enneagram_result__isnull=False),
+    "nccer": Q(hammer_math=True, nccer_number__isnull=False, end_date__isnull=False) & ~Q(nccer_number=""),
+    "osha": Q(passed_osha_10_exam=True, osha_completion_date__isnull=False),
+    "hammermath": Q(hammer_math=True, end_date__isnull=False),
+    "employability": Q(employability_skills=True, end_date__isnull=False),
+    "workforce": Q(complete_50_hour_training=True, end_date__isnull=False),
+}
+
+
+def recompute_eligibility(apps, schema_editor):
+    Student = apps.get_model("hammer_backendapi", "Student")
+    students = Student.objects.using(schema_editor.connection.alias)
+    students.update(certificate_eligibility=reduce(operator.add, (
+        Case(When(condition, then=Value(1 << KINDS.index(kind))), default=Value(0))
+        for kind, condition in REQUIREMENTS.items()
+    )))
+    students.update(certificates_pending=F("certificate_eligibility") - F("certificate_eligibility").bitand(F("certificates_issued")))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hammer_backendapi', '0027_issued_certificate'),
+    ]
+
+    operations = [
+        migrations.RunPython(recompute_eligibility, migrations.RunPython.noop),
+    ]
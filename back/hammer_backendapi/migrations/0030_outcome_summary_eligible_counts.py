@@ -0,0 +1,26 @@
+# Generated by Django 5.1.4 on 2026-10-19 08:10
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def mark_all_stale(apps, schema_editor):
+    # eligible_counts starts empty; the next read or refresh_outcome_analytics fills it in
+    OutcomeSummary = apps.get_model("hammer_backendapi", "OutcomeSummary")
+    OutcomeSummary.objects.using(schema_editor.connection.alias).update(stale_since=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hammer_backendapi', '0029_outcome_summary_end_dates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outcomesummary',
+            name='eligible_counts',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(mark_all_stale, migrations.RunPython.noop),
+    ]
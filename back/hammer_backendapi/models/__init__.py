@@ -1,2 +1,2 @@
-from .models import Teacher, Student, Organization, GenderIdentity, SixteenTypeAssessment, DiscAssessment, EnneagramResult, OshaType, FundingSource, State, Region, StudentFile
+from .models import Teacher, Student, Organization, GenderIdentity, SixteenTypeAssessment, DiscAssessment, EnneagramResult, OshaType, FundingSource, State, Region, StudentFile, OutcomeSummary, IssuedCertificate
 
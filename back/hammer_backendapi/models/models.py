@@ -124,11 +124,40 @@ class Student(models.Model):
     pretest_score = models.IntegerField(null=True, blank=True)
     posttest_score = models.IntegerField(null=True, blank=True)
 
+    # Certificates: bitmasks over eligibility.KINDS, kept current by hammer_backendapi/eligibility.py
+    certificate_eligibility = models.PositiveSmallIntegerField(default=0, editable=False)
+    certificates_issued = models.PositiveSmallIntegerField(default=0, editable=False)
+    certificates_pending = models.PositiveSmallIntegerField(default=0, editable=False)  # eligible, not issued
+
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Cohort-year ranges for outcome analytics refreshes
+            models.Index(fields=['start_date'], name='student_start_date'),
+            # A teacher's "ready to print" queue: only rows with pending certificates are indexed
+            models.Index(
+                fields=['teacher', 'full_name'],
+                condition=models.Q(certificates_pending__gt=0),
+                name='student_certificate_queue',
+            ),
+        ]
+
+    # Only ever written in SQL (eligibility.mark_issued/refresh), so a save of
+    # an instance loaded earlier can't put back a stale issued mask
+    SQL_MAINTAINED_FIELDS = ('certificates_issued', 'certificates_pending')
+
     def __str__(self):
         return self.full_name
 
+    def save(self, *args, **kwargs):
+        if not args and not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.SQL_MAINTAINED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
 
 import os
 import uuid
@@ -178,3 +207,91 @@ class StudentFile(models.Model):
     def file_size_mb(self):
         return round(self.size_bytes / (1024 * 1024), 2)
 
+
+
+# ===========================
+# Outcome analytics
+# ===========================
+class OutcomeSummary(models.Model):
+    """
+    Precomputed student outcomes for one (dimension, key, cohort year)
+    bucket, maintained by hammer_backendapi/analytics.py. A non-null
+    stale_since marks a bucket whose students changed since it was computed.
+    """
+    DIMENSION_CHOICES = [
+        ('all', 'All students'),
+        ('organization', 'Organization'),
+        ('region', 'Region'),
+        ('state', 'State'),
+        ('funding_source', 'Funding source'),
+    ]
+
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    key = models.PositiveIntegerField(help_text="Id of the organization/region/state/funding source; 0 = unassigned")
+    cohort_year = models.PositiveSmallIntegerField(help_text="Year of start_date, or of created_at without one")
+    stale_since = models.DateTimeField(null=True, blank=True)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    student_count = models.PositiveIntegerField(default=0)
+    # {ISO end_date: students}; whether they have finished depends on today, so
+    # finished_count is summed from it when read, never stored
+    end_dates = models.JSONField(default=dict, blank=True)
+    completed_50_hour_count = models.PositiveIntegerField(default=0)
+    passed_osha_count = models.PositiveIntegerField(default=0)
+    hammer_math_count = models.PositiveIntegerField(default=0)
+    employability_count = models.PositiveIntegerField(default=0)
+    job_interview_count = models.PositiveIntegerField(default=0)
+    ruler_count = models.PositiveIntegerField(default=0)
+    # {certificate kind: students whose certificate_eligibility has its bit}
+    eligible_counts = models.JSONField(default=dict, blank=True)
+
+    # Students with both a pretest and a posttest score
+    scored_count = models.PositiveIntegerField(default=0)
+    improved_count = models.PositiveIntegerField(default=0)
+    pretest_mean = models.FloatField(null=True, blank=True)
+    posttest_mean = models.FloatField(null=True, blank=True)
+    delta_mean = models.FloatField(null=True, blank=True)
+    delta_stdev = models.FloatField(null=True, blank=True)
+    delta_p25 = models.FloatField(null=True, blank=True)
+    delta_median = models.FloatField(null=True, blank=True)
+    delta_p75 = models.FloatField(null=True, blank=True)
+    pretest_histogram = models.JSONField(default=list, blank=True)
+    posttest_histogram = models.JSONField(default=list, blank=True)
+    delta_histogram = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'key', 'cohort_year'], name='outcome_summary_bucket'),
+        ]
+        indexes = [
+            models.Index(fields=['dimension'], condition=models.Q(stale_since__isnull=False), name='outcome_summary_stale'),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension} {self.key} ({self.cohort_year})"
+
+
+# ===========================
+# Issued certificates
+# ===========================
+class IssuedCertificate(models.Model):
+    """A certificate PDF rendered once into storage (see hammer_backendapi/issuance.py)."""
+    # Kept when the student is deleted: the audit trail outlives the roster
+    student = models.ForeignKey(Student, on_delete=models.SET_NULL, null=True, blank=True, related_name='issued_certificates')
+    kind = models.CharField(max_length=50, help_text="Certificate kind, or 'master' for the full set")
+    template_version = models.CharField(max_length=64, help_text="Layout registry version and template/layout file hash")
+    fields = models.JSONField(help_text="Values printed on the certificate")
+    fingerprint = models.CharField(max_length=64, help_text="sha256 of kind, template version and fields")
+    storage_key = models.CharField(max_length=255)
+    sha256 = models.CharField(max_length=64, help_text="sha256 of the PDF")
+    size_bytes = models.PositiveIntegerField(default=0)
+    issued_at = models.DateTimeField(auto_now_add=True)
+    issued_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'kind', 'fingerprint'], name='issued_certificate_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} certificate for {self.fields.get('full_name') or self.student_id}"
@@ -0,0 +1,175 @@
+# hammer_backendapi/profiling.py
+"""
+Per-request profiles
+--------------------
+Used by ProfilingMiddleware (hammer_backendapi/middleware.py). Each profiled
+request is saved under PROFILING_DIR as three files sharing one id:
+
+- <id>.prof       cProfile stats (open with pstats, snakeviz, ...)
+- <id>.collapsed  wall-clock stack samples in collapsed format, one
+                  "frame;frame;frame count" line per stack; feed it to
+                  flamegraph.pl or speedscope
+- <id>.json       URL, user, status, wall/CPU time, query log, top functions
+
+Recent profiles are listed in the admin at /admin/profiles/.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+
+PROFILE_EXTENSIONS = (".prof", ".collapsed", ".json")
+
+
+def profile_dir() -> str:
+    return str(getattr(settings, "PROFILING_DIR", settings.BASE_DIR / "profiles"))
+
+
+class StackSampler(threading.Thread):
+    """Sample one thread's stack every ``interval`` seconds into collapsed-stack counts."""
+
+    def __init__(self, thread_id, interval=0.005):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class QueryLog:
+    """execute_wrapper recording each statement and its duration."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({"sql": sql, "ms": round((time.perf_counter() - started) * 1000, 3)})
+
+
+class RequestProfile:
+    """cProfile + stack sampler + query log around one request."""
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.sampler = StackSampler(threading.get_ident(), getattr(settings, "PROFILING_SAMPLE_INTERVAL", 0.005))
+        self.queries = QueryLog()
+
+    def start(self):
+        self.wall_started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.sampler.start()
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        self.sampler.stop()
+        self.wall_seconds = time.perf_counter() - self.wall_started
+        self.cpu_seconds = time.process_time() - self.cpu_started
+
+    def save(self, request, status, trigger) -> str:
+        """Write the three profile files; returns the profile id."""
+        directory = profile_dir()
+        os.makedirs(directory, exist_ok=True)
+        # Sortable by time; the random part keeps same-second requests apart
+        profile_id = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}-{secrets.token_hex(4)}"
+        base = os.path.join(directory, profile_id)
+
+        self.profiler.dump_stats(base + ".prof")
+        with open(base + ".collapsed", "w") as f:
+            f.write(self.sampler.collapsed())
+
+        top = io.StringIO()
+        pstats.Stats(self.profiler, stream=top).sort_stats("cumulative").print_stats(30)
+
+        user = getattr(request, "user", None)
+        meta = {
+            "id": profile_id,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "method": request.method,
+            "path": request.get_full_path(),
+            "user": user.get_username() if user is not None and user.is_authenticated else None,
+            "status": status,
+            "trigger": trigger,
+            "wall_ms": round(self.wall_seconds * 1000, 1),
+            "cpu_ms": round(self.cpu_seconds * 1000, 1),
+            "query_count": len(self.queries.queries),
+            "query_ms": round(sum(q["ms"] for q in self.queries.queries), 3),
+            "queries": self.queries.queries,
+            "top_functions": top.getvalue(),
+        }
+        with open(base + ".json", "w") as f:
+            json.dump(meta, f, indent=2)
+
+        prune_profiles(getattr(settings, "PROFILING_KEEP", 200))
+        return profile_id
+
+
+def prune_profiles(keep):
+    """Keep only the newest ``keep`` profiles."""
+    directory = profile_dir()
+    ids = sorted({name.rsplit(".", 1)[0] for name in os.listdir(directory) if name.endswith(PROFILE_EXTENSIONS)})
+    for profile_id in ids[:-keep] if keep else []:
+        for ext in PROFILE_EXTENSIONS:
+            try:
+                os.remove(os.path.join(directory, profile_id + ext))
+            except FileNotFoundError:
+                pass
+
+
+def recent_profiles(limit=100):
+    """Metadata of the newest profiles, newest first (query log and stats omitted)."""
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    names = sorted((n for n in os.listdir(directory) if n.endswith(".json")), reverse=True)[:limit]
+    profiles = []
+    for name in names:
+        try:
+            with open(os.path.join(directory, name)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        meta.pop("queries", None)
+        meta.pop("top_functions", None)
+        profiles.append(meta)
+    return profiles
+
+
+def profile_file_path(profile_id, ext):
+    """Path of one profile file, or None if the id/extension is not valid."""
+    if ext not in PROFILE_EXTENSIONS or os.path.basename(profile_id) != profile_id:
+        return None
+    path = os.path.join(profile_dir(), profile_id + ext)
+    return path if os.path.isfile(path) else None
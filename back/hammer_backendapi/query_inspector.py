@@ -0,0 +1,148 @@
+# hammer_backendapi/query_inspector.py
+"""
+Slow-query and N+1 detection
+----------------------------
+QueryInspectorMiddleware (hammer_backendapi/middleware.py) records every SQL
+statement a request runs. Statements are reduced to a "shape" (literals and
+parameters replaced by ?), so the same query run for each row of a list,
+e.g. one uploaded_by lookup per file, shows up as a single shape repeated
+N times.
+
+Each request appends one JSON line to QUERY_INSPECTOR_LOG with its query
+count/time, repeated shapes (likely N+1) and statements slower than
+QUERY_INSPECTOR_SLOW_MS. `python manage.py query_report` aggregates the
+log per endpoint.
+"""
+
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from django.conf import settings
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"%s|\?")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_SKIP_FILES = {os.path.abspath(__file__), os.path.join(_APP_DIR, "middleware.py")}
+
+
+def sql_shape(sql: str) -> str:
+    """Normalise a statement so per-row repeats of the same query compare equal."""
+    shape = _STRING_RE.sub("?", sql)
+    shape = _NUMBER_RE.sub("?", shape)
+    shape = _PARAM_RE.sub("?", shape)
+    shape = _IN_LIST_RE.sub("(...)", shape)
+    return _SPACE_RE.sub(" ", shape).strip()
+
+
+def _app_origin():
+    """First frame in this app's code that led to the query (file:line in function)."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR) and filename not in _SKIP_FILES:
+            return f"{os.path.relpath(filename, os.path.dirname(_APP_DIR))}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+class QueryRecorder:
+    """execute_wrapper recording statement, duration and the app code that issued it."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - started) * 1000, _app_origin()))
+
+
+def analyse(queries, endpoint, status, repeat_threshold=None, slow_ms=None) -> dict:
+    """Summarise one request's queries into a report entry."""
+    repeat_threshold = repeat_threshold or getattr(settings, "QUERY_INSPECTOR_REPEAT_THRESHOLD", 5)
+    slow_ms = slow_ms or getattr(settings, "QUERY_INSPECTOR_SLOW_MS", 100)
+
+    shapes = Counter()
+    origins = {}
+    shape_ms = defaultdict(float)
+    slow = []
+    for sql, ms, origin in queries:
+        shape = sql_shape(sql)
+        shapes[shape] += 1
+        shape_ms[shape] += ms
+        origins.setdefault(shape, origin)
+        if ms >= slow_ms:
+            slow.append({"sql": sql[:2000], "ms": round(ms, 3), "origin": origin})
+
+    repeated = [
+        {"shape": shape, "count": count, "ms": round(shape_ms[shape], 3), "origin": origins[shape]}
+        for shape, count in shapes.most_common()
+        if count >= repeat_threshold
+    ]
+    return {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "endpoint": endpoint,
+        "status": status,
+        "query_count": len(queries),
+        "query_ms": round(sum(ms for _, ms, _ in queries), 3),
+        "repeated": repeated,
+        "slow": slow,
+    }
+
+
+def log_path() -> str:
+    return str(getattr(settings, "QUERY_INSPECTOR_LOG", settings.BASE_DIR / "logs" / "query_inspector.jsonl"))
+
+
+def append_entry(entry: dict):
+    """Append one report line; single O_APPEND writes keep lines intact across workers."""
+    path = log_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def read_entries(path=None):
+    path = path or log_path()
+    if not os.path.exists(path):
+        return
+    with open(path) as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def aggregate(entries) -> dict:
+    """Per-endpoint totals, worst N+1 shapes and slowest statements."""
+    endpoints = {}
+    for entry in entries:
+        stats = endpoints.setdefault(entry["endpoint"], {
+            "requests": 0, "queries": 0, "query_ms": 0.0, "max_queries": 0,
+            "repeated": {}, "slow": {},
+        })
+        stats["requests"] += 1
+        stats["queries"] += entry["query_count"]
+        stats["query_ms"] += entry["query_ms"]
+        stats["max_queries"] = max(stats["max_queries"], entry["query_count"])
+        for item in entry["repeated"]:
+            shape = stats["repeated"].setdefault(item["shape"], {"requests": 0, "max_count": 0, "origin": item["origin"]})
+            shape["requests"] += 1
+            shape["max_count"] = max(shape["max_count"], item["count"])
+        for item in entry["slow"]:
+            shape = stats["slow"].setdefault(sql_shape(item["sql"]), {"count": 0, "max_ms": 0.0, "origin": item["origin"]})
+            shape["count"] += 1
+            shape["max_ms"] = max(shape["max_ms"], item["ms"])
+    return endpoints
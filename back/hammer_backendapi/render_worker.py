@@ -0,0 +1,25 @@
+"""
+Bootstrap for PDF render pool worker processes.
+
+Kept outside the views package: spawned workers unpickle the initializer
+before Django is set up, and importing hammer_backendapi.views at that point
+would load models too early.
+"""
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def init_worker(template_path):
+    """ProcessPoolExecutor initializer: set up Django, then warm render caches."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "hammer_backendproject.settings")
+    import django
+    django.setup()
+
+    from hammer_backendapi.views.utils.render_pool import _preload
+    try:
+        _preload(template_path)
+    except Exception as e:
+        logger.warning(f"Render worker preload failed: {e}")
@@ -0,0 +1,43 @@
+# hammer_backendapi/renderers.py
+"""
+API renderers
+-------------
+ORJSONRenderer is the production JSON renderer: compact UTF-8 output from
+orjson, with anything orjson can't encode natively (Decimal, lazy strings,
+datetimes, querysets, ...) handed to DRF's own encoder so the output matches
+JSONRenderer. Falls back to JSONRenderer when orjson isn't installed.
+
+IndentedJSONRenderer is for development only (settings/development.py),
+together with the browsable API.
+"""
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+_drf_default = JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        # Datetimes go through DRF's encoder to keep its "Z"/millisecond format
+        return orjson.dumps(
+            data,
+            default=_drf_default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+
+
+class IndentedJSONRenderer(JSONRenderer):
+    """Pretty-printed JSON for local development."""
+
+    def get_indent(self, accepted_media_type, renderer_context):
+        return super().get_indent(accepted_media_type, renderer_context) or 2
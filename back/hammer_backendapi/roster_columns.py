@@ -0,0 +1,35 @@
+# hammer_backendapi/roster_columns.py
+"""
+Roster columns
+--------------
+The columns of a student roster spreadsheet. The exports
+(views/exports.py) write them; the roster import (roster_import.py)
+accepts their headers, so an exported file imports as-is.
+"""
+
+# (column header, values_list() path)
+EXPORT_COLUMNS = (
+    ("Student ID", "id"),
+    ("Full Name", "full_name"),
+    ("Email", "email"),
+    ("NCCER Number", "nccer_number"),
+    ("Teacher", "teacher__full_name"),
+    ("Organization", "teacher__organization__name"),
+    ("State", "teacher__state__abbreviation"),
+    ("Region", "teacher__region__name"),
+    ("Funding Source", "funding_source__name"),
+    ("Gender Identity", "gender_identity__gender"),
+    ("Start Date", "start_date"),
+    ("End Date", "end_date"),
+    ("Completed 50-Hour Training", "complete_50_hour_training"),
+    ("Passed OSHA 10 Exam", "passed_osha_10_exam"),
+    ("OSHA Completion Date", "osha_completion_date"),
+    ("OSHA Type", "osha_type__name"),
+    ("Hammer Math", "hammer_math"),
+    ("Employability Skills", "employability_skills"),
+    ("Job Interview Skills", "job_interview_skills"),
+    ("Passed Ruler Assessment", "passed_ruler_assessment"),
+    ("Pretest Score", "pretest_score"),
+    ("Posttest Score", "posttest_score"),
+    ("Created", "created_at"),
+)
@@ -0,0 +1,268 @@
+# hammer_backendapi/roster_import.py
+"""
+Roster import
+-------------
+Bulk-create a teacher's students from a CSV or XLSX file, for onboarding a
+whole cohort at once (POST /api/students/import/ and the import_roster
+management command).
+
+Reading stops as soon as a file has more than ROSTER_IMPORT_MAX_ROWS
+students. Every row is checked before anything is written - cell formats,
+lookup names and the same cross-field rules as StudentSerializer.validate -
+and any error rejects the whole file with per-row messages. Lookup names
+(funding source, OSHA type, ...) resolve through one preloaded name -> id
+map, the cached options behind /api/details/, instead of a query per
+cell. Valid files are inserted with chunked bulk_create() in one
+transaction, then the new rows are added to the search index and their
+outcome analytics buckets are marked stale (bulk_create sends no post_save);
+certificate eligibility is computed on each instance beforehand.
+
+Headers are matched loosely ("Full Name", "full_name", "NCCER #"...),
+and a file from /api/students/export.xlsx imports as-is; columns that
+aren't student fields (Teacher, Created, ...) are ignored.
+"""
+
+import datetime
+import re
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from hammer_backendapi import analytics, eligibility, search
+from hammer_backendapi.lookups import lookup_options
+from hammer_backendapi.models import Student
+from hammer_backendapi.roster_columns import EXPORT_COLUMNS
+from hammer_backendapi.serializers.serializers import student_rule_errors
+from hammer_backendapi.views.utils.spreadsheet import TooManyRows, excel_date, read_csv, read_xlsx
+
+BATCH_SIZE = 500
+MAX_COLUMNS = 200  # cells further right can't be student fields and are not read
+
+TEXT_FIELDS = {"full_name": 255, "email": 254, "nccer_number": 50}  # field -> max length
+DATE_FIELDS = ("start_date", "end_date", "osha_completion_date")
+BOOLEAN_FIELDS = (
+    "complete_50_hour_training", "passed_osha_10_exam", "hammer_math",
+    "employability_skills", "job_interview_skills", "passed_ruler_assessment",
+)
+SCORE_FIELDS = ("pretest_score", "posttest_score")
+# field -> (lookup_options() key, name column)
+LOOKUP_FIELDS = {
+    "gender_identity": ("gender_identities", "gender"),
+    "disc_assessment_type": ("disc_assessments", "type_name"),
+    "sixteen_types_assessment": ("sixteen_type_assessments", "type_name"),
+    "enneagram_result": ("enneagram_results", "result_name"),
+    "osha_type": ("osha_types", "name"),
+    "funding_source": ("funding_sources", "name"),
+}
+IMPORT_FIELDS = (*TEXT_FIELDS, *DATE_FIELDS, *BOOLEAN_FIELDS, *SCORE_FIELDS, *LOOKUP_FIELDS)
+
+_EXTRA_ALIASES = {
+    "full_name": ("name", "student", "student_name"),
+    "email": ("email_address", "student_email"),
+    "nccer_number": ("nccer", "nccer_id", "nccer_no"),
+    "complete_50_hour_training": ("50_hour_training", "completed_50_hours"),
+    "passed_osha_10_exam": ("osha_10", "passed_osha_10", "osha_10_passed"),
+    "pretest_score": ("pre_test_score", "pretest"),
+    "posttest_score": ("post_test_score", "posttest"),
+    "gender_identity": ("gender",),
+    "disc_assessment_type": ("disc", "disc_assessment", "disc_type"),
+    "sixteen_types_assessment": ("16_types", "sixteen_types", "16_type", "16_personalities"),
+    "enneagram_result": ("enneagram",),
+    "funding_source": ("funding",),
+}
+
+_TRUE = {"yes", "y", "true", "t", "1", "x"}
+_FALSE = {"no", "n", "false", "f", "0", ""}
+_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%Y/%m/%d")
+
+
+def _normalise_header(header):
+    return re.sub(r"[^a-z0-9]+", "_", str(header or "").lower().replace("#", "number")).strip("_")
+
+
+def _header_aliases():
+    aliases = {field: field for field in IMPORT_FIELDS}
+    aliases.update({f"{field}_id": field for field in LOOKUP_FIELDS})
+    for field, extra in _EXTRA_ALIASES.items():
+        aliases.update({alias: field for alias in extra})
+    for header, path in EXPORT_COLUMNS:
+        field = path.split("__")[0]
+        if field in IMPORT_FIELDS:
+            aliases[_normalise_header(header)] = field
+    return aliases
+
+
+HEADER_ALIASES = _header_aliases()
+
+
+def lookup_maps():
+    """{field: {casefolded name or str(id): id}} for every lookup field, from the cached options."""
+    options = lookup_options()
+    maps = {}
+    for field, (key, name_column) in LOOKUP_FIELDS.items():
+        maps[field] = {}
+        for option in options[key]:
+            maps[field][str(option["id"])] = option["id"]
+            maps[field][str(option[name_column]).strip().casefold()] = option["id"]
+    return maps
+
+
+# ---- cell parsing (each raises ValueError with a user-facing message) ----
+def _text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = _text(value).lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError("Expected yes or no.")
+
+
+def _parse_date(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return excel_date(value)
+    text = _text(value)
+    if not text:
+        return None
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError("Expected a date like 2025-01-31 or 01/31/2025.")
+
+
+def _parse_score(value):
+    text = _text(value)
+    if not text:
+        return None
+    try:
+        score = float(text)
+    except ValueError:
+        raise ValueError("Expected a whole number from 0 to 100.")
+    if not score.is_integer() or not 0 <= score <= 100:
+        raise ValueError("Expected a whole number from 0 to 100.")
+    return int(score)
+
+
+def _parse_row(cells, columns, lookups):
+    """(values, errors) for one row; ``columns`` maps cell index -> field."""
+    values, errors = {}, {}
+    for index, field in columns.items():
+        raw = cells[index] if index < len(cells) else None
+        try:
+            if field in TEXT_FIELDS:
+                text = _text(raw)
+                if len(text) > TEXT_FIELDS[field]:
+                    raise ValueError(f"At most {TEXT_FIELDS[field]} characters.")
+                if field == "email" and text:
+                    validate_email(text)
+                values[field] = text or None
+            elif field in DATE_FIELDS:
+                values[field] = _parse_date(raw)
+            elif field in BOOLEAN_FIELDS:
+                values[field] = _parse_bool(raw)
+            elif field in SCORE_FIELDS:
+                values[field] = _parse_score(raw)
+            else:
+                name = _text(raw)
+                if name and name.casefold() not in lookups[field]:
+                    raise ValueError(f"Unknown value '{name}'.")
+                values[f"{field}_id"] = lookups[field].get(name.casefold()) if name else None
+        except ValidationError:
+            errors[field] = "Enter a valid email address."
+        except ValueError as e:
+            error_key = f"{field}_id" if field in LOOKUP_FIELDS else field
+            errors[error_key] = str(e)
+
+    if not values.get("full_name") and "full_name" not in errors:
+        errors["full_name"] = "This field is required."
+    errors.update({
+        field: message
+        for field, message in student_rule_errors(
+            start_date=values.get("start_date"),
+            end_date=values.get("end_date"),
+            passed_osha_10_exam=values.get("passed_osha_10_exam", False),
+            osha_completion_date=values.get("osha_completion_date"),
+            osha_type=values.get("osha_type_id"),
+        ).items()
+        if field not in errors
+    })
+    return values, errors
+
+
+def read_roster(data, filename, max_rows=None):
+    """
+    Non-blank (row number, cells) rows of an uploaded roster, at most
+    ``max_rows`` of them (TooManyRows otherwise); the format comes from the
+    file name (.csv or .xlsx).
+    """
+    name = (filename or "").lower()
+    if name.endswith(".xlsx"):
+        return read_xlsx(data, max_rows=max_rows, max_columns=MAX_COLUMNS)
+    if name.endswith(".csv"):
+        return read_csv(data, max_rows=max_rows, max_columns=MAX_COLUMNS)
+    raise ValueError("Upload a .csv or .xlsx file.")
+
+
+def import_roster(teacher, data, filename, dry_run=False):
+    """
+    Validate every row of a roster file and, if all pass (and not
+    ``dry_run``), create the students for ``teacher``. Returns
+    {"rows", "created", "ids", "errors": [{"row", "errors"}], "ignored_columns"};
+    ``row`` is the spreadsheet row number. Raises ValueError for a file
+    that can't be imported at all.
+    """
+    max_rows = settings.ROSTER_IMPORT_MAX_ROWS
+    try:
+        # Reading stops at the cap, so an oversized file is never held in full
+        rows = read_roster(data, filename, max_rows=max_rows + 1)  # + the header row
+    except TooManyRows:
+        raise ValueError(f"At most {max_rows} students per file; this one has more.")
+    if not rows:
+        raise ValueError("The file is empty.")
+    (_, header), data_rows = rows[0], rows[1:]
+
+    columns, ignored = {}, []
+    for index, title in enumerate(header):
+        field = HEADER_ALIASES.get(_normalise_header(title))
+        if field and field not in columns.values():
+            columns[index] = field
+        elif _text(title):
+            ignored.append(_text(title))
+    if "full_name" not in columns.values():
+        raise ValueError("No 'Full Name' column found in the header row.")
+
+    lookups = lookup_maps()
+    students, errors = [], []
+    for number, cells in data_rows:
+        values, row_errors = _parse_row(cells, columns, lookups)
+        if row_errors:
+            errors.append({"row": number, "errors": row_errors})
+        else:
+            student = Student(teacher=teacher, **values)
+            eligibility.apply(student)
+            students.append(student)
+
+    result = {"rows": len(data_rows), "created": 0, "ids": [], "errors": errors, "ignored_columns": ignored}
+    if errors or dry_run:
+        return result
+
+    with transaction.atomic():
+        created = Student.objects.bulk_create(students, batch_size=BATCH_SIZE)
+        ids = [student.pk for student in created]
+        search.rebuild_index(student_ids=ids)
+        analytics.mark_students_stale(Student.objects.filter(pk__in=ids))
+    result.update(created=len(ids), ids=ids)
+    return result
@@ -0,0 +1,191 @@
+# hammer_backendapi/search.py
+"""
+Student search
+--------------
+Ranked type-ahead search over a teacher's students by full name, email and
+NCCER number, served from an index on each database backend:
+
+- PostgreSQL: pg_trgm GIN indexes on UPPER(column) - the expression Django's
+  icontains compiles to, so the admin's search_fields use them too - and a
+  GIN index on the 'simple' tsvector of the three columns. Matches are
+  scored by the best trigram similarity plus ts_rank. Postgres keeps these
+  indexes current itself.
+- SQLite: an FTS5 shadow table with the trigram tokenizer (FTS_TABLE,
+  rowid = student id) scored with bm25(). post_save/post_delete signals
+  keep it current; rebuild_index() refills it after writes that bypass
+  signals (bulk_create, QuerySet.update).
+
+On both, the match tier comes first (_match_tier: exact value, then a whole
+word of the name, then a prefix) and the backend's score only orders
+students within a tier - bm25() is close to 0 on small rosters, so alone it
+would rank "Bob Smithers" and "Alice Smith" at random for "smith".
+
+Terms shorter than three characters can't use trigrams and fall back to a
+prefix match.
+"""
+
+import weakref
+
+from django.db import connection, connections
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from hammer_backendapi.models import Student
+
+SEARCH_FIELDS = ("full_name", "email", "nccer_number")
+FTS_TABLE = "hammer_backendapi_student_fts"
+MIN_TRIGRAM_LENGTH = 3
+
+# Connections that have seen the FTS table committed; not checked again
+_sqlite_index_ready = weakref.WeakSet()
+
+
+def _prefix_match(students, term):
+    condition = Q()
+    for field in SEARCH_FIELDS:
+        condition |= Q(**{f"{field}__istartswith": term})
+    return students.filter(condition).annotate(search_rank=_match_tier(term))
+
+
+def _match_tier(term):
+    """3: a field equals ``term``; 2: a whole word of the name does; 1: a field or name word starts with it; else 0."""
+    exact = Q()
+    prefix = Q(full_name__icontains=f" {term}")
+    for field in SEARCH_FIELDS:
+        exact |= Q(**{f"{field}__iexact": term})
+        prefix |= Q(**{f"{field}__istartswith": term})
+    word = Q(full_name__istartswith=f"{term} ") | Q(full_name__iendswith=f" {term}") | Q(full_name__icontains=f" {term} ")
+    return Case(
+        When(exact, then=Value(3.0)),
+        When(word, then=Value(2.0)),
+        When(prefix, then=Value(1.0)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+# ---- PostgreSQL ----
+def postgres_indexes():
+    """The search indexes, for anyone rebuilding them (migration 0024 keeps its own frozen copy)."""
+    from django.contrib.postgres.indexes import GinIndex, OpClass
+    from django.contrib.postgres.search import SearchVector
+    from django.db.models.functions import Upper
+
+    indexes = [
+        GinIndex(OpClass(Upper(field), name="gin_trgm_ops"), name=f"student_{field}_trgm")
+        for field in SEARCH_FIELDS
+    ]
+    indexes.append(GinIndex(SearchVector(*SEARCH_FIELDS, config="simple"), name="student_search_vector"))
+    return indexes
+
+
+def _postgres_search(students, term):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+
+    query = SearchQuery(term, config="simple", search_type="websearch")
+    contains = Q()
+    for field in SEARCH_FIELDS:
+        contains |= Q(**{f"{field}__icontains": term})
+    return (
+        students.annotate(search_vector=SearchVector(*SEARCH_FIELDS, config="simple"))
+        .filter(contains | Q(search_vector=query))
+        .annotate(search_score=Greatest(*(TrigramSimilarity(field, term) for field in SEARCH_FIELDS))
+                  + SearchRank(F("search_vector"), query))
+        # Squashed into [0, 1) so it orders students within a tier
+        .annotate(search_rank=_match_tier(term) + F("search_score") / (F("search_score") + 2.0))
+    )
+
+
+# ---- SQLite (FTS5) ----
+def _sqlite_index_exists(conn):
+    conn = connections[conn.alias]  # the wrapper itself, not the default-connection proxy
+    if conn in _sqlite_index_ready:
+        return True
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [FTS_TABLE])
+        exists = cursor.fetchone() is not None
+    # Inside a transaction the table may yet be rolled back; check again next time
+    if exists and not conn.in_atomic_block:
+        _sqlite_index_ready.add(conn)
+    return exists
+
+
+def create_sqlite_index(conn=connection):
+    """Create and fill the FTS5 shadow table if it doesn't exist yet."""
+    if _sqlite_index_exists(conn):
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            "full_name, email, nccer_number, teacher_id UNINDEXED, tokenize='trigram')"
+        )
+    rebuild_index(conn)
+
+
+def rebuild_index(conn=connection, student_ids=None):
+    """Re-copy all (or the given) students into the FTS5 table; a no-op on PostgreSQL."""
+    if conn.vendor != "sqlite":
+        return
+    if not _sqlite_index_exists(conn):
+        create_sqlite_index(conn)  # filled from scratch
+        return
+    copy = (
+        f"INSERT INTO {FTS_TABLE} (rowid, full_name, email, nccer_number, teacher_id) "
+        f"SELECT id, full_name, COALESCE(email, ''), COALESCE(nccer_number, ''), teacher_id "
+        f"FROM {Student._meta.db_table}"
+    )
+    with conn.cursor() as cursor:
+        if student_ids is None:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(copy)
+            return
+        student_ids = list(student_ids)
+        # Chunked to stay under SQLite's bound-parameter limit
+        for start in range(0, len(student_ids), 500):
+            chunk = student_ids[start:start + 500]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk)
+            cursor.execute(f"{copy} WHERE id IN ({placeholders})", chunk)
+
+
+def _fts_query(term):
+    # Each word is a quoted substring; all of them must match
+    words = [word for word in term.split() if len(word) >= MIN_TRIGRAM_LENGTH]
+    return " ".join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+def _sqlite_search(students, teacher_id, term):
+    create_sqlite_index()
+    query = _fts_query(term)
+    matches = RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND teacher_id = %s", [query, teacher_id])
+    # bm25() is lower-is-better; weight name matches over email / NCCER number. Squashed into [0, 1).
+    score = f"(SELECT -bm25({FTS_TABLE}, 10.0, 5.0, 5.0) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = {Student._meta.db_table}.id)"
+    return students.filter(pk__in=matches).annotate(
+        search_rank=_match_tier(term) + RawSQL(f"{score} / ({score} + 1.0)", [query, query], output_field=FloatField())
+    )
+
+
+# ---- public API ----
+def search_students(teacher, term, limit=20):
+    """The teacher's students matching ``term``, best match first, each with a ``search_rank``."""
+    term = " ".join(term.split())
+    students = Student.objects.filter(teacher=teacher)
+    if len(term.replace(" ", "")) < MIN_TRIGRAM_LENGTH or (connection.vendor == "sqlite" and not _fts_query(term)):
+        results = _prefix_match(students, term)
+    elif connection.vendor == "postgresql":
+        results = _postgres_search(students, term)
+    elif connection.vendor == "sqlite":
+        results = _sqlite_search(students, teacher.pk, term)
+    else:
+        results = _prefix_match(students, term)
+    return list(results.order_by("-search_rank", "full_name")[:limit])
+
+
+@receiver(post_save, sender=Student, dispatch_uid="student-search-save")
+@receiver(post_delete, sender=Student, dispatch_uid="student-search-delete")
+def _reindex_student(sender, instance, using, **kwargs):
+    # Re-copies the row, or just drops it once it's deleted
+    rebuild_index(connections[using], [instance.pk])
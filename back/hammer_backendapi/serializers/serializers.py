@@ -1,6 +1,8 @@
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db.models import BooleanField, DateField, ExpressionWrapper, F, IntegerField, Q, Value
 from rest_framework import serializers
 
+from hammer_backendapi import eligibility
 from hammer_backendapi.models import (
     Student,
     StudentFile,
@@ -81,6 +83,30 @@ class StudentFileSerializer(serializers.ModelSerializer):
 
 
 # ---- Main serializer ----
+RULE_MESSAGES = {
+    "end_date": "Must be on/after start_date.",
+    "osha_completion_date": "Required if OSHA exam passed.",
+    "osha_type_id": "Required if OSHA exam passed.",
+}
+
+
+def student_rule_errors(start_date, end_date, passed_osha_10_exam, osha_completion_date, osha_type):
+    """
+    Cross-field rules for a student's final values, as {field: message}.
+    Shared by StudentSerializer.validate and the bulk roster import;
+    bulk_rule_errors() is the same rules in SQL.
+    """
+    errors = {}
+    if start_date and end_date and end_date < start_date:
+        errors["end_date"] = RULE_MESSAGES["end_date"]
+    if passed_osha_10_exam:
+        if not osha_completion_date:
+            errors["osha_completion_date"] = RULE_MESSAGES["osha_completion_date"]
+        if not osha_type:
+            errors["osha_type_id"] = RULE_MESSAGES["osha_type_id"]
+    return errors
+
+
 class StudentSerializer(serializers.ModelSerializer):
     # READ: nested related objects (safe, explicit)
     gender_identity = GenderIdentitySerializer(read_only=True)
@@ -142,6 +168,10 @@ class StudentSerializer(serializers.ModelSerializer):
         required=False, allow_null=True, min_value=0, max_value=100
     )
 
+    # READ: certificate kinds from the stored eligibility masks
+    eligible_certificates = serializers.SerializerMethodField()
+    pending_certificates = serializers.SerializerMethodField()
+
     class Meta:
         model = Student
         read_only_fields = ("id", "teacher", "created_at")
@@ -163,6 +193,8 @@ class StudentSerializer(serializers.ModelSerializer):
             "pretest_score",
             "posttest_score",
             "created_at",
+            "eligible_certificates",
+            "pending_certificates",
             # nested read-only
             "gender_identity",
             "disc_assessment_type",
@@ -181,24 +213,125 @@ class StudentSerializer(serializers.ModelSerializer):
 
     def validate(self, attrs):
         """Business rules: end_date after start_date; OSHA fields if passed."""
-        start = attrs.get("start_date") or getattr(self.instance, "start_date", None)
-        end = attrs.get("end_date") or getattr(self.instance, "end_date", None)
-        if start and end and end < start:
-            raise serializers.ValidationError({"end_date": "Must be on/after start_date."})
+        def value(field):
+            # When updating, a field not in the payload falls back to the instance value
+            return attrs.get(field) or getattr(self.instance, field, None)
 
         passed_osha = attrs.get("passed_osha_10_exam")
-        # When updating, if flag not present, fall back to instance value
         if passed_osha is None:
             passed_osha = getattr(self.instance, "passed_osha_10_exam", False)
 
-        if passed_osha:
-            osha_date = attrs.get("osha_completion_date") or getattr(
-                self.instance, "osha_completion_date", None
-            )
-            osha_type = attrs.get("osha_type") or getattr(self.instance, "osha_type", None)
-            if not osha_date:
-                raise serializers.ValidationError({"osha_completion_date": "Required if OSHA exam passed."})
-            if not osha_type:
-                raise serializers.ValidationError({"osha_type_id": "Required if OSHA exam passed."})
+        errors = student_rule_errors(
+            start_date=value("start_date"),
+            end_date=value("end_date"),
+            passed_osha_10_exam=passed_osha,
+            osha_completion_date=value("osha_completion_date"),
+            osha_type=value("osha_type"),
+        )
+        if errors:
+            # One error at a time, as this endpoint always reported them
+            field, message = next(iter(errors.items()))
+            raise serializers.ValidationError({field: message})
+        return attrs
+
+    def get_eligible_certificates(self, obj):
+        return eligibility.kinds(obj.certificate_eligibility)
+
+    def get_pending_certificates(self, obj):
+        return eligibility.kinds(obj.certificates_pending)
+
+
+# ---- Bulk progress updates ----
+class StudentProgressSerializer(serializers.Serializer):
+    """The class-wide progress fields a bulk PATCH may set (all optional)."""
+    complete_50_hour_training = serializers.BooleanField(required=False)
+    passed_osha_10_exam = serializers.BooleanField(required=False)
+    osha_completion_date = serializers.DateField(required=False, allow_null=True)
+    osha_type_id = serializers.PrimaryKeyRelatedField(
+        source="osha_type", queryset=OshaType.objects.all(), required=False, allow_null=True
+    )
+    hammer_math = serializers.BooleanField(required=False)
+    employability_skills = serializers.BooleanField(required=False)
+    job_interview_skills = serializers.BooleanField(required=False)
+    passed_ruler_assessment = serializers.BooleanField(required=False)
+    start_date = serializers.DateField(required=False, allow_null=True)
+    end_date = serializers.DateField(required=False, allow_null=True)
+
 
+class StudentBulkFilterSerializer(StudentProgressSerializer):
+    """Exact-match filter selecting students for a bulk PATCH."""
+    funding_source_id = serializers.PrimaryKeyRelatedField(
+        source="funding_source", queryset=FundingSource.objects.all(), required=False, allow_null=True
+    )
+
+
+class StudentBulkUpdateSerializer(serializers.Serializer):
+    """PATCH /api/students/bulk/ body: ``ids`` or ``filter`` choosing the students, and the ``changes``."""
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, max_length=5000)
+    filter = StudentBulkFilterSerializer(required=False)
+    changes = StudentProgressSerializer()
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("Send either 'ids' or 'filter'.")
+        if "filter" in attrs and not attrs["filter"]:
+            raise serializers.ValidationError({"filter": "Give at least one field to match."})
+        if not attrs["changes"]:
+            raise serializers.ValidationError({"changes": "Nothing to update."})
         return attrs
+
+
+def bulk_rule_errors(queryset, changes, limit=50):
+    """
+    student_rule_errors() for every student in ``queryset`` as it would be
+    after ``changes`` (validated StudentProgressSerializer data), in one
+    query: {field: {"message", "ids"}} with up to ``limit`` offending ids.
+    Each rule is evaluated on the final values - the new value for a
+    changed field, the stored column otherwise.
+    """
+    def final(field, column, output_field):
+        return Value(changes[field], output_field=output_field) if field in changes else F(column)
+
+    osha_type = changes.get("osha_type")
+    start = final("start_date", "start_date", DateField())
+    end = final("end_date", "end_date", DateField())
+    passed = final("passed_osha_10_exam", "passed_osha_10_exam", BooleanField())
+    osha_date = final("osha_completion_date", "osha_completion_date", DateField())
+    osha_type_id = (
+        Value(osha_type.pk if osha_type else None, output_field=IntegerField())
+        if "osha_type" in changes else F("osha_type_id")
+    )
+
+    rows = queryset.annotate(
+        final_start=start, final_end=end, final_passed=passed,
+        final_osha_date=osha_date, final_osha_type=osha_type_id,
+    ).annotate(**{
+        "breaks_end_date": ExpressionWrapper(
+            Q(final_start__isnull=False, final_end__isnull=False, final_end__lt=F("final_start")),
+            output_field=BooleanField(),
+        ),
+        "breaks_osha_completion_date": ExpressionWrapper(
+            Q(final_passed=True, final_osha_date__isnull=True), output_field=BooleanField()
+        ),
+        "breaks_osha_type_id": ExpressionWrapper(
+            Q(final_passed=True, final_osha_type__isnull=True), output_field=BooleanField()
+        ),
+    })
+    rule_flags = [f"breaks_{field}" for field in RULE_MESSAGES]
+    broken = rows.filter(Q(*(Q(**{flag: True}) for flag in rule_flags), _connector=Q.OR))
+
+    errors = {}
+    for pk, *flags in broken.values_list("id", *rule_flags).order_by("id"):
+        for field, flag in zip(RULE_MESSAGES, flags):
+            if flag:
+                entry = errors.setdefault(field, {"message": RULE_MESSAGES[field], "ids": []})
+                if len(entry["ids"]) < limit:
+                    entry["ids"].append(pk)
+    return errors
+
+
+# ---- Certificate queue ----
+class CertificatesIssuedSerializer(serializers.Serializer):
+    """POST /api/students/certificate-queue/ body: the ``kind`` printed for the students in ``ids``."""
+    kind = serializers.ChoiceField(choices=eligibility.KINDS)
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=5000)
@@ -0,0 +1,180 @@
+# hammer_backendapi/singleflight.py
+"""
+Request coalescing
+------------------
+Double-clicked "Generate All" buttons and several teachers opening the same
+student start identical renders / OpenAI calls at the same time.
+single_flight() runs one computation per input fingerprint:
+
+- within a process, concurrent callers wait on the leader's result;
+- across workers, the leader holds a lock in the shared cache and publishes
+  the result there for ``result_ttl`` seconds (cache.get_or_compute).
+
+Followers wait at most SINGLE_FLIGHT_WAIT seconds for the leader, then
+compute the result themselves.
+
+Large results (certificate PDFs) pass ``share=False``: they are only
+coalesced within the process and never written to the cache.
+
+A client-supplied Idempotency-Key replaces the fingerprint and keeps the
+result for IDEMPOTENCY_TTL, so a retried request gets the same result. The
+key is scoped to the authenticated user (anonymous callers share one
+scope), and the payload fingerprint is stored with the result: reusing a
+key for a different payload raises IdempotencyKeyMismatch (HTTP 422 via
+mismatch_response()) instead of returning the earlier result. With
+``share=False`` only that payload fingerprint is kept for the key, so a
+retry with the same payload is computed again instead of replayed.
+
+asingle_flight() / acoalesced() do the same for async views: callers on the
+same event loop await the leader's task, other workers use the shared cache.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import weakref
+
+from django.conf import settings
+from django.http import JsonResponse
+
+from hammer_backendapi.cache import aget_or_compute, cache, get_or_compute
+
+_lock = threading.Lock()
+_inflight = {}
+_ainflight = weakref.WeakKeyDictionary()  # event loop -> {key: Task}
+
+
+class IdempotencyKeyMismatch(Exception):
+    """An Idempotency-Key was reused with a different request payload."""
+
+
+def mismatch_response(error) -> JsonResponse:
+    return JsonResponse({"error": str(error)}, status=422)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def fingerprint(*parts) -> str:
+    """Stable hash of JSON-serialisable inputs."""
+    data = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _flight_options(result_ttl, should_cache):
+    return {
+        "timeout": result_ttl,
+        "lock_timeout": getattr(settings, "SINGLE_FLIGHT_LOCK_TIMEOUT", 120),
+        "wait": getattr(settings, "SINGLE_FLIGHT_WAIT", 90),
+        "should_cache": should_cache,
+    }
+
+
+def single_flight(key, compute, result_ttl=30, should_cache=None, share=True):
+    """
+    Return ``compute()``, sharing one run among concurrent callers with the
+    same key. ``share=False`` keeps the result out of the cache: only callers
+    in this process share it.
+    """
+    options = _flight_options(result_ttl, should_cache)
+    with _lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _inflight[key] = _Call()
+
+    if not leader:
+        if not call.done.wait(options["wait"]):
+            return compute()  # the leader is stuck; don't hang with it
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = get_or_compute(f"singleflight:{key}", compute, **options) if share else compute()
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+        call.done.set()
+
+
+async def asingle_flight(key, compute, result_ttl=30, should_cache=None):
+    """single_flight() for async callers; ``compute`` is a coroutine function."""
+    inflight = _ainflight.setdefault(asyncio.get_running_loop(), {})
+    task = inflight.get(key)
+    if task is None:
+        task = inflight[key] = asyncio.ensure_future(aget_or_compute(
+            f"singleflight:{key}", compute, **_flight_options(result_ttl, should_cache)
+        ))
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+    # shield: a cancelled (disconnected) caller must not cancel the others' result
+    return await asyncio.shield(task)
+
+
+def _coalesce_key(scope, parts, idempotency_key, user, result_ttl):
+    """(cache key, ttl, payload fingerprint to store with the result or None)."""
+    if idempotency_key:
+        user_id = getattr(user, "pk", None)
+        key = f"{scope}:idem:{fingerprint(user_id, idempotency_key)}"
+        return key, getattr(settings, "IDEMPOTENCY_TTL", 600), fingerprint(*parts)
+    return f"{scope}:{fingerprint(*parts)}", result_ttl, None
+
+
+def _claim(key, payload, ttl):
+    """Record that ``key`` belongs to ``payload``; raises IdempotencyKeyMismatch if it already belongs to another."""
+    marker = f"singleflight:{key}:payload"
+    if not cache.add(marker, payload, ttl) and cache.get(marker, payload) != payload:
+        raise IdempotencyKeyMismatch("Idempotency-Key was already used with a different request.")
+
+
+def _checked(entry, payload):
+    stored, result = entry
+    if stored != payload:
+        raise IdempotencyKeyMismatch("Idempotency-Key was already used with a different request.")
+    return result
+
+
+def _entry_should_cache(should_cache):
+    return None if should_cache is None else (lambda entry: should_cache(entry[1]))
+
+
+def coalesced(scope, parts, compute, idempotency_key=None, user=None, result_ttl=30, should_cache=None, share=True):
+    """
+    single_flight keyed on ``scope`` + fingerprint(parts), or on the client's
+    Idempotency-Key for ``user`` (kept for IDEMPOTENCY_TTL) when one was sent.
+    Raises IdempotencyKeyMismatch when that key was used for other ``parts``.
+    ``share=False`` coalesces in-process only and caches no result.
+    """
+    key, result_ttl, payload = _coalesce_key(scope, parts, idempotency_key, user, result_ttl)
+    if not share:
+        if payload is not None:
+            _claim(key, payload, result_ttl)
+        return single_flight(key, compute, share=False)
+    if payload is None:
+        return single_flight(key, compute, result_ttl=result_ttl, should_cache=should_cache)
+    entry = single_flight(
+        key, lambda: (payload, compute()), result_ttl=result_ttl, should_cache=_entry_should_cache(should_cache)
+    )
+    return _checked(entry, payload)
+
+
+async def acoalesced(scope, parts, compute, idempotency_key=None, user=None, result_ttl=30, should_cache=None):
+    """coalesced() for async callers; ``compute`` is a coroutine function."""
+    key, result_ttl, payload = _coalesce_key(scope, parts, idempotency_key, user, result_ttl)
+    if payload is None:
+        return await asingle_flight(key, compute, result_ttl=result_ttl, should_cache=should_cache)
+
+    async def compute_entry():
+        return payload, await compute()
+
+    entry = await asingle_flight(key, compute_entry, result_ttl=result_ttl, should_cache=_entry_should_cache(should_cache))
+    return _checked(entry, payload)
@@ -1,3 +1,1501 @@
-from django.test import TestCase
+import datetime
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+import zipfile
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache, caches
+from django.core.files.storage import default_storage
+from django.core.signing import BadSignature, b64_encode
+from django.db import connection, connections, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from hammer_backendapi import analytics, eligibility, issuance, search, verification
+from hammer_backendapi.cache import TieredCache, bump_namespace, get_or_compute, namespaced_key
+from hammer_backendapi.roster_import import import_roster
+from hammer_backendapi.search import rebuild_index, search_students
+from hammer_backendapi.singleflight import IdempotencyKeyMismatch, coalesced, single_flight
+from hammer_backendapi.views.utils import render_pool
+from hammer_backendapi.views.utils.spreadsheet import stream_xlsx
+from hammer_backendapi.models import (
+    DiscAssessment,
+    EnneagramResult,
+    FundingSource,
+    GenderIdentity,
+    IssuedCertificate,
+    Organization,
+    OshaType,
+    OutcomeSummary,
+    Region,
+    SixteenTypeAssessment,
+    State,
+    Student,
+    Teacher,
+)
+
+# model -> kwargs for its i-th row (and, for students, the Student FK pointing at it)
+TEACHER_COUNT_ADMINS = {
+    Organization: lambda i: {"name": f"Org {i}"},
+    State: lambda i: {"name": f"State {i}", "abbreviation": f"S{i}"},
+    Region: lambda i: {"name": f"Region {i}"},
+}
+STUDENT_COUNT_ADMINS = {
+    GenderIdentity: ("gender_identity", lambda i: {"gender": f"Gender {i}"}),
+    DiscAssessment: ("disc_assessment_type", lambda i: {"type_name": f"DISC {i}"}),
+    SixteenTypeAssessment: ("sixteen_types_assessment", lambda i: {"type_name": f"Type {i}"}),
+    EnneagramResult: ("enneagram_result", lambda i: {"result_name": f"Result {i}"}),
+    OshaType: ("osha_type", lambda i: {"name": f"OSHA {i}"}),
+    FundingSource: ("funding_source", lambda i: {"name": f"Fund {i}"}),
+}
+TEACHER_FIELDS = {Organization: "organization", State: "state", Region: "region"}
+
+
+class AdminCountColumnTests(TestCase):
+    """Count columns are annotated on the changelist query, not a COUNT per row."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser("admin", "admin@example.org", "pw")
+        cls.teacher = Teacher.objects.create(full_name="Teacher", email="teacher@example.org", password="x")
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+        self.teachers = 0
+
+    def _add_teacher(self, model, obj):
+        self.teachers += 1
+        Teacher.objects.create(
+            full_name="T", email=f"t{self.teachers}@example.org", password="x", **{TEACHER_FIELDS[model]: obj}
+        )
+
+    def _add_student(self, field, obj):
+        Student.objects.create(teacher=self.teacher, full_name="S", **{field: obj})
+
+    def _changelist(self, model, query=""):
+        url = reverse(f"admin:hammer_backendapi_{model._meta.model_name}_changelist") + query
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def _assert_constant_queries(self, model, kwargs, add_related):
+        # One row with one related row, then six rows with 1..6 related rows each
+        add_related(model.objects.create(**kwargs(0)))
+        _, one_row = self._changelist(model)
+        for i in range(1, 6):
+            obj = model.objects.create(**kwargs(i))
+            for _ in range(i + 1):
+                add_related(obj)
+        response, six_rows = self._changelist(model)
+        self.assertEqual(six_rows, one_row)
+
+        # The count column sorts (?o= indexes list_display, which starts with the action checkbox)
+        related = "teacher" if model in TEACHER_COUNT_ADMINS else "student"
+        column = list(response.context["cl"].list_display).index(f"{related}_count")
+        response, _ = self._changelist(model, f"?o=-{column}")
+        counts = [getattr(row, f"{related}_total") for row in response.context["cl"].result_list]
+        self.assertEqual(counts, [6, 5, 4, 3, 2, 1])
+
+    def test_teacher_count_admins(self):
+        for model, kwargs in TEACHER_COUNT_ADMINS.items():
+            with self.subTest(model=model.__name__):
+                self._assert_constant_queries(model, kwargs, lambda obj, model=model: self._add_teacher(model, obj))
+
+    def test_student_count_admins(self):
+        for model, (field, kwargs) in STUDENT_COUNT_ADMINS.items():
+            with self.subTest(model=model.__name__):
+                self._assert_constant_queries(model, kwargs, lambda obj, field=field: self._add_student(field, obj))
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class AdminLargeTableTests(TestCase):
+    """Searchable sidebar filters list only the selection plus a few matches; filtered counts are cached."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser("admin", "admin@example.org", "pw")
+        cls.beta = Organization.objects.create(name="Beta")
+        for n in range(20):
+            org = Organization.objects.create(name=f"Alpha {n:02}")
+            Teacher.objects.create(full_name=f"T{n}", email=f"t{n}@example.org", password="x", organization=org)
+        Teacher.objects.create(full_name="Beta teacher", email="beta@example.org", password="x", organization=cls.beta)
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client.force_login(self.admin_user)
+
+    def _changelist(self, **query):
+        response = self.client.get(reverse("admin:hammer_backendapi_teacher_changelist"), query)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def _organization_choices(self, response):
+        [spec] = [spec for spec in response.context["cl"].filter_specs if spec.field_path == "organization"]
+        return [name for _, name in spec.lookup_choices]
+
+    def test_searchable_filter(self):
+        self.assertEqual(self._organization_choices(self._changelist()), [])
+        matches = self._organization_choices(self._changelist(organization_q="alpha"))
+        self.assertEqual(matches, [f"Alpha {n:02}" for n in range(15)])
+
+        # The selection stays listed next to the matches, and the search term does not filter the rows
+        response = self._changelist(organization__id__exact=self.beta.pk, organization_q="alpha 1")
+        # Each search word must match: "Alpha 01" contains a 1 too
+        self.assertEqual(self._organization_choices(response), ["Beta", "Alpha 01", *(f"Alpha {n}" for n in range(10, 20))])
+        self.assertEqual([str(teacher) for teacher in response.context["cl"].result_list], ["Beta teacher"])
+
+    def test_filtered_count_is_cached(self):
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self._changelist(q="alpha")
+            self.assertEqual(response.context["cl"].result_count, 20)
+            return [q for q in queries.captured_queries if "COUNT(" in q["sql"].upper()]
+
+        self.assertEqual(len(count_queries()), 1)
+        self.assertEqual(count_queries(), [])
+
+
+@override_settings(CERTIFICATE_SIGNING_KEY="current-key", CERTIFICATE_SIGNING_FALLBACK_KEYS=[])
+class CertificateVerificationTests(SimpleTestCase):
+    """Verification tokens round-trip and reject any change to what they sign."""
+
+    issued_on = datetime.date(2026, 10, 19)
+
+    def _token(self, kinds=("osha",), values=("Alice Smith", "2025-04-01")):
+        return verification.sign(kinds, values, issued_on=self.issued_on)
+
+    def test_round_trip(self):
+        claims = verification.unsign(self._token())
+        self.assertEqual(claims["kinds"], ["osha"])
+        self.assertEqual(claims["issued_on"], self.issued_on)
+        self.assertEqual(claims["fields"], {"full_name": "Alice Smith", "osha_completion_date": "2025-04-01"})
+
+    def test_tampered_token(self):
+        body, _, mac = self._token().partition(".")
+        forged = b64_encode(b'["osha","20261019","Mallory","2025-04-01"]').decode()
+        for token in (f"{forged}.{mac}", f"{body}.{mac[:-2]}", body, "", f"{body}.!!"):
+            with self.subTest(token=token):
+                with self.assertRaises(BadSignature):
+                    verification.unsign(token)
+
+    def test_wrong_kind(self):
+        # The kind is signed too: an OSHA token relabelled as NCCER no longer verifies
+        body, _, mac = self._token().partition(".")
+        relabelled = b64_encode(b'["nccer","20261019","Alice Smith","2025-04-01"]').decode()
+        with self.assertRaises(BadSignature):
+            verification.unsign(f"{relabelled}.{mac}")
+        # A kind outside the registry verifies, but its values are not labelled
+        self.assertIsNone(verification.unsign(self._token(kinds=("retired",)))["fields"])
+
+    def test_fallback_key(self):
+        token = self._token()
+        with self.settings(CERTIFICATE_SIGNING_KEY="new-key"):
+            with self.assertRaises(BadSignature):
+                verification.unsign(token)
+            with self.settings(CERTIFICATE_SIGNING_FALLBACK_KEYS=["current-key"]):
+                self.assertEqual(verification.unsign(token)["kinds"], ["osha"])
+
+    def test_view(self):
+        token = self._token()
+        response = self.client.get(reverse("verify-certificate", args=[token]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["certificates"], ["OSHA 10 Certificate"])
+        self.assertIn("immutable", response["Cache-Control"])
+
+        body, _, mac = token.partition(".")
+        response = self.client.get(reverse("verify-certificate", args=[f"{body}.A{mac[1:]}"]))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.json()["valid"])
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class IdempotencyKeyTests(SimpleTestCase):
+    """Idempotency-Keys are per user and bound to the payload they were first used with."""
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+        self.alice, self.bob = User(pk=1, username="alice"), User(pk=2, username="bob")
+
+    def _render(self, parts, user, key="retry-1"):
+        def compute():
+            self.calls += 1
+            return f"pdf for {parts} #{self.calls}"
+        return coalesced("certificate:test", parts, compute, idempotency_key=key, user=user)
+
+    def test_retry_returns_stored_result(self):
+        first = self._render(("Alice",), self.alice)
+        self.assertEqual(self._render(("Alice",), self.alice), first)
+        self.assertEqual(self.calls, 1)
+
+    def test_scoped_to_user(self):
+        self._render(("Alice",), self.alice)
+        self.assertEqual(self._render(("Alice",), self.bob), "pdf for ('Alice',) #2")
+        with self.assertRaises(IdempotencyKeyMismatch):
+            self._render(("Bob",), self.alice)
+        self._render(("Anon",), AnonymousUser(), key="retry-2")
+        self.assertEqual(self.calls, 3)
+
+    def test_changed_payload_rejected(self):
+        self._render(("Alice",), self.alice)
+        with self.assertRaises(IdempotencyKeyMismatch):
+            self._render(("Alicia",), self.alice)
+        self.assertEqual(self.calls, 1)
+
+    def test_without_key_coalesces_on_payload(self):
+        first = coalesced("certificate:test", ("Alice",), lambda: "pdf", user=self.alice)
+        self.assertEqual(coalesced("certificate:test", ("Alice",), lambda: "other", user=self.bob), first)
+
+    def test_unshared_results_are_not_cached(self):
+        def render(parts, user):
+            def compute():
+                self.calls += 1
+                return b"%PDF" * 100
+            return coalesced("certificate:test", parts, compute, idempotency_key="retry-1", user=user, share=False)
+
+        render(("Alice",), self.alice)
+        render(("Alice",), self.alice)  # rendered again, not replayed
+        self.assertEqual(self.calls, 2)
+        with self.assertRaises(IdempotencyKeyMismatch):
+            render(("Alicia",), self.alice)
+        # Only the key's payload marker is stored, not the PDF
+        self.assertEqual([key.rsplit(":", 1)[-1] for key in cache._cache], ["payload"])
+
+    def test_follower_stops_waiting_for_a_stuck_leader(self):
+        started, release = threading.Event(), threading.Event()
+
+        def hang():
+            started.set()
+            release.wait(5)
+            return "leader result"
+
+        leader = threading.Thread(target=single_flight, args=("stuck", hang), kwargs={"share": False})
+        leader.start()
+        started.wait(5)
+        try:
+            with self.settings(SINGLE_FLIGHT_WAIT=0.05):
+                self.assertEqual(single_flight("stuck", lambda: "own result", share=False), "own result")
+        finally:
+            release.set()
+            leader.join()
+
+
+class CertificateEligibilityTests(TestCase):
+    """Stored eligibility masks, the ready-to-print queue and the serializer fields."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("teacher", password="pw")
+        cls.teacher = Teacher.objects.create(user=cls.user, full_name="Teacher", email="teacher@example.org", password="x")
+        other = Teacher.objects.create(full_name="Other", email="other@example.org", password="x")
+        cls.end = datetime.date(2026, 6, 1)
+        cls.ann = Student.objects.create(teacher=cls.teacher, full_name="Ann", hammer_math=True, nccer_number="N-1", end_date=cls.end)
+        cls.bob = Student.objects.create(
+            teacher=cls.teacher, full_name="Bob", passed_osha_10_exam=True, osha_completion_date=cls.end,
+            complete_50_hour_training=True, end_date=cls.end,
+        )
+        Student.objects.create(teacher=cls.teacher, full_name="Cat")  # nothing completed
+        Student.objects.create(teacher=other, full_name="Dan", hammer_math=True, end_date=cls.end)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_masks(self):
+        self.assertEqual(eligibility.kinds(self.ann.certificate_eligibility), ["nccer", "hammermath"])
+        self.assertEqual(eligibility.kinds(self.bob.certificate_eligibility), ["osha", "workforce"])
+        self.assertEqual(self.ann.certificates_pending, self.ann.certificate_eligibility)
+
+        # Every requirement counts, and a blank NCCER number is not one
+        self.ann.nccer_number = ""
+        self.ann.save()
+        self.assertEqual(eligibility.kinds(self.ann.certificate_eligibility), ["hammermath"])
+        self.bob.end_date = None
+        self.bob.save(update_fields=["end_date"])
+        self.bob.refresh_from_db()
+        self.assertEqual(eligibility.kinds(self.bob.certificate_eligibility), ["osha"])
+
+    def test_sql_matches_python(self):
+        Student.objects.update(certificate_eligibility=0, certificates_pending=0)
+        eligibility.refresh(Student.objects.all())
+        for student in Student.objects.all():
+            with self.subTest(student=student.full_name):
+                self.assertEqual(student.certificate_eligibility, eligibility.eligibility_mask(student))
+                self.assertEqual(student.certificates_pending, student.certificate_eligibility)
+
+    def test_queue(self):
+        url = reverse("student-certificate-queue")
+        rows = self.client.get(url).json()["results"]
+        self.assertEqual([(row["full_name"], row["pending"]) for row in rows],
+                         [("Ann", ["nccer", "hammermath"]), ("Bob", ["osha", "workforce"])])
+        rows = self.client.get(url, {"kind": "osha"}).json()["results"]
+        self.assertEqual([row["full_name"] for row in rows], ["Bob"])
+        self.assertEqual(self.client.get(url, {"kind": "cover"}).status_code, 400)
+
+        # Recording a printed batch only touches the teacher's own students
+        dan = Student.objects.get(full_name="Dan")
+        response = self.client.post(url, {"kind": "hammermath", "ids": [self.ann.pk, dan.pk]}, format="json")
+        self.assertEqual(response.json(), {"issued": 1})
+        rows = self.client.get(url, {"kind": "hammermath"}).json()["results"]
+        self.assertEqual(rows, [])
+        dan.refresh_from_db()
+        self.assertEqual(eligibility.kinds(dan.certificates_pending), ["hammermath"])
+
+    def test_save_keeps_bits_issued_meanwhile(self):
+        loaded = Student.objects.get(pk=self.bob.pk)
+        eligibility.mark_issued(Student.objects.filter(pk=self.bob.pk), "osha")  # e.g. a concurrent download
+        loaded.pretest_score = 70
+        loaded.save()
+        self.assertEqual(eligibility.kinds(loaded.certificates_issued), ["osha"])
+        self.assertEqual(eligibility.kinds(loaded.certificates_pending), ["workforce"])
+        stored = Student.objects.get(pk=self.bob.pk)
+        self.assertEqual((stored.pretest_score, stored.certificates_issued, stored.certificates_pending),
+                         (70, loaded.certificates_issued, loaded.certificates_pending))
+        # Losing a requirement still updates both masks
+        loaded.complete_50_hour_training = False
+        loaded.save()
+        self.assertEqual(eligibility.kinds(Student.objects.get(pk=self.bob.pk).certificates_pending), [])
+
+    def test_serializer_fields(self):
+        url = reverse("student-detail", args=[self.ann.pk])
+        data = self.client.get(url).json()
+        self.assertEqual(data["eligible_certificates"], ["nccer", "hammermath"])
+        self.assertEqual(data["pending_certificates"], ["nccer", "hammermath"])
+
+        eligibility.mark_issued(Student.objects.filter(pk=self.ann.pk), "nccer")
+        data = self.client.patch(url, {"employability_skills": True}, format="json").json()
+        self.assertEqual(data["eligible_certificates"], ["nccer", "hammermath", "employability"])
+        self.assertEqual(data["pending_certificates"], ["hammermath", "employability"])
+
+
+SHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+
+def _xlsx(header, rows):
+    return b"".join(stream_xlsx(header, rows))
+
+
+def _xlsx_with_sheet(rows_xml):
+    """A workbook from stream_xlsx() whose worksheet is replaced by ``rows_xml``."""
+    source = zipfile.ZipFile(io.BytesIO(_xlsx(["Full Name"], [])))
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w") as archive:
+        for name in source.namelist():
+            data = source.read(name)
+            if name == "xl/worksheets/sheet1.xml":
+                data = f'<worksheet xmlns="{SHEET_NS}"><sheetData>{rows_xml}</sheetData></worksheet>'.encode()
+            archive.writestr(name, data)
+    return out.getvalue()
+
+
+class RosterImportTests(TestCase):
+    """Roster files import all rows or none, and hostile files are rejected cheaply."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = Teacher.objects.create(full_name="Teacher", email="teacher@example.org", password="x")
+        FundingSource.objects.create(name="WIOA")
+
+    def test_csv(self):
+        data = b"Full Name,NCCER #,Hammer Math,Funding Source,Notes\nAnn,N-1,yes,wioa,x\n,,,,\nBob,,no,,\n"
+        result = import_roster(self.teacher, data, "roster.csv")
+        self.assertEqual((result["rows"], result["created"], result["ignored_columns"]), (2, 2, ["Notes"]))
+        ann = Student.objects.get(full_name="Ann")
+        self.assertEqual((ann.nccer_number, ann.hammer_math, ann.funding_source.name), ("N-1", True, "WIOA"))
+
+    def test_row_errors_reject_the_file(self):
+        data = b"Full Name,Hammer Math,Start Date,End Date,Funding Source\nAnn,maybe,,,\n\nBob,,2025-02-01,2025-01-01,Other\n"
+        result = import_roster(self.teacher, data, "roster.csv")
+        self.assertEqual([error["row"] for error in result["errors"]], [2, 4])
+        self.assertIn("hammer_math", result["errors"][0]["errors"])
+        self.assertEqual(set(result["errors"][1]["errors"]), {"end_date", "funding_source_id"})
+        self.assertFalse(Student.objects.exists())
+
+    def test_xlsx(self):
+        data = _xlsx(["Full Name", "End Date", "Passed OSHA 10 Exam"], [("Ann", datetime.date(2025, 5, 1), False)])
+        self.assertEqual(import_roster(self.teacher, data, "roster.xlsx")["created"], 1)
+        self.assertEqual(Student.objects.get().end_date, datetime.date(2025, 5, 1))
+
+    @override_settings(ROSTER_IMPORT_MAX_ROWS=2)
+    def test_too_many_rows(self):
+        with self.assertRaisesMessage(ValueError, "At most 2 students per file"):
+            import_roster(self.teacher, b"Full Name\nA\nB\nC\n", "roster.csv")
+        data = _xlsx(["Full Name"], [("A",), ("B",), ("C",)])
+        with self.assertRaisesMessage(ValueError, "At most 2 students per file"):
+            import_roster(self.teacher, data, "roster.xlsx")
+        self.assertEqual(import_roster(self.teacher, b"Full Name\nA\n\n\nB\n", "roster.csv")["created"], 2)
+
+    def test_malformed_files(self):
+        header = '<row r="1"><c r="A1" t="inlineStr"><is><t>Full Name</t></is></c></row>'
+        for label, data in (
+            ("not a zip", b"PK\x03\x04 garbage"),
+            ("huge row number", _xlsx_with_sheet(header + '<row r="99999999999"><c r="A99999999999"/></row>')),
+            ("rows out of order", _xlsx_with_sheet('<row r="5"/>' + header)),
+            ("huge column", _xlsx_with_sheet(header + '<row r="2"><c r="ZZZZZZ2"><v>1</v></c></row>')),
+            ("bad cell reference", _xlsx_with_sheet(header + '<row r="2"><c r="2A"><v>1</v></c></row>')),
+            ("unknown shared string", _xlsx_with_sheet(header + '<row r="2"><c r="A2" t="s"><v>7</v></c></row>')),
+            ("not xml", _xlsx_with_sheet("<row")),
+        ):
+            with self.subTest(label):
+                with self.assertRaisesMessage(ValueError, "Not a readable .xlsx workbook"):
+                    import_roster(self.teacher, data, "roster.xlsx")
+        with self.assertRaisesMessage(ValueError, "Upload a .csv or .xlsx file."):
+            import_roster(self.teacher, b"Full Name\nA\n", "roster.txt")
+
+    def test_far_columns_are_not_read(self):
+        # XFD is Excel's last column: valid, but far past any student field
+        data = _xlsx_with_sheet(
+            '<row r="1"><c r="A1" t="inlineStr"><is><t>Full Name</t></is></c></row>'
+            '<row r="3"><c r="A3" t="inlineStr"><is><t>Ann</t></is></c><c r="XFD3"><v>1</v></c></row>'
+        )
+        result = import_roster(self.teacher, data, "roster.xlsx")
+        self.assertEqual(result["created"], 1)
+        self.assertEqual(result["errors"], [])
+
+
+class RosterExportTests(TestCase):
+    """Exports stream the teacher's roster in chunks from one query, and an exported file imports back."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("teacher", password="pw")
+        org = Organization.objects.create(name="Org")
+        cls.teacher = Teacher.objects.create(user=cls.user, full_name="Teacher", email="teacher@example.org", password="x", organization=org)
+        for name in ("Cara", "Ann", "=Bob"):
+            Student.objects.create(teacher=cls.teacher, full_name=name, hammer_math=name == "Ann")
+        cls.other = Teacher.objects.create(full_name="Other", email="other@example.org", password="x")
+        Student.objects.create(teacher=cls.other, full_name="Dan")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _export(self, fmt):
+        from hammer_backendapi.views.utils import spreadsheet
+
+        with mock.patch.object(spreadsheet, "CHUNK_SIZE", 64), CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("export-students", args=[fmt]))
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.streaming)
+            chunks = list(response.streaming_content)
+        self.assertEqual(len(queries), 2)  # the teacher, then every row with its lookups
+        self.assertGreater(len(chunks), 1)
+        self.assertRegex(response["Content-Disposition"], rf'attachment; filename="students-\d{{4}}-\d{{2}}-\d{{2}}\.{fmt}"')
+        self.assertEqual(response["Cache-Control"], "no-store")
+        return b"".join(chunks)
+
+    def test_csv(self):
+        from hammer_backendapi.roster_columns import EXPORT_COLUMNS
+        from hammer_backendapi.views.utils.spreadsheet import read_csv
+
+        data = self._export("csv")
+        self.assertTrue(data.startswith("\ufeff".encode()))
+        [(_, header), *rows] = read_csv(data)
+        self.assertEqual(header, [name for name, _ in EXPORT_COLUMNS])
+        columns = {name: header.index(name) for name in ("Full Name", "Organization", "Hammer Math")}
+        self.assertEqual(
+            [[row[i] for i in columns.values()] for _, row in rows],
+            [["'=Bob", "Org", "No"], ["Ann", "Org", "Yes"], ["Cara", "Org", "No"]],  # formulas neutralised
+        )
+
+    def test_xlsx_imports_back(self):
+        data = self._export("xlsx")
+        result = import_roster(self.other, data, "students.xlsx")
+        self.assertEqual(result["created"], 3)
+        self.assertEqual(
+            sorted(Student.objects.filter(teacher=self.other).values_list("full_name", "hammer_math")),
+            [("=Bob", False), ("Ann", True), ("Cara", False), ("Dan", False)],
+        )
+
+    def test_unknown_format(self):
+        with self.assertLogs("django.request"):
+            self.assertEqual(self.client.get(reverse("export-students", args=["pdf"])).status_code, 404)
+
+
+class StudentValidationTests(TestCase):
+    """Create/update report the first broken business rule, as they always have."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("teacher", password="pw")
+        Teacher.objects.create(user=cls.user, full_name="Teacher", email="teacher@example.org", password="x")
+
+    def test_first_rule_error_only(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post(reverse("student-list"), {
+            "full_name": "Ann", "start_date": "2025-02-01", "end_date": "2025-01-01", "passed_osha_10_exam": True,
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"end_date": ["Must be on/after start_date."]})
+
+        response = client.post(reverse("student-list"), {"full_name": "Ann", "passed_osha_10_exam": True}, format="json")
+        self.assertEqual(response.json(), {"osha_completion_date": ["Required if OSHA exam passed."]})
+
+
+class StudentSearchTests(TestCase):
+    """Ranked student search on SQLite's FTS5 index (the Postgres path needs a Postgres server)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("teacher", password="pw")
+        cls.teacher = Teacher.objects.create(user=cls.user, full_name="Teacher", email="teacher@example.org", password="x")
+        other = Teacher.objects.create(full_name="Other", email="other@example.org", password="x")
+        for name in ("Bob Smithers", "Carl Blacksmith", "Alice Smith"):
+            Student.objects.create(teacher=cls.teacher, full_name=name)
+        Student.objects.create(teacher=other, full_name="Alice Smith")
+
+    def _names(self, term):
+        return [student.full_name for student in search_students(self.teacher, term)]
+
+    def test_whole_word_before_prefix_before_substring(self):
+        self.assertEqual(self._names("smith"), ["Alice Smith", "Bob Smithers", "Carl Blacksmith"])
+        self.assertEqual(self._names("Alice Smith"), ["Alice Smith"])
+        self.assertEqual(self._names("al"), ["Alice Smith"])  # too short for trigrams: prefixes only
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(reverse("student-search"), {"q": "smith"})
+        self.assertEqual([row["full_name"] for row in response.json()["results"]], self._names("smith"))
+
+    def test_index_follows_saves_and_deletes(self):
+        self._names("smith")  # builds the index
+        student = Student.objects.get(teacher=self.teacher, full_name="Bob Smithers")
+        student.full_name = "Robert Jones"
+        student.save()
+        self.assertEqual(self._names("jones"), ["Robert Jones"])
+        self.assertNotIn("Bob Smithers", self._names("smith"))
+        student.delete()
+        self.assertEqual(self._names("jones"), [])
+
+        # QuerySet.update() skips the signals until rebuild_index()
+        Student.objects.filter(full_name="Carl Blacksmith").update(full_name="Carl Jonesy")
+        self.assertEqual(self._names("jones"), [])
+        rebuild_index()
+        self.assertEqual(self._names("jones"), ["Carl Jonesy"])
+
+    def test_index_check_is_remembered(self):
+        self._names("smith")
+        search._sqlite_index_ready.add(connections["default"])
+        self.addCleanup(search._sqlite_index_ready.discard, connections["default"])
+        with CaptureQueriesContext(connection) as queries:
+            self._names("smith")
+        self.assertFalse([q for q in queries if "sqlite_master" in q["sql"]])
+
+
+class PersonalitySummaryTests(TestCase):
+    """The async summary endpoint renders through the render pool, like the other PDF endpoints."""
+
+    @classmethod
+    def setUpTestData(cls):
+        from rest_framework.authtoken.models import Token
+
+        user = User.objects.create_user("teacher", password="pw")
+        teacher = Teacher.objects.create(user=user, full_name="Teacher", email="teacher@example.org", password="x")
+        cls.student = Student.objects.create(teacher=teacher, full_name="Ann Lee")
+        cls.token = Token.objects.create(user=user)
+
+    def _post(self):
+        with mock.patch("hammer_backendapi.views.students.agenerate_long_summary_html",
+                        mock.AsyncMock(return_value="<p>Summary</p>")) as generate:
+            response = self.client.post(
+                f"/api/students/{self.student.pk}/personality-summary/",
+                HTTP_AUTHORIZATION=f"Token {self.token.key}", HTTP_IDEMPOTENCY_KEY="retry-1",
+            )
+        self.assertEqual(generate.await_args.args[1], "retry-1")
+        return response
+
+    def test_rendered_in_the_pool(self):
+        with mock.patch.object(render_pool, "submit_render", return_value=b"%PDF-summary") as submit:
+            response = self._post()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"%PDF-summary")
+        self.assertEqual(submit.call_args.kwargs, {"kind": "summary"})
+
+    def test_busy_pool_is_a_503(self):
+        with mock.patch.object(render_pool, "submit_render", side_effect=render_pool.RenderPoolBusy("busy")):
+            response = self._post()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "5")
+
+
+class StudentBulkUpdateTests(TestCase):
+    """PATCH /api/students/bulk/: rules checked per row on final values, scoped to the teacher."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("teacher", password="pw")
+        cls.teacher = Teacher.objects.create(user=cls.user, full_name="Teacher", email="teacher@example.org", password="x")
+        cls.other = Teacher.objects.create(full_name="Other", email="other@example.org", password="x")
+        cls.osha_type = OshaType.objects.create(name="OSHA 10")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _patch(self, body):
+        return self.client.patch(reverse("student-bulk-update"), body, format="json")
+
+    def test_rule_errors_name_the_offending_rows(self):
+        dated = Student.objects.create(teacher=self.teacher, full_name="A", osha_completion_date=datetime.date(2025, 3, 1))
+        undated = Student.objects.create(teacher=self.teacher, full_name="B")
+        late = Student.objects.create(teacher=self.teacher, full_name="C", osha_completion_date=datetime.date(2025, 3, 1),
+                                      start_date=datetime.date(2025, 6, 1))
+
+        response = self._patch({
+            "ids": [dated.pk, undated.pk, late.pk],
+            "changes": {"passed_osha_10_exam": True, "osha_type_id": self.osha_type.pk, "end_date": "2025-05-01"},
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"errors": {
+            "end_date": {"message": "Must be on/after start_date.", "ids": [late.pk]},
+            "osha_completion_date": {"message": "Required if OSHA exam passed.", "ids": [undated.pk]},
+        }})
+        self.assertFalse(Student.objects.filter(passed_osha_10_exam=True).exists())
+
+        # Setting the missing value in the same request satisfies the rule
+        response = self._patch({
+            "ids": [dated.pk, undated.pk],
+            "changes": {"passed_osha_10_exam": True, "osha_type_id": self.osha_type.pk, "osha_completion_date": "2025-04-01"},
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.json()["changed_ids"]), [dated.pk, undated.pk])
+
+    def test_only_the_teachers_students_change(self):
+        mine = Student.objects.create(teacher=self.teacher, full_name="Mine", start_date=datetime.date(2025, 1, 6))
+        done = Student.objects.create(teacher=self.teacher, full_name="Done", start_date=datetime.date(2025, 1, 6), hammer_math=True)
+        theirs = Student.objects.create(teacher=self.other, full_name="Theirs", start_date=datetime.date(2025, 1, 6))
+
+        response = self._patch({"ids": [mine.pk, theirs.pk, 999999], "changes": {"hammer_math": True}})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"changed_ids": [mine.pk], "changed": 1, "not_found_ids": sorted([theirs.pk, 999999])})
+
+        response = self._patch({"filter": {"start_date": "2025-01-06"}, "changes": {"job_interview_skills": True}})
+        self.assertEqual(sorted(response.json()["changed_ids"]), [mine.pk, done.pk])
+        theirs.refresh_from_db()
+        self.assertFalse(theirs.hammer_math or theirs.job_interview_skills)
+
+
+class OutcomeAnalyticsTests(TestCase):
+    """Outcome buckets: marked on commit, date-dependent counts worked out when read."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.org = Organization.objects.create(name="Org")
+        cls.teacher = Teacher.objects.create(full_name="Teacher", email="teacher@example.org", password="x", organization=cls.org)
+
+    def _summary(self, dimension="organization", key=None):
+        rows = analytics.outcome_summaries(dimension, key=self.org.pk if key is None else key)
+        self.assertEqual(len(rows), 1)
+        return rows[0]
+
+    def test_histogram_clamps_out_of_range_values(self):
+        self.assertEqual(analytics._histogram([-5, 0, 9.9, 100, 250], 0, 100, 10), [3, 0, 0, 0, 0, 0, 0, 0, 0, 2])
+
+    def test_finished_count_follows_the_date(self):
+        today = datetime.date(2026, 5, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Student.objects.create(teacher=self.teacher, full_name="A", start_date=today, end_date=today)
+            Student.objects.create(teacher=self.teacher, full_name="B", start_date=today, end_date=datetime.date(2026, 6, 1))
+        with mock.patch("django.utils.timezone.localdate", return_value=today):
+            self.assertEqual(self._summary()["counts"]["finished_count"], 1)
+        # No student changed, so nothing is refreshed - the count still moves on
+        with mock.patch("django.utils.timezone.localdate", return_value=datetime.date(2026, 7, 1)):
+            summary = self._summary()
+        self.assertEqual(summary["counts"]["finished_count"], 2)
+        self.assertFalse(OutcomeSummary.objects.filter(dimension="organization", stale_since__isnull=False).exists())
+
+    def test_saves_mark_buckets_once_per_transaction(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            student = Student.objects.create(teacher=self.teacher, full_name="A", start_date=datetime.date(2025, 1, 1))
+        self._summary()
+        other = Organization.objects.create(name="Other")
+        mover = Teacher.objects.create(full_name="Mover", email="mover@example.org", password="x", organization=other)
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    student.posttest_score = 90
+                    student.save()  # one read of the stored row...
+                    student.teacher = mover
+                    student.start_date = datetime.date(2024, 3, 1)
+                    student.save()
+        # ...per save; the buckets of both saves go out in one upsert at commit
+        upserts = [q for q in queries.captured_queries if "outcomesummary" in q["sql"].lower()]
+        self.assertEqual(len(upserts), 1)
+
+        self.assertEqual(self._summary(key=other.pk)["cohort_year"], 2024)
+        self.assertEqual(analytics.outcome_summaries("organization", key=self.org.pk), [])
+        # Incremental results match a full rebuild
+        incremental = analytics.outcome_summaries("all")
+        analytics.rebuild()
+        self.assertEqual(
+            [{k: v for k, v in row.items() if k != "refreshed_at"} for row in incremental],
+            [{k: v for k, v in row.items() if k != "refreshed_at"} for row in analytics.outcome_summaries("all")],
+        )
+
+    def test_eligible_counts_come_from_the_bitmask(self):
+        day = datetime.date(2026, 5, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Student.objects.create(teacher=self.teacher, full_name="A", start_date=day, end_date=day,
+                                   hammer_math=True, complete_50_hour_training=True)
+            Student.objects.create(teacher=self.teacher, full_name="B", start_date=day, end_date=day, hammer_math=True)
+            Student.objects.create(teacher=self.teacher, full_name="C", start_date=day, hammer_math=True)
+        summary = self._summary()
+        self.assertEqual(summary["counts"]["eligible_hammermath_count"], 2)
+        self.assertEqual(summary["counts"]["eligible_workforce_count"], 1)
+        self.assertEqual(summary["counts"]["eligible_osha_count"], 0)
+        self.assertEqual(summary["rates"]["eligible_hammermath_rate"], round(2 / 3, 4))
+
+    def test_all_dimension_rejects_a_key(self):
+        from rest_framework.authtoken.models import Token
+
+        admin = User.objects.create_user("staff", password="x", is_staff=True)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=admin).key}")
+        self.assertEqual(client.get("/api/analytics/outcomes/all/", {"key": 1}).status_code, 400)
+        self.assertEqual(client.get("/api/analytics/outcomes/all/").status_code, 200)
+
+
+class _Clock:
+    """Stands in for time.monotonic() in the L1."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@override_settings(CACHES={
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "tiered-test-shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "tiered-test"},
+})
+class TieredCacheTests(SimpleTestCase):
+    """The in-process L1 in front of the shared cache."""
+
+    def setUp(self):
+        self.shared = caches["tiered-test-shared"]
+        self.tiered = self._worker()
+        self.addCleanup(self.tiered.clear)
+        self.clock = _Clock()
+        patcher = mock.patch("hammer_backendapi.cache.time.monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _worker(self, **options):
+        """A TieredCache as one gunicorn worker would have it, over the shared alias."""
+        options = {"SHARED": "tiered-test-shared", "L1_TTL": 5, "L1_MAX_VALUE_BYTES": 1024, **options}
+        return TieredCache("", {"OPTIONS": options})
+
+    def _l1_keys(self, tiered=None):
+        return [key for key, _ in (tiered or self.tiered)._l1]
+
+    def test_large_values_skip_the_l1(self):
+        self.tiered.set("small", "x")
+        self.tiered.set("large", "x" * 4096)
+        self.assertEqual(self._l1_keys(), ["small"])
+        self.assertEqual(self.tiered.get("large"), "x" * 4096)
+        self.assertEqual(self._l1_keys(), ["small"])
+
+    def test_l1_expires_after_its_ttl(self):
+        self.tiered.set("k", "old")
+        self.shared.set("k", "new")  # written by another worker
+        self.assertEqual(self.tiered.get("k"), "old")
+        self.clock.now += 5.1
+        self.assertEqual(self.tiered.get("k"), "new")
+        # A shorter cache timeout also shortens the L1 entry
+        self.tiered.set("brief", 1, timeout=1)
+        self.clock.now += 1.1
+        self.shared.delete("brief")
+        self.assertIsNone(self.tiered.get("brief"))
+
+    def test_l1_evicts_least_recently_used(self):
+        tiered = self._worker(L1_MAX_ENTRIES=2)
+        tiered.set("a", 1)
+        tiered.set("b", 2)
+        tiered.get("a")
+        tiered.set("c", 3)
+        self.assertEqual(self._l1_keys(tiered), ["a", "c"])
+        self.assertEqual(tiered.get("b"), 2)  # still in the shared cache
+
+    def test_bump_namespace_reaches_other_workers(self):
+        first, second = self.tiered, self._worker()
+        with mock.patch("hammer_backendapi.cache.cache", first):
+            key = namespaced_key("lookups", "options")
+            first.set(key, "stale options")
+        with mock.patch("hammer_backendapi.cache.cache", second):
+            self.assertEqual(bump_namespace("lookups"), 2)
+            self.assertNotEqual(namespaced_key("lookups", "options"), key)
+        with mock.patch("hammer_backendapi.cache.cache", first):
+            # Within L1_TTL the first worker may still use the old namespace...
+            self.assertEqual(namespaced_key("lookups", "options"), key)
+            self.clock.now += 5.1
+            # ...and misses once its L1 entry has expired
+            self.assertIsNone(first.get(namespaced_key("lookups", "options")))
+
+    def test_lookups_are_counted_per_tier(self):
+        self.tiered.set("k", 1)
+        self.clock.now += 5.1
+        with mock.patch("hammer_backendapi.cache.metrics.record_cache") as record:
+            self.tiered.get("k")  # L1 expired, shared hit
+            self.tiered.get("k")  # L1 hit
+            self.tiered.get("missing")
+        self.assertEqual(record.call_args_list, [
+            mock.call("l1", False), mock.call("shared", True),
+            mock.call("l1", True),
+            mock.call("l1", False), mock.call("shared", False),
+        ])
+
+
+    def test_get_or_compute_is_counted_by_key_prefix(self):
+        with mock.patch("hammer_backendapi.cache.metrics.record_cache") as record:
+            get_or_compute("lookups:1:options", lambda: 1)
+            get_or_compute("lookups:1:options", lambda: 2)
+        self.assertEqual(record.call_args_list, [mock.call("lookups", False), mock.call("lookups", True)])
+        cache.clear()
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+@unittest.skipIf(fakeredis is None, "fakeredis is not installed")
+class RedisTieredCacheTests(SimpleTestCase):
+    """TieredCache over Django's RedisCache (fakeredis standing in for the server)."""
+
+    def setUp(self):
+        redis = {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": "redis://fake:6379/0",
+            "OPTIONS": {"connection_class": fakeredis.FakeConnection},
+        }
+        tiered = {"BACKEND": "hammer_backendapi.cache.TieredCache", "OPTIONS": {"SHARED": "shared"}}
+        settings = override_settings(CACHES={"default": tiered, "shared": redis})
+        settings.enable()
+        self.addCleanup(settings.disable)
+        cache.clear()
+
+    def test_get_or_compute_locks_across_workers(self):
+        other_worker = TieredCache("", {"OPTIONS": {"SHARED": "shared"}})
+        with mock.patch.object(cache, "add", wraps=cache.add) as add:
+            self.assertEqual(get_or_compute("k", lambda: "computed"), "computed")
+        add.assert_called_once()
+        self.assertEqual(other_worker.get("k"), "computed")
+
+    def test_bump_namespace(self):
+        key = namespaced_key("lookups", "options")
+        self.assertEqual(bump_namespace("lookups"), 2)
+        self.assertEqual(bump_namespace("fresh"), 2)  # incr() of a missing key falls back to set()
+        self.assertNotEqual(namespaced_key("lookups", "options"), key)
+
+
+class StampedeLockTests(SimpleTestCase):
+    """get_or_compute() only locks on a backend whose add() is atomic."""
+
+    def _caches(self, shared):
+        return {
+            "default": {"BACKEND": "hammer_backendapi.cache.TieredCache", "OPTIONS": {"SHARED": "shared"}},
+            "shared": shared,
+        }
+
+    def test_file_cache_skips_the_lock(self):
+        with tempfile.TemporaryDirectory() as location:
+            shared = {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": location}
+            with self.settings(CACHES=self._caches(shared)):
+                with mock.patch.object(cache, "add", side_effect=AssertionError("locked")):
+                    self.assertEqual(get_or_compute("k", lambda: 1), 1)
+                self.assertEqual(get_or_compute("k", lambda: 2), 1)
+
+    def test_locmem_takes_the_lock(self):
+        shared = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "stampede-test"}
+        with self.settings(CACHES=self._caches(shared)):
+            with mock.patch.object(cache, "add", wraps=cache.add) as add:
+                self.assertEqual(get_or_compute("k", lambda: 1), 1)
+            add.assert_called_once()
+            cache.clear()
+
+
+def _template_pdf(path, pages=8):
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    for number in range(pages):
+        doc.new_page(width=792, height=612).insert_text((72, 72), f"Template page {number}")
+    doc.save(path)
+    doc.close()
+
+
+class TemplateBaseTests(SimpleTestCase):
+    """The template base is built once per template version and keeps each page's content."""
+
+    def setUp(self):
+        from hammer_backendapi.views.utils import pdf_template
+
+        self.pdf_template = pdf_template
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.template = f"{workdir.name}/template.pdf"
+        _template_pdf(self.template, pages=3)
+        pdf_template.clear_template_cache()
+        self.addCleanup(pdf_template.clear_template_cache)
+
+    def test_base_is_built_once(self):
+        for _ in range(3):
+            doc = self.pdf_template.open_template(self.template, page_index=1)
+            self.assertEqual(doc.page_count, 1)
+            self.assertIn("Template page 1", doc[0].get_text())
+            self.assertTrue(doc[0].get_xobjects())  # the original content, wrapped as a Form XObject
+            doc.close()
+        self.assertEqual(self.pdf_template._build_base.cache_info().misses, 1)
+
+        doc = self.pdf_template.open_template(self.template)
+        self.assertEqual([page.get_text().strip() for page in doc], [f"Template page {n}" for n in range(3)])
+        doc.close()
+
+    def test_replaced_template_is_picked_up(self):
+        self.pdf_template.open_template(self.template).close()
+        _template_pdf(self.template, pages=2)
+        stat = os.stat(self.template)
+        os.utime(self.template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        doc = self.pdf_template.open_template(self.template)
+        self.assertEqual(doc.page_count, 2)
+        doc.close()
+
+    @override_settings(CERTIFICATE_TEMPLATE_XOBJECTS=False)
+    def test_pages_copied_as_is_without_xobjects(self):
+        doc = self.pdf_template.open_template(self.template, page_index=2)
+        self.assertFalse(doc[0].get_xobjects())
+        self.assertIn("Template page 2", doc[0].get_text())
+        doc.close()
+
+
+class TextMetricsTests(SimpleTestCase):
+    """Memoised glyph widths match MuPDF's and align certificate fields the same way one by one or in a batch."""
+
+    names = ["Alice Smith", "José Müller", "Łukasz Żak", ""]
+
+    def test_widths_match_mupdf(self):
+        import fitz  # PyMuPDF
+
+        from hammer_backendapi.views.utils.text_metrics import text_length, text_lengths
+
+        self.assertAlmostEqual(text_length("Alice Smith", fontsize=14), fitz.get_text_length("Alice Smith", "helv", 14))
+        for name, width in zip(self.names, text_lengths(self.names, fontsize=12)):
+            with self.subTest(name=name):
+                # Per glyph, so accented and non-Latin-1 names are measured alike
+                expected = sum(fitz.get_text_length(char, "helv", 12) for char in name)
+                self.assertAlmostEqual(width, expected)
+                self.assertAlmostEqual(width, text_length(name, fontsize=12))
+
+    def test_alignment(self):
+        from hammer_backendapi.views.utils.text_metrics import aligned_x, aligned_xs, text_length
+
+        width = text_length("Alice Smith")
+        self.assertEqual(aligned_x(300, "Alice Smith"), 300)
+        self.assertAlmostEqual(aligned_x(300, "Alice Smith", "center"), 300 - width / 2)
+        self.assertAlmostEqual(aligned_x(300, "Alice Smith", "RIGHT"), 300 - width)
+        self.assertEqual(aligned_x(300, "Alice Smith", "justify"), 300)
+        for align in ("left", "center", "right", None):
+            with self.subTest(align=align):
+                batch = aligned_xs(300, self.names, align)
+                for name, x in zip(self.names, batch):
+                    self.assertAlmostEqual(x, aligned_x(300, name, align))
+
+
+class CertificateLayoutTests(SimpleTestCase):
+    """One JSON registry drives single certificates and the master PDF, and is recompiled when it changes."""
+
+    registry = {
+        "version": 3,
+        "certificates": {
+            "cover": {"page": 0, "master_only": True, "fields": [{"value": "full_name", "default": "Unnamed"}]},
+            "portfolio": {
+                "page": 1,
+                "fields": [
+                    {"value": "disc", "default": "N/A", "coords": [10, 20], "align": "Center", "color": [255, 0, 0]},
+                ],
+            },
+            "osha": {"page": 1, "fields": [{"value": "osha_completion_date", "default": "N/A", "fontsize": 9}]},
+        },
+    }
+
+    def setUp(self):
+        from hammer_backendapi.views.utils import certificate_layouts
+
+        self.layouts = certificate_layouts
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.path = f"{workdir.name}/layouts.json"
+        self._write(self.registry)
+        path = override_settings(CERTIFICATE_LAYOUTS_PATH=self.path)
+        path.enable()
+        self.addCleanup(path.disable)
+
+    def _write(self, registry):
+        with open(self.path, "w") as f:
+            json.dump(registry, f)
+
+    def test_single_and_master_plans(self):
+        student = {"full_name": "Ann Lee", "disc_assessment_type": {"type_name": "DC - Dominance"}}
+        self.assertEqual(self.layouts.registry_version(), 3)
+        self.assertEqual(self.layouts.certificate_kinds(), ["portfolio", "osha"])
+
+        page, fields, filename = self.layouts.single_certificate_fields("portfolio", student)
+        self.assertEqual((page, filename), (1, "portfolio_certificate.pdf"))
+        self.assertEqual(fields, [{
+            "text": "Dominance", "coords": (10, 20), "fontsize": 14, "color": (1.0, 0.0, 0.0), "align": "center", "font": "helv",
+        }])
+
+        # Master pages are 1-based, and kinds sharing a page are drawn in one pass
+        master = self.layouts.master_page_fields(student)
+        self.assertEqual([[field["text"] for field in fields] for fields in master.values()], [["Ann Lee"], ["Dominance", "N/A"]])
+        self.assertEqual(self.layouts.master_page_kinds(), {1: ("cover",), 2: ("portfolio", "osha")})
+
+        with self.assertRaises(self.layouts.UnknownCertificateKind):
+            self.layouts.get_layout("nope")
+
+    def test_recompiled_when_the_file_changes(self):
+        self.assertEqual(self.layouts.registry_version(), 3)
+        self._write({**self.registry, "version": 4})
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(self.layouts.registry_version(), 4)
+
+
+class SummaryHtmlTests(SimpleTestCase):
+    """The single-pass tokenizer matches the regex chain it replaced, and trims at section or sentence ends."""
+
+    def test_matches_the_regex_chain(self):
+        from hammer_backendapi.management.commands import benchmark_summary_html as benchmark
+
+        samples = {
+            "compact": benchmark.SAMPLE_SUMMARY,
+            "pre-formatted": benchmark.legacy_clean_html_formatting(benchmark.SAMPLE_SUMMARY),
+            "oversized": benchmark.SAMPLE_SUMMARY * 3,
+        }
+        for name, html in samples.items():
+            with self.subTest(sample=name):
+                html_out, blocks = benchmark.tokenizer_chain(html)
+                legacy_html, legacy_blocks = benchmark.legacy_chain(html)
+                self.assertEqual(html_out, legacy_html)
+                # Block text is the same, with whitespace runs collapsed for the PDF
+                self.assertEqual(blocks, [(kind, " ".join(text.split())) for kind, text in legacy_blocks])
+
+    def test_normalises_and_splits(self):
+        from hammer_backendapi.views.utils.summary_html import process_summary_html
+
+        processed = process_summary_html(
+            "<p>Intro.Second   sentence &amp; more.</p><h2>One</h2><ul><li>x</li><li><strong>y</strong> z</li></ul>"
+            "<style>p {}</style>"
+        )
+        self.assertEqual(
+            processed.html,
+            "<p>Intro.  Second  sentence &amp; more.</p>\n\n<h2>One</h2><ul>\n<li>x</li>\n<li><strong>y</strong> z</li>\n</ul>"
+            "<style>p {}</style>",
+        )
+        self.assertEqual(processed.blocks, [
+            ("paragraph", "Intro. Second sentence & more."), ("heading", "One"), ("bullet", "x"), ("bullet", "y z"),
+        ])
+        self.assertEqual((processed.length, processed.trimmed), (len(processed.html), False))
+
+    def test_trims_at_sentence_ends_without_sections(self):
+        from hammer_backendapi.views.utils.summary_html import process_summary_html
+
+        processed = process_summary_html("<p>One.</p><p>Two.</p><p>Three.</p>", max_length=5, trim_to=25)
+        self.assertEqual(processed.html, "<p>One.</p><p>Two.</p>")
+        self.assertEqual(processed.blocks, [("paragraph", "One."), ("paragraph", "Two.")])
+        self.assertTrue(processed.trimmed)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class SummaryPdfTests(SimpleTestCase):
+    """Summary PDFs render from blocks parsed once per summary and styles built once per process."""
+
+    html = "<p>Ann leads by example.</p><h2>Work Style</h2><ul><li>Checks the plans.</li><li>Asks questions.</li></ul>"
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_blocks_parsed_once(self):
+        from hammer_backendapi.views.utils import summary_pdf
+
+        with mock.patch.object(summary_pdf, "parse_summary_blocks", wraps=summary_pdf.parse_summary_blocks) as parse:
+            first = summary_pdf.summary_blocks(self.html)
+            again = summary_pdf.summary_blocks(self.html)
+        parse.assert_called_once()
+        self.assertEqual(first, again)
+        self.assertEqual(first[:2], [("paragraph", "Ann leads by example."), ("heading", "Work Style")])
+
+        # Blocks stored while the summary was processed are used as they are
+        summary_pdf.cache_summary_blocks("<p>Other</p>", [("paragraph", "Stored")])
+        self.assertEqual(summary_pdf.summary_blocks("<p>Other</p>"), [("paragraph", "Stored")])
+
+    def test_render(self):
+        import fitz  # PyMuPDF
+
+        from hammer_backendapi.views.utils import summary_pdf
+
+        self.assertIs(summary_pdf.summary_styles(), summary_pdf.summary_styles())
+        pdf = summary_pdf.render_summary_pdf(self.html, "Ann Lee")
+        with fitz.open("pdf", pdf) as doc:
+            self.assertEqual(doc.page_count, 1)
+            text = doc[0].get_text()
+        for expected in ("Personality Summary", "Ann Lee", "Work Style", "• Checks the plans."):
+            self.assertIn(expected, text)
+
+
+class ProfilingTests(TestCase):
+    """Staff can profile a request; each profile is three files, and only the newest PROFILING_KEEP stay."""
+
+    @classmethod
+    def setUpTestData(cls):
+        from rest_framework.authtoken.models import Token
+
+        cls.staff = User.objects.create_user("staff", password="pw", is_staff=True)
+        Teacher.objects.create(user=cls.staff, full_name="Staff", email="staff@example.org", password="x")
+        cls.staff_token = Token.objects.create(user=cls.staff).key
+        cls.teacher_token = Token.objects.create(user=User.objects.create_user("teacher", password="pw")).key
+
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.directory = workdir.name
+        profiling = override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0, PROFILING_DIR=self.directory)
+        profiling.enable()
+        self.addCleanup(profiling.disable)
+
+    def _get(self, token, **query):
+        return self.client.get(reverse("student-list"), query, HTTP_AUTHORIZATION=f"Token {token}")
+
+    def test_staff_request_is_profiled(self):
+        from hammer_backendapi import profiling
+
+        response = self._get(self.staff_token, profile="1")
+        self.assertEqual(response.status_code, 200)
+        profile_id = response["X-Profile-Id"]
+        for ext in profiling.PROFILE_EXTENSIONS:
+            self.assertIsNotNone(profiling.profile_file_path(profile_id, ext))
+        [meta] = profiling.recent_profiles()
+        self.assertEqual((meta["id"], meta["user"], meta["status"], meta["trigger"]), (profile_id, "staff", 200, "requested"))
+        self.assertGreater(meta["query_count"], 0)
+        self.assertIsNone(profiling.profile_file_path(f"../{profile_id}", ".json"))
+
+        # Only staff can ask for a profile
+        self.assertNotIn("X-Profile-Id", self._get(self.teacher_token, profile="1"))
+        self.assertNotIn("X-Profile-Id", self._get(self.staff_token))
+
+    def test_prune_keeps_the_newest(self):
+        from hammer_backendapi import profiling
+
+        ids = [f"20261019-12000{n}-000000-1-abcd" for n in range(5)]
+        for profile_id in ids:
+            for ext in profiling.PROFILE_EXTENSIONS:
+                open(os.path.join(self.directory, profile_id + ext), "w").close()
+        profiling.prune_profiles(0)  # 0 keeps everything
+        self.assertEqual(len(os.listdir(self.directory)), 15)
+        profiling.prune_profiles(2)
+        self.assertEqual(sorted(os.listdir(self.directory)), sorted(i + ext for i in ids[-2:] for ext in profiling.PROFILE_EXTENSIONS))
+
+
+class QueryInspectorTests(TestCase):
+    """Per-row repeats of a query collapse to one shape and are reported as N+1 with the code that ran them."""
+
+    def test_sql_shape(self):
+        from hammer_backendapi.query_inspector import sql_shape
+
+        self.assertEqual(
+            sql_shape("SELECT *  FROM t\nWHERE id = 12 AND name = 'O''Brien' AND x IN (%s, %s, %s)"),
+            "SELECT * FROM t WHERE id = ? AND name = ? AND x IN (...)",
+        )
+        self.assertEqual(sql_shape('SELECT "a" FROM t WHERE id = 1'), sql_shape('SELECT "a" FROM t WHERE id = 250'))
+
+    def test_repeated_queries_are_reported(self):
+        from hammer_backendapi import query_inspector
+
+        org = Organization.objects.create(name="Org")
+        for n in range(3):
+            Teacher.objects.create(full_name=f"T{n}", email=f"t{n}@example.org", password="x", organization=org)
+        recorder = query_inspector.QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            names = [teacher.organization.name for teacher in Teacher.objects.all()]  # one lookup per teacher
+        self.assertEqual(names, ["Org"] * 3)
+
+        entry = query_inspector.analyse(recorder.queries, "GET teachers", 200, repeat_threshold=3, slow_ms=10_000)
+        self.assertEqual(entry["query_count"], 4)
+        [repeated] = entry["repeated"]
+        self.assertEqual(repeated["count"], 3)
+        self.assertIn("hammer_backendapi_organization", repeated["shape"])
+        self.assertIn("tests.py", repeated["origin"])
+        self.assertEqual(entry["slow"], [])
+
+        report = query_inspector.aggregate([entry, entry])["GET teachers"]
+        self.assertEqual((report["requests"], report["queries"], report["max_queries"]), (2, 8, 4))
+        self.assertEqual(report["repeated"][repeated["shape"]]["requests"], 2)
+
+
+class JSONRenderingTests(SimpleTestCase):
+    """orjson output is byte-for-byte DRF's, and large JSON responses are compressed."""
+
+    def test_orjson_matches_drf(self):
+        import decimal
+        import uuid
+
+        from django.utils.translation import gettext_lazy
+        from rest_framework.renderers import JSONRenderer
+
+        from hammer_backendapi.renderers import ORJSONRenderer
+
+        data = {
+            "score": decimal.Decimal("87.50"),
+            "created_at": datetime.datetime(2026, 10, 19, 8, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            "updated_at": datetime.datetime(2026, 10, 19, 8, 30),
+            "end_date": datetime.date(2026, 6, 1),
+            "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "label": gettext_lazy("Unassigned"),
+            "name": "José Müller",
+            1: [None, True, 1.5],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def _compress(self, content, content_type="application/json", accept="gzip, deflate, br"):
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+
+        from hammer_backendapi.middleware import CompressionMiddleware
+
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept)
+        middleware = CompressionMiddleware(lambda request: HttpResponse(content, content_type=content_type))
+        return middleware(request)
+
+    def test_compression(self):
+        import gzip
+
+        from hammer_backendapi import middleware
+
+        body = json.dumps([{"full_name": f"Student {n}", "email": f"s{n}@example.org"} for n in range(100)]).encode()
+        if middleware.brotli is not None:
+            response = self._compress(body)
+            self.assertEqual(response["Content-Encoding"], "br")
+            self.assertEqual(middleware.brotli.decompress(response.content), body)
+
+        response = self._compress(body, accept="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), body)
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        for response in (self._compress(b'{"ok":true}'), self._compress(body, content_type="application/pdf")):
+            self.assertFalse(response.has_header("Content-Encoding"))
+
+
+class StartupImportTests(SimpleTestCase):
+    """A worker can serve without importing the libraries that are loaded on first use."""
+
+    def test_deferred_modules_stay_unloaded(self):
+        import subprocess
+        import sys
+
+        from django.conf import settings
+
+        from hammer_backendapi.management.commands.import_report import PROBE
+
+        probe = PROBE + "import sys\nprint(' '.join(sorted(set(sys.modules) & set(sys.argv[1:]))))\n"
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": "hammer_backendproject.settings"}
+        result = subprocess.run(
+            [sys.executable, "-c", probe, *settings.STARTUP_DEFERRED_MODULES],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        self.assertEqual(result.stdout.splitlines()[-1], "")
+
+    def test_parse_importtime(self):
+        from hammer_backendapi.management.commands.import_report import parse_importtime
+
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   fitz._fitz\n"
+            "import time:      3500 |       3620 | fitz\n"
+            "unrelated warning\n"
+        )
+        self.assertEqual(list(parse_importtime(stderr)), [("fitz._fitz", 120, 120), ("fitz", 3500, 3620)])
+
+
+class ReadinessTests(SimpleTestCase):
+    """/ready/ answers 503 until warm-up has run in this process, and a failed step does not block it."""
+
+    def setUp(self):
+        from hammer_backendapi import warmup
+
+        self.warmup = warmup
+        patcher = mock.patch.dict(warmup._state, {"ready": False, "started": False, "seconds": None, "errors": []})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_not_ready_before_warm_up(self):
+        with mock.patch.object(self.warmup, "warm_up_in_background") as background, self.assertLogs("django.request"):
+            response = self.client.get("/api/ready/")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "warming")
+        background.assert_called_once()
+
+        def missing_template():
+            raise FileNotFoundError("template.pdf")
+
+        with mock.patch.object(self.warmup, "_render_caches", missing_template), \
+                mock.patch.object(self.warmup, "_openai"), mock.patch.object(self.warmup, "_lookups") as lookups, \
+                self.assertLogs("hammer_backendapi.warmup", "WARNING"):
+            self.warmup.warm_up()
+            self.warmup.warm_up()  # only the first call warms
+        lookups.assert_called_once()
+
+        response = self.client.get("/api/ready/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["warmup_errors"], ["render caches: template.pdf"])
+
+
+class IssuedCertificateTests(TestCase):
+    """Issued certificates: rendered once into storage, reused, served only to the student's teacher."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("teacher", password="pw")
+        cls.teacher = Teacher.objects.create(user=cls.user, full_name="Teacher", email="teacher@example.org", password="x")
+        cls.other_user = User.objects.create_user("other", password="pw")
+        Teacher.objects.create(user=cls.other_user, full_name="Other", email="other@example.org", password="x")
+        cls.student = Student.objects.create(
+            teacher=cls.teacher, full_name="Ann Lee", passed_osha_10_exam=True,
+            osha_completion_date=datetime.date(2026, 5, 1), end_date=datetime.date(2026, 6, 1),
+        )
+
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        template = f"{workdir.name}/template.pdf"
+        _template_pdf(template)
+        media = override_settings(MEDIA_ROOT=f"{workdir.name}/media")
+        media.enable()
+        self.addCleanup(media.disable)
+        patcher = mock.patch("hammer_backendapi.views.utils.render_pool.TEMPLATE_PATH", template)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _issue(self, kind="osha", student=None):
+        return self.client.post(reverse("issue-certificate", args=[(student or self.student).pk, kind]))
+
+    def test_rendered_once_then_reused(self):
+        with mock.patch.object(issuance, "_render_signed_pdf", wraps=issuance._render_signed_pdf) as render:
+            first = self._issue()
+            again = self._issue()
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.json()["id"], first.json()["id"])
+        render.assert_called_once()
+
+        certificate = IssuedCertificate.objects.get()
+        self.assertEqual(certificate.fields["full_name"], "Ann Lee")
+        self.assertEqual(certificate.issued_by, self.user)
+        with default_storage.open(certificate.storage_key, "rb") as f:
+            pdf = f.read()
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        self.assertEqual((len(pdf), hashlib.sha256(pdf).hexdigest()), (certificate.size_bytes, certificate.sha256))
+        self.student.refresh_from_db()
+        self.assertNotIn("osha", eligibility.kinds(self.student.certificates_pending))
+
+        # New details print a new certificate; the earlier one stays on record
+        Student.objects.filter(pk=self.student.pk).update(full_name="Ann Lee-Park")
+        changed = self._issue()
+        self.assertEqual(changed.status_code, 201)
+        listed = self.client.get(reverse("list-issued-certificates", args=[self.student.pk])).json()
+        self.assertEqual([row["id"] for row in listed], [changed.json()["id"], first.json()["id"]])
+
+    def test_download_streams_the_stored_pdf(self):
+        certificate_id = self._issue().json()["id"]
+        certificate = IssuedCertificate.objects.get(pk=certificate_id)
+
+        response = self.client.get(reverse("download-issued-certificate", args=[certificate_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertIn('filename="osha_certificate.pdf"', response["Content-Disposition"])
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(hashlib.sha256(b"".join(response.streaming_content)).hexdigest(), certificate.sha256)
+
+    def test_scoped_to_the_teacher(self):
+        certificate_id = self._issue().json()["id"]
+        self.client.force_authenticate(self.other_user)
+        self.assertEqual(self._issue().status_code, 404)
+        self.assertEqual(self.client.get(reverse("list-issued-certificates", args=[self.student.pk])).status_code, 404)
+        self.assertEqual(self.client.get(reverse("download-issued-certificate", args=[certificate_id])).status_code, 404)
+        self.assertEqual(IssuedCertificate.objects.count(), 1)
+
+    def test_unknown_kind(self):
+        self.assertEqual(self._issue("cover").status_code, 404)
+        self.assertEqual(self._issue("nope").status_code, 404)
+        self.assertFalse(IssuedCertificate.objects.exists())
+
+
+@override_settings(PDF_RENDER_WORKERS=1, PDF_RENDER_MAX_QUEUE=0, PDF_RENDER_QUEUE_TIMEOUT=0.05, PDF_RENDER_TIMEOUT=0.05)
+class RenderPoolTests(SimpleTestCase):
+    """Render slots are held until the job ends; pool depth and outcomes reach /metrics."""
+
+    def setUp(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        executor = ThreadPoolExecutor(max_workers=2)  # stands in for the process pool
+        self.addCleanup(executor.shutdown)
+        for patcher in (
+            mock.patch.object(render_pool, "_get_executor", return_value=executor),
+            mock.patch.object(render_pool, "_slots", threading.BoundedSemaphore(1)),
+            mock.patch.dict(render_pool._stats, {key: 0 for key in render_pool._stats}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _sample(self, name, **labels):
+        from prometheus_client import REGISTRY
+
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def _wait_for_free_slot(self):
+        # A pool job's slot is released by its done-callback, after the result is delivered
+        self.assertTrue(render_pool._slots.acquire(timeout=5))
+        render_pool._slots.release()
+
+    def test_timed_out_job_keeps_its_slot(self):
+        release = threading.Event()
+        rejected = self._sample("hammer_pdf_render_jobs_total", outcome="rejected")
+
+        def slow():
+            release.wait(5)
+            return b"pdf"
+
+        with self.assertRaises(FuturesTimeoutError):
+            render_pool.submit_render(slow, kind="test")
+        # The caller gave up, but the job still runs and holds the only slot
+        with self.assertRaises(render_pool.RenderPoolBusy):
+            render_pool.submit_render(lambda: b"pdf", kind="test")
+        self.assertEqual(self._sample("hammer_pdf_render_jobs_total", outcome="rejected"), rejected + 1)
+        self.assertEqual(self._sample("hammer_pdf_render_pool_jobs", state="running"), 1)
+
+        release.set()
+        self._wait_for_free_slot()
+        self.assertEqual(render_pool.submit_render(lambda: b"pdf", kind="test"), b"pdf")
+        self._wait_for_free_slot()
+        self.assertEqual(render_pool.pool_stats()["in_flight"], 0)
+        self.assertEqual(self._sample("hammer_pdf_render_pool_jobs", state="running"), 0)
@@ -0,0 +1,111 @@
+# hammer_backendapi/verification.py
+"""
+Certificate verification
+------------------------
+Every page of a certificate issued for a stored student (issuance.py)
+carries a short signed token, printed as a QR code and a link to
+GET /api/certificates/verify/<token>/. Only values read from the database
+are signed; PDFs rendered from request data (/api/generate/) are not, so a
+valid token means the certificate was really issued. The token holds what
+the page says - the certificate kind(s), the issue date and the printed
+values - plus an HMAC of them. Verifying is a signature check against
+CERTIFICATE_SIGNING_KEY, with no database query, and the answer for a
+given token never changes, so responses are cacheable forever.
+
+Token: base64url(JSON ["osha", "20261019", "Alice Smith", "2025-04-01"])
+"." base64url(first 12 bytes of HMAC-SHA256). Field names are not in the
+token; the verifier labels the values from the layout registry.
+
+Tokens signed with a retired key keep verifying while that key is listed
+in CERTIFICATE_SIGNING_FALLBACK_KEYS - printed certificates outlive keys.
+"""
+
+import datetime
+import json
+
+from django.conf import settings
+from django.core.signing import BadSignature, b64_decode, b64_encode
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+SALT = "hammer_backendapi.verification"
+MAC_BYTES = 12
+
+
+def _secrets():
+    current = settings.CERTIFICATE_SIGNING_KEY or settings.SECRET_KEY
+    return [current, *settings.CERTIFICATE_SIGNING_FALLBACK_KEYS]
+
+
+def _mac(body, secret):
+    return salted_hmac(SALT, body, secret=secret, algorithm="sha256").digest()[:MAC_BYTES]
+
+
+def sign(kinds, values, issued_on=None):
+    """A token for a page showing ``values`` for the certificate ``kinds``, issued ``issued_on`` (today)."""
+    issued_on = issued_on or timezone.localdate()
+    claims = ["+".join(kinds), f"{issued_on:%Y%m%d}", *values]
+    body = b64_encode(json.dumps(claims, separators=(",", ":"), ensure_ascii=False).encode())
+    return f"{body.decode()}.{b64_encode(_mac(body, _secrets()[0])).decode()}"
+
+
+def unsign(token):
+    """
+    The verified claims of a token, {"kinds", "issued_on", "values",
+    "fields"}; ``fields`` labels the values when the registry knows the
+    kinds. Raises BadSignature for a forged, altered or malformed token.
+    """
+    body, _, mac = token.partition(".")
+    try:
+        mac = b64_decode(mac.encode())
+    except ValueError:
+        raise BadSignature("Malformed certificate token.")
+    if not any(constant_time_compare(mac, _mac(body.encode(), secret)) for secret in _secrets()):
+        raise BadSignature("Certificate signature does not match.")
+    try:
+        kind, issued, *values = json.loads(b64_decode(body.encode()))
+        kinds = kind.split("+")
+        issued_on = datetime.datetime.strptime(issued, "%Y%m%d").date()
+    except (ValueError, TypeError, AttributeError):
+        raise BadSignature("Malformed certificate token.")
+    return {"kinds": kinds, "issued_on": issued_on, "values": values, "fields": _labelled(kinds, values)}
+
+
+def _labelled(kinds, values):
+    from hammer_backendapi.views.utils.certificate_layouts import UnknownCertificateKind, field_names
+
+    try:
+        names = field_names(kinds)
+    except UnknownCertificateKind:
+        return None
+    return dict(zip(names, values)) if len(names) == len(values) else None
+
+
+# ---- URLs for issuance.py (never sign values taken from a request) ----
+def verify_url(token):
+    return f"{settings.CERTIFICATE_VERIFY_URL.rstrip('/')}/{token}/"
+
+
+def certificate_verify_url(kind, fields):
+    """Verify URL for a single certificate drawn from ``fields``; None for kinds outside the registry."""
+    from hammer_backendapi.views.utils.certificate_layouts import UnknownCertificateKind, get_layout
+
+    try:
+        if get_layout(kind)["master_only"]:
+            return None
+    except UnknownCertificateKind:
+        return None
+    return verify_url(sign([kind], [field.get("text", "") for field in fields]))
+
+
+def master_verify_urls(page_fields_map):
+    """1-based page -> verify URL for the master set; pages with only master-only layouts (the cover) get none."""
+    from hammer_backendapi.views.utils.certificate_layouts import get_layout, master_page_kinds
+
+    page_kinds = master_page_kinds()
+    urls = {}
+    for page, fields in (page_fields_map or {}).items():
+        kinds = page_kinds.get(page, ())
+        if kinds and not all(get_layout(kind)["master_only"] for kind in kinds):
+            urls[page] = verify_url(sign(kinds, [field.get("text", "") for field in fields]))
+    return urls
@@ -7,7 +7,8 @@ and returns a SINGLE HTML string (no <html>/<body> wrapper), ready to drop into
 Django template.
 
 • Input:  a Student model instance
-• Output: HTML string via generate_long_summary_html(student)
+• Output: HTML string via generate_long_summary_html(student), or
+           await agenerate_long_summary_html(student) from async views (AsyncOpenAI)
 
 Implementation notes:
 - Clean OpenAI client initialization without proxy issues
@@ -18,17 +19,21 @@ Implementation notes:
 
 import os
 import json
+import time
+import asyncio
+import weakref
 from django.conf import settings
+from django.http import HttpResponse, JsonResponse
 from django.template.loader import render_to_string
+from django.views.decorators.http import require_POST
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from ..models import Student
+from .. import metrics
+from ..singleflight import IdempotencyKeyMismatch, acoalesced, coalesced, mismatch_response
+from .utils.async_api import parse_error_response, request_data, token_auth_required
 from typing import Any, Dict
-from django.conf import settings
-import re
-from html import unescape
-from io import BytesIO
 
 # Initialize OpenAI client safely - will be initialized when first needed
 client = None
@@ -114,6 +119,26 @@ def get_openai_client():
         traceback.print_exc()
         return None
 
+# AsyncOpenAI clients hold an httpx.AsyncClient, which is bound to the event loop
+# that created it: one per loop (a single loop under ASGI, one per request under WSGI)
+_async_clients = weakref.WeakKeyDictionary()
+
+def get_async_openai_client():
+    """AsyncOpenAI counterpart of get_openai_client() (same key, timeout and retries) for async views"""
+    loop = asyncio.get_running_loop()
+    async_client = _async_clients.get(loop)
+    if async_client is None:
+        sync_client = get_openai_client()
+        if sync_client is None:
+            return None
+        from openai import AsyncOpenAI
+        async_client = _async_clients[loop] = AsyncOpenAI(
+            api_key=sync_client.api_key,
+            timeout=20.0,
+            max_retries=0
+        )
+    return async_client
+
 MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # Use gpt-4o-mini as default for better reliability
 
 # Prompt for generating personality summaries - WORKPLACE-FOCUSED FOR STUDENTS
@@ -214,8 +239,8 @@ def _safe_extract_html(response_content: str) -> str:
                 html_content = data["html"]
                 print(f"[AI] Extracted HTML (first 300 chars): {html_content[:300]}...")
                 
-                # Clean and format the HTML
-                html_content = _clean_html_formatting(html_content)
+                # Clean, format and fit to one page
+                html_content = _normalise_summary_html(html_content)
                 
                 return html_content
             else:
@@ -231,8 +256,8 @@ def _safe_extract_html(response_content: str) -> str:
                 html_content = html_match.group(1).replace('\\"', '"').replace('\\n', '\n')
                 print(f"[AI] Extracted HTML via regex (first 300 chars): {html_content[:300]}...")
                 
-                # Clean and format the HTML
-                html_content = _clean_html_formatting(html_content)
+                # Clean, format and fit to one page
+                html_content = _normalise_summary_html(html_content)
                 
                 return html_content
             else:
@@ -242,36 +267,22 @@ def _safe_extract_html(response_content: str) -> str:
         print(f"[AI] Unexpected error in _safe_extract_html: {e}")
         return _create_error_content(f"Unexpected error: {str(e)}", "Student")
 
-def _clean_html_formatting(html_content: str) -> str:
+def _normalise_summary_html(html_content: str) -> str:
     """
-    Clean and ensure proper HTML formatting for consistency.
+    Normalise, measure and (if needed) trim the model's HTML in a single pass.
+    Content over 4500 chars is silently trimmed at a natural section boundary
+    so it fits on one page. The PDF-ready blocks from the same pass are cached
+    for the summary renderers.
     """
-    import re
-    
-    # Ensure proper spacing after periods in paragraph text (not in HTML tags)
-    def fix_period_spacing(match):
-        text = match.group(0)
-        # Add proper spacing after periods followed by capital letters
-        text = re.sub(r'\.(?=[A-Z])', '.  ', text)
-        return text
-    
-    # Apply period spacing fix to paragraph content only
-    html_content = re.sub(r'<p>(.*?)</p>', fix_period_spacing, html_content, flags=re.DOTALL)
-    
-    # Ensure proper list formatting - each <li> on its own line
-    html_content = re.sub(r'</li><li>', '</li>\n<li>', html_content)
-    html_content = re.sub(r'<ul><li>', '<ul>\n<li>', html_content)
-    html_content = re.sub(r'</li></ul>', '</li>\n</ul>', html_content)
-    
-    # Ensure proper heading spacing
-    html_content = re.sub(r'</p><h2>', '</p>\n\n<h2>', html_content)
-    html_content = re.sub(r'</h2><p>', '</h2>\n<p>', html_content)
-    html_content = re.sub(r'</ul><h2>', '</ul>\n\n<h2>', html_content)
-    
-    # Remove any double spaces that might have been created
-    html_content = re.sub(r'  +', '  ', html_content)
-    
-    return html_content.strip()
+    from .utils.summary_html import process_summary_html
+    from .utils.summary_pdf import cache_summary_blocks
+
+    processed = process_summary_html(html_content, max_length=4500, trim_to=4200)
+    print(f"[AI] Content length: {processed.length} characters{' (trimmed)' if processed.trimmed else ''}")
+    cache_summary_blocks(processed.html, processed.blocks)
+    return processed.html
+
+_ERROR_MARKER = "AI Summary Generation Issue"  # present in every _create_error_content result
 
 def _create_error_content(error_msg: str, student_name: str) -> str:
     """Create a helpful error message in HTML format."""
@@ -286,44 +297,60 @@ def _create_error_content(error_msg: str, student_name: str) -> str:
     </ul>
     """
 
-def _validate_content_length(html: str, student_name: str) -> str:
-    """
-    Ensure content fits on one page - silently trim if needed without showing truncation message.
-    """
-    print(f"[AI] Content length: {len(html)} characters")
+def _chat_params(payload: dict, model_id: str) -> dict:
+    """Chat completion arguments for the summary prompt."""
+    # Format messages
+    messages = [
+        {"role": "system", "content": INSTR},
+        {"role": "user", "content": json.dumps(payload)}
+    ]
     
-    # If content is too long, silently trim it at natural breaking points
-    if len(html) > 4500:  # Conservative limit for one page
-        print(f"[AI] Content too long ({len(html)} chars), silently trimming...")
-        
-        # Try to find a good natural breaking point (end of a section)
-        sections = html.split('<h2>')
-        if len(sections) > 1:
-            # Keep intro + first 3 sections maximum
-            trimmed = sections[0]  # intro
-            section_count = 0
-            for section in sections[1:]:
-                if section_count < 3 and len(trimmed + '<h2>' + section) < 4200:
-                    trimmed += '<h2>' + section
-                    section_count += 1
-                else:
-                    break
-            
-            print(f"[AI] Trimmed to {len(trimmed)} characters, {section_count + 1} sections")
-            return trimmed
+    # Prepare API call parameters based on model
+    api_params = {
+        "model": model_id,
+        "messages": messages
+    }
+    
+    # Use appropriate token parameter based on model
+    if "gpt-5" in model_id.lower():
+        api_params["max_completion_tokens"] = 1500  # Reduced to ensure completion
+        # GPT-5 mini only supports default temperature=1
+    else:
+        api_params["max_tokens"] = 1500  # Reduced to ensure completion  
+        api_params["temperature"] = 0.7  # GPT-4 supports custom temperature
+    return api_params
+
+def _completion_content(response, model_id: str, started: float) -> str:
+    """Record metrics and extract the message content (or error content) from a completion."""
+    # Extract content with detailed logging and finish_reason check
+    choice = response.choices[0]
+    content = choice.message.content
+    finish_reason = choice.finish_reason
+    metrics.observe_openai(model_id, time.perf_counter() - started, response.usage, finish_reason)
+    
+    print(f"[AI] OpenAI response - content type: {type(content)}")
+    print(f"[AI] OpenAI response - content is None: {content is None}")
+    print(f"[AI] OpenAI response - content length: {len(content) if content else 0}")
+    print(f"[AI] OpenAI response - finish_reason: {finish_reason}")
+    
+    # Check for truncation
+    if finish_reason == "length":
+        print(f"[AI] WARNING: Response was truncated due to token limit!")
+        print(f"[AI] Token usage: {response.usage}")
+        # For truncated responses, we might get incomplete JSON
+        if content and len(content) > 0:
+            print(f"[AI] Trying to use partial content: {content[:200]}...")
         else:
-            # If no sections to split, trim at sentence boundaries
-            sentences = html.split('.</p>')
-            trimmed = ""
-            for sentence in sentences:
-                if len(trimmed + sentence + '.</p>') < 4200:
-                    trimmed += sentence + '.</p>'
-                else:
-                    break
-            print(f"[AI] Trimmed to {len(trimmed)} characters at sentence boundary")
-            return trimmed
+            print(f"[AI] Content is empty despite 200 OK - likely truncation issue")
+            return _create_error_content("Response truncated due to token limit. Please try again.", "Student")
     
-    return html
+    if content:
+        print(f"[AI] OpenAI response - first 500 chars: {content[:500]}")
+    else:
+        print(f"[AI] OpenAI response - CONTENT IS EMPTY!")
+        return _create_error_content("OpenAI returned empty response", "Student")
+    
+    return content
 
 def _call_openai_api(payload: dict, model_id: str = None) -> str:
     """
@@ -336,67 +363,86 @@ def _call_openai_api(payload: dict, model_id: str = None) -> str:
     if model_id is None:
         model_id = MODEL
     
-    # Format messages
-    messages = [
-        {"role": "system", "content": INSTR},
-        {"role": "user", "content": json.dumps(payload)}
-    ]
-    
     try:
-        # Prepare API call parameters based on model
-        api_params = {
-            "model": model_id,
-            "messages": messages
-        }
-        
-        # Use appropriate token parameter based on model
-        if "gpt-5" in model_id.lower():
-            api_params["max_completion_tokens"] = 1500  # Reduced to ensure completion
-            # GPT-5 mini only supports default temperature=1
-        else:
-            api_params["max_tokens"] = 1500  # Reduced to ensure completion  
-            api_params["temperature"] = 0.7  # GPT-4 supports custom temperature
-        
-        response = client.chat.completions.create(**api_params)
-        
-        # Extract content with detailed logging and finish_reason check
-        choice = response.choices[0]
-        content = choice.message.content
-        finish_reason = choice.finish_reason
-        
-        print(f"[AI] OpenAI response - content type: {type(content)}")
-        print(f"[AI] OpenAI response - content is None: {content is None}")
-        print(f"[AI] OpenAI response - content length: {len(content) if content else 0}")
-        print(f"[AI] OpenAI response - finish_reason: {finish_reason}")
-        
-        # Check for truncation
-        if finish_reason == "length":
-            print(f"[AI] WARNING: Response was truncated due to token limit!")
-            print(f"[AI] Token usage: {response.usage}")
-            # For truncated responses, we might get incomplete JSON
-            if content and len(content) > 0:
-                print(f"[AI] Trying to use partial content: {content[:200]}...")
-            else:
-                print(f"[AI] Content is empty despite 200 OK - likely truncation issue")
-                return _create_error_content("Response truncated due to token limit. Please try again.", "Student")
-        
-        if content:
-            print(f"[AI] OpenAI response - first 500 chars: {content[:500]}")
-        else:
-            print(f"[AI] OpenAI response - CONTENT IS EMPTY!")
-            return _create_error_content("OpenAI returned empty response", "Student")
+        api_params = _chat_params(payload, model_id)
+        started = time.perf_counter()
+        try:
+            response = client.chat.completions.create(**api_params)
+        except Exception:
+            metrics.observe_openai(model_id, time.perf_counter() - started)
+            raise
+        return _completion_content(response, model_id, started)
         
-        return content
+    except Exception as e:
+        print(f"[AI] OpenAI API call failed: {type(e).__name__}: {str(e)}")
+        raise
+
+async def _acall_openai_api(payload: dict, model_id: str = None) -> str:
+    """_call_openai_api() with AsyncOpenAI: the event loop serves other requests while we wait."""
+    client = get_async_openai_client()
+    if client is None:
+        raise Exception("OpenAI client is not initialized. Check OPENAI_API_KEY.")
+    
+    if model_id is None:
+        model_id = MODEL
+    
+    try:
+        api_params = _chat_params(payload, model_id)
+        started = time.perf_counter()
+        try:
+            response = await client.chat.completions.create(**api_params)
+        except Exception:
+            metrics.observe_openai(model_id, time.perf_counter() - started)
+            raise
+        return _completion_content(response, model_id, started)
         
     except Exception as e:
         print(f"[AI] OpenAI API call failed: {type(e).__name__}: {str(e)}")
         raise
 
-def generate_long_summary_html(student) -> str:
+def generate_long_summary_html(student, idempotency_key: str = None, user=None) -> str:
     """
     Public helper that generates AI personality summary for a student.
     Returns HTML string suitable for direct insertion into templates.
+
+    Concurrent requests for the same student and assessment data (or with the
+    same Idempotency-Key from ``user``) share one OpenAI call; error content
+    is not reused. Raises IdempotencyKeyMismatch when the key was used for
+    other data.
+    """
+    payload = {"name": student.full_name, "meta": build_meta(student)}
+    return coalesced(
+        "ai_summary", (MODEL, student.pk, payload),
+        lambda: _generate_long_summary_html(student),
+        idempotency_key=idempotency_key, user=user,
+        should_cache=lambda html: _ERROR_MARKER not in html,
+    )
+
+
+async def agenerate_long_summary_html(student, idempotency_key: str = None, user=None) -> str:
     """
+    generate_long_summary_html() for async views, using AsyncOpenAI. Shares
+    coalescing keys (and cached results) with the sync helper. The student's
+    assessment relations must be loaded already (select_related).
+    """
+    payload = {"name": student.full_name, "meta": build_meta(student)}
+    return await acoalesced(
+        "ai_summary", (MODEL, student.pk, payload),
+        lambda: _agenerate_long_summary_html(student),
+        idempotency_key=idempotency_key, user=user,
+        should_cache=lambda html: _ERROR_MARKER not in html,
+    )
+
+
+# Related objects build_meta() reads; async views must select_related them
+SUMMARY_RELATED = ("disc_assessment_type", "sixteen_types_assessment", "enneagram_result", "osha_type")
+
+# (label, model) tried in order; the fallback is gpt-4o-mini in case gpt-5-mini failed
+def _summary_models():
+    return (("primary", MODEL), ("fallback", "gpt-4o-mini"))
+
+def _summary_preflight(student, client_getter):
+    """Error content if the API key or client is missing, else None."""
     print(f"[AI] Generating summary for student: {student.full_name}")
     
     # Check API key availability
@@ -407,57 +453,39 @@ def generate_long_summary_html(student) -> str:
         return _create_error_content(error_msg, student.full_name)
     
     # Check client initialization
-    client = get_openai_client()
-    if client is None:
+    if client_getter() is None:
         error_msg = "OpenAI client failed to initialize"
         print(f"[AI] Error: {error_msg}")
         return _create_error_content(error_msg, student.full_name)
     
-    # Build payload
-    payload = {
-        "name": student.full_name,
-        "meta": build_meta(student)
-    }
-    
     print(f"[AI] Using model: {MODEL}")
-    print(f"[AI] Payload: {payload}")
-    
-    # Try primary model with aggressive timeout
-    try:
-        print(f"[AI] Attempting primary model call: {MODEL}")
-        response_content = _call_openai_api(payload, MODEL)
-        html = _safe_extract_html(response_content)
-        
-        # Check if we got a real response
-        if "personality assessment data is being processed" not in html:
-            validated_html = _validate_content_length(html, student.full_name)
-            print("[AI] Primary model successful")
-            return validated_html
-            
-    except Exception as e:
-        print(f"[AI] Primary model failed: {type(e).__name__}: {str(e)}")
-        
-        # Check for specific error types
-        error_str = str(e).lower()
-        if "authentication" in error_str or "api_key" in error_str:
-            return _create_error_content(f"OpenAI API key authentication failed: {str(e)}", student.full_name)
-        elif "rate_limit" in error_str or "quota" in error_str:
-            return _create_error_content(f"OpenAI API rate limit exceeded: {str(e)}", student.full_name)
-    
-    # Try fallback model (gpt-4o-mini if gpt-5-mini failed)
-    try:
-        print("[AI] Trying fallback model: gpt-4o-mini")
-        response_content = _call_openai_api(payload, "gpt-4o-mini")
-        html = _safe_extract_html(response_content)
-        
-        if "personality assessment data is being processed" not in html:
-            validated_html = _validate_content_length(html, student.full_name)
-            print("[AI] Fallback model successful")
-            return validated_html
-            
-    except Exception as e:
-        print(f"[AI] Fallback model also failed: {type(e).__name__}: {str(e)}")
+    return None
+
+def _summary_from_response(response_content: str, label: str):
+    """The summary HTML if the model gave a real answer, else None (try the next model)."""
+    html = _safe_extract_html(response_content)
+    
+    # Check if we got a real response
+    if "personality assessment data is being processed" not in html:
+        print(f"[AI] {label.capitalize()} model successful")
+        return html  # already normalised and trimmed by _safe_extract_html
+    return None
+
+def _summary_failure(e: Exception, label: str, student):
+    """Log a failed attempt; error content if it's not worth trying the fallback model."""
+    print(f"[AI] {label.capitalize()} model failed: {type(e).__name__}: {str(e)}")
+    if label != "primary":
+        return None
     
+    # Check for specific error types
+    error_str = str(e).lower()
+    if "authentication" in error_str or "api_key" in error_str:
+        return _create_error_content(f"OpenAI API key authentication failed: {str(e)}", student.full_name)
+    elif "rate_limit" in error_str or "quota" in error_str:
+        return _create_error_content(f"OpenAI API rate limit exceeded: {str(e)}", student.full_name)
+    return None
+
+def _summary_unavailable(student) -> str:
     # Final fallback
     print("[AI] All attempts failed - returning error message")
     return _create_error_content(
@@ -465,155 +493,63 @@ def generate_long_summary_html(student) -> str:
         student.full_name
     )
 
-def convert_html_to_pdf_reportlab(html_content: str, student_name: str) -> bytes:
-    """
-    Convert HTML to PDF using ReportLab - Clean, minimal design matching Cameron Hall PDF
-    Single page format with simple, readable styling
-    """
-    try:
-        from reportlab.lib.pagesizes import letter
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.colors import HexColor
-    except ImportError as e:
-        raise Exception(f"ReportLab not available: {e}")
-    
-    buffer = BytesIO()
-    
-    # Create PDF document with minimal margins for maximum content space
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=letter,
-        rightMargin=40,
-        leftMargin=40,
-        topMargin=30,
-        bottomMargin=30
-    )
-    
-    # Simple, clean colors - minimal palette
-    dark_text = HexColor('#1a202c')      # Rich dark gray
-    medium_text = HexColor('#2d3748')    # Medium gray  
-    light_text = HexColor('#718096')     # Light gray for dates
-    section_text = HexColor('#2c5282')   # Subtle blue for headings
-    
-    # Get base styles
-    styles = getSampleStyleSheet()
-    
-    # Clean, elegant styles matching Cameron Hall PDF
-    title_style = ParagraphStyle(
-        'CleanTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=6,
-        spaceBefore=0,
-        alignment=1,  # Center
-        textColor=dark_text,
-        fontName='Helvetica-Bold'
-    )
-    
-    name_style = ParagraphStyle(
-        'CleanName',
-        parent=styles['Heading2'],
-        fontSize=15,
-        spaceAfter=4,
-        spaceBefore=2,
-        alignment=1,  # Center
-        textColor=section_text,
-        fontName='Helvetica-Bold'
-    )
+def _generate_long_summary_html(student) -> str:
+    error = _summary_preflight(student, get_openai_client)
+    if error:
+        return error
     
-    date_style = ParagraphStyle(
-        'CleanDate',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=18,
-        alignment=1,  # Center
-        textColor=light_text,
-        fontName='Helvetica-Oblique'
-    )
-    
-    section_style = ParagraphStyle(
-        'CleanSection',
-        parent=styles['Heading3'],
-        fontSize=12,
-        spaceAfter=5,
-        spaceBefore=12,
-        textColor=section_text,
-        fontName='Helvetica-Bold',
-        leftIndent=0
-    )
-    
-    body_style = ParagraphStyle(
-        'CleanBody',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=4,
-        spaceBefore=1,
-        alignment=0,  # Left
-        textColor=dark_text,
-        fontName='Helvetica',
-        leftIndent=0,
-        rightIndent=0,
-        leading=12
-    )
-    
-    bullet_style = ParagraphStyle(
-        'CleanBullet',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=3,
-        alignment=0,
-        textColor=dark_text,
-        fontName='Helvetica',
-        leftIndent=15,
-        leading=12
-    )
-    
-    # Create story (content)
-    story = []
-    
-    # Simple, clean header
-    story.append(Paragraph("Personality Summary", title_style))
-    story.append(Paragraph(student_name, name_style))
-    
-    # Add generation date
-    from datetime import datetime
-    story.append(Paragraph(datetime.now().strftime('%B %d, %Y'), date_style))
-    
-    # Parse and add content with minimal styling
-    lines = html_content.split('\n')
+    payload = {
+        "name": student.full_name,
+        "meta": build_meta(student)
+    }
+    print(f"[AI] Payload: {payload}")
     
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Check if this is a heading (contains <h2> tags)
-        if '<h2>' in line and '</h2>' in line:
-            section_title = re.sub(r'<[^>]+>', '', line)
-            section_title = unescape(section_title)
-            story.append(Paragraph(section_title, section_style))
-            
-        elif '<p>' in line:
-            # This is a paragraph
-            paragraph_text = re.sub(r'<[^>]+>', '', line)
-            paragraph_text = unescape(paragraph_text)
-            if paragraph_text:
-                story.append(Paragraph(paragraph_text, body_style))
-                
-        elif '<li>' in line:
-            # This is a list item - simple bullet
-            item_text = re.sub(r'<[^>]+>', '', line)
-            item_text = unescape(item_text)
-            if item_text:
-                story.append(Paragraph(f"• {item_text}", bullet_style))
+    # Try primary model, then fallback model
+    for label, model_id in _summary_models():
+        try:
+            print(f"[AI] Attempting {label} model call: {model_id}")
+            html = _summary_from_response(_call_openai_api(payload, model_id), label)
+            if html is not None:
+                return html
+        except Exception as e:
+            error = _summary_failure(e, label, student)
+            if error:
+                return error
+    
+    return _summary_unavailable(student)
+
+async def _agenerate_long_summary_html(student) -> str:
+    error = _summary_preflight(student, get_async_openai_client)
+    if error:
+        return error
     
-    # Build PDF
-    doc.build(story)
+    payload = {
+        "name": student.full_name,
+        "meta": build_meta(student)
+    }
+    print(f"[AI] Payload: {payload}")
     
-    # Get the PDF bytes
-    buffer.seek(0)
-    return buffer.getvalue()
+    for label, model_id in _summary_models():
+        try:
+            print(f"[AI] Attempting {label} model call: {model_id}")
+            html = _summary_from_response(await _acall_openai_api(payload, model_id), label)
+            if html is not None:
+                return html
+        except Exception as e:
+            error = _summary_failure(e, label, student)
+            if error:
+                return error
+    
+    return _summary_unavailable(student)
+
+def convert_html_to_pdf_reportlab(html_content: str, student_name: str) -> bytes:
+    """
+    Convert HTML to PDF using ReportLab - Clean, minimal design matching Cameron Hall PDF
+    Single page format with simple, readable styling.
+    Styles are built once per process and parsed blocks are cached (see utils/summary_pdf.py).
+    """
+    from .utils.summary_pdf import render_summary_pdf
+    return render_summary_pdf(html_content, student_name)
 
 # Test function for debugging
 def test_openai_connection():
@@ -637,40 +573,49 @@ def test_openai_connection():
 
 # Django REST API Views
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])  
-def generate_ai_summary(request):
-    """Generate AI summary PDF for a student"""
+@require_POST
+@token_auth_required
+async def generate_ai_summary(request):
+    """Generate AI summary PDF for a student (async: waits on OpenAI without holding a worker)"""
+    data = request_data(request)
+    if data is None:
+        return parse_error_response()
     try:
-        student_id = request.data.get('student_id')
+        student_id = data.get('student_id')
         if not student_id:
-            return Response({
+            return JsonResponse({
                 'success': False,
                 'error': 'student_id is required'
             }, status=400)
             
         try:
-            student = Student.objects.get(id=student_id)
+            student = await Student.objects.select_related(*SUMMARY_RELATED).aget(id=student_id)
         except Student.DoesNotExist:
-            return Response({
+            return JsonResponse({
                 'success': False,
                 'error': 'Student not found'
             }, status=404)
             
         # Generate the AI summary HTML
-        html_content = generate_long_summary_html(student)
+        try:
+            html_content = await agenerate_long_summary_html(
+                student, request.headers.get("Idempotency-Key"), user=request.user
+            )
+        except IdempotencyKeyMismatch as e:
+            return mismatch_response(e)
         
         # Check if HTML generation failed
-        if "AI Summary Generation Issue" in html_content:
-            return Response({
+        if _ERROR_MARKER in html_content:
+            return JsonResponse({
                 'success': False,
                 'error': 'AI summary generation failed',
                 'html_content': html_content
             }, status=500)
         
-        # Convert HTML to PDF using ReportLab (Railway compatible)
+        # Convert HTML to PDF using ReportLab (Railway compatible), via the render pool
         try:
-            pdf_bytes = convert_html_to_pdf_reportlab(html_content, student.full_name)
+            from .utils.render_pool import asubmit_render
+            pdf_bytes = await asubmit_render(convert_html_to_pdf_reportlab, html_content, student.full_name, kind="summary")
             
             # Create filename
             safe_name = "".join(c for c in student.full_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
@@ -678,7 +623,6 @@ def generate_ai_summary(request):
             filename = f"personality_summary_{safe_name}.pdf"
             
             # Return PDF as download
-            from django.http import HttpResponse
             response = HttpResponse(pdf_bytes, content_type='application/pdf')
             response['Content-Disposition'] = f'attachment; filename="{filename}"'
             response['Content-Length'] = len(pdf_bytes)
@@ -687,7 +631,7 @@ def generate_ai_summary(request):
             
         except Exception as pdf_error:
             # PDF generation failed - return JSON with HTML content as fallback
-            return Response({
+            return JsonResponse({
                 'success': True,
                 'html_content': html_content,
                 'student_name': student.full_name,
@@ -696,7 +640,7 @@ def generate_ai_summary(request):
             })
         
     except Exception as e:
-        return Response({
+        return JsonResponse({
             'success': False,
             'error': str(e)
         }, status=500)
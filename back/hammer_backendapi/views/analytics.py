@@ -0,0 +1,48 @@
+# hammer_backendapi/views/analytics.py
+"""
+Outcome dashboard endpoints (staff only), served from the precomputed
+OutcomeSummary rows - see hammer_backendapi/analytics.py.
+"""
+
+from rest_framework import status
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from hammer_backendapi import analytics
+
+
+def _int_param(request, name):
+    value = request.query_params.get(name)
+    if value in (None, ""):
+        return None
+    return int(value)
+
+
+@api_view(['GET'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAdminUser])
+def outcome_dashboard(request, dimension="organization"):
+    """
+    GET /api/analytics/outcomes/<dimension>/?year=<cohort year>&key=<id>
+    dimension: all | organization | region | state | funding_source.
+    One row per (key, cohort year): counts, completion and certificate
+    eligibility rates, and score distributions. The all dimension has a
+    single bucket, so it takes no key.
+    """
+    if dimension not in analytics.DIMENSIONS:
+        return Response(
+            {"error": f"Unknown dimension; use one of {', '.join(analytics.DIMENSIONS)}"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    try:
+        year, key = _int_param(request, "year"), _int_param(request, "key")
+    except ValueError:
+        return Response({"error": "year and key must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+    if key is not None and analytics.DIMENSIONS[dimension] is None:
+        return Response({"error": f"The {dimension} dimension takes no key"}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        "dimension": dimension,
+        "results": analytics.outcome_summaries(dimension, year=year, key=key),
+    })
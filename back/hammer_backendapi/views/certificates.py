@@ -19,63 +19,56 @@ def _get_pdf_generator():
         raise RuntimeError(f"PDF generation error: {e}")
 
 
-# ===============================
-# 1. Employment Portfolio Overview (Page 2)
-# ===============================
-@csrf_exempt
-def generate_portfolio_certificate(request):
+def _render_certificate(request, kind):
+    """
+    Render one certificate kind from the layout registry
+    (views/utils/certificate_layouts.json) using the posted student payload.
+    """
     if request.method != "POST":
         return JsonResponse({"error": "Invalid method"}, status=405)
 
     try:
-        # 1) Get the posted data safely
+        from hammer_backendapi.views.utils.certificate_layouts import (
+            UnknownCertificateKind,
+            get_layout,
+            single_certificate_fields,
+        )
+
+        try:
+            if get_layout(kind)["master_only"]:
+                raise UnknownCertificateKind(kind)
+        except UnknownCertificateKind:
+            return JsonResponse({"error": f"Unknown certificate type: {kind}"}, status=404)
+
         data = json.loads(request.body)
         student = data.get("student", {}) or {}
 
-        # 2) Pull the three values we want. Because of depth=1,
-        #    these are nested objects like:
-        #    - disc_assessment_type: { "id": 1, "type_name": "Disc Type" }
-        #    - sixteen_types_assessment: { "id": 1, "type_name": "16 Type" }
-        #    - enneagram_result: { "id": 1, "result_name": "Enneagram Result" }
-
-        disc_obj = student.get("disc_assessment_type")  # dict or None
-        sixteen_obj = student.get("sixteen_types_assessment")  # dict or None
-        enneagram_obj = student.get("enneagram_result")  # dict or None
+        page_index, fields, filename = single_certificate_fields(kind, student)
 
-        # 3) Safely convert to plain strings and clean DISC format
-        if isinstance(disc_obj, dict):
-            disc_raw = disc_obj.get("type_name") or "N/A"
-            # Remove short code prefix (e.g., "DC - " from "DC - Dominance/Conscientiousness")
-            if " - " in disc_raw and disc_raw != "N/A":
-                disc_text = disc_raw.split(" - ", 1)[1]  # Take everything after " - "
-            else:
-                disc_text = disc_raw
-        else:
-            disc_text = "N/A"
+        generate_certificate_pdf = _get_pdf_generator()
+        return generate_certificate_pdf(
+            TEMPLATE_PATH, page_index, fields, filename,
+            kind=kind, idempotency_key=request.headers.get("Idempotency-Key"), user=request.user,
+        )
 
-        if isinstance(sixteen_obj, dict):
-            sixteen_text = sixteen_obj.get("type_name") or "N/A"
-        else:
-            sixteen_text = "N/A"
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
 
-        if isinstance(enneagram_obj, dict):
-            enneagram_text = enneagram_obj.get("result_name") or "N/A"
-        else:
-            enneagram_text = "N/A"
 
-        # 4) Build the fields list for your PDF drawer
-        fields = [
-            {"text": disc_text,     "coords": (510, 560), "align": "center", "fontsize": 8, "color": (0, 0, 0)},
-            {"text": sixteen_text,  "coords": (510, 620), "align": "center", "fontsize": 8, "color": (0, 0, 0)},
-            {"text": enneagram_text,"coords": (510, 675), "align": "center", "fontsize": 8, "color": (0, 0, 0)},
-        ]
+# ===============================
+# Any registered certificate kind (new kinds only need a registry entry)
+# ===============================
+@csrf_exempt
+def generate_certificate(request, kind):
+    return _render_certificate(request, kind)
 
-        # 5) Generate and return the PDF
-        generate_certificate_pdf = _get_pdf_generator()
-        return generate_certificate_pdf(TEMPLATE_PATH, 2, fields, "portfolio_certificate.pdf")
 
-    except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
+# ===============================
+# 1. Employment Portfolio Overview (Page 2)
+# ===============================
+@csrf_exempt
+def generate_portfolio_certificate(request):
+    return _render_certificate(request, "portfolio")
 
 
 # ===============================
@@ -83,37 +76,7 @@ def generate_portfolio_certificate(request):
 # ===============================
 @csrf_exempt
 def generate_nccer_certificate(request):
-    if request.method != "POST":
-        return JsonResponse({"error": "Invalid method"}, status=405)
-    try:
-        data = json.loads(request.body)
-        student = data.get("student", {})
-        full_name = student.get("full_name", "")
-        date = student.get("end_date", "")
-
-        fields = [
-            {
-                "text": full_name,
-                "coords": (390, 275),
-                "align": "center",
-                "fontsize": 30,
-                "color": (1, 0, 0),
-            },  # red
-            {
-                "text": date,
-                "coords": (392, 440),
-                "align": "center",
-                "fontsize": 14,
-                "color": (0, 0, 0),
-            },
-        ]
-
-        generate_certificate_pdf = _get_pdf_generator()
-        return generate_certificate_pdf(
-            TEMPLATE_PATH, 3, fields, "nccer_certificate.pdf"
-        )
-    except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
+    return _render_certificate(request, "nccer")
 
 
 # ===============================
@@ -121,39 +84,7 @@ def generate_nccer_certificate(request):
 # ===============================
 @csrf_exempt
 def generate_osha_certificate(request):
-    if request.method != "POST":
-        return JsonResponse({"error": "Invalid method"}, status=405)
-
-    try:
-        data = json.loads(request.body)
-        student = data.get("student", {})
-        full_name = student.get("full_name") or "Unnamed Student"
-        date = student.get("osha_completion_date") or "N/A"
-
-        fields = [
-            {
-                "text": full_name,
-                "coords": (450, 290),
-                "align": "center",
-                "fontsize": 40,
-                "color": (1, 0, 0),
-            },
-            {
-                "text": date,
-                "coords": (650, 470),
-                "align": "center",
-                "fontsize": 14,
-                "color": (0, 0, 0),
-            },
-        ]
-
-        generate_certificate_pdf = _get_pdf_generator()
-        return generate_certificate_pdf(
-            TEMPLATE_PATH, 4, fields, "osha_certificate.pdf"
-        )
-
-    except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
+    return _render_certificate(request, "osha")
 
 
 # ===============================
@@ -161,37 +92,7 @@ def generate_osha_certificate(request):
 # ===============================
 @csrf_exempt
 def generate_hammermath_certificate(request):
-    if request.method != "POST":
-        return JsonResponse({"error": "Invalid method"}, status=405)
-    try:
-        data = json.loads(request.body)
-        student = data.get("student", {})
-        full_name = student.get("full_name", "")
-        date = student.get("end_date", "")
-
-        fields = [
-            {
-                "text": full_name,
-                "coords": (385, 375),
-                "align": "center",
-                "fontsize": 30,
-                "color": (1, 0, 0),
-            },
-            {
-                "text": date,
-                "coords": (560, 545),
-                "align": "center",
-                "fontsize": 14,
-                "color": (0, 0, 0),
-            },
-        ]
-
-        generate_certificate_pdf = _get_pdf_generator()
-        return generate_certificate_pdf(
-            TEMPLATE_PATH, 5, fields, "hammermath_certificate.pdf"
-        )
-    except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
+    return _render_certificate(request, "hammermath")
 
 
 # ===============================
@@ -199,37 +100,7 @@ def generate_hammermath_certificate(request):
 # ===============================
 @csrf_exempt
 def generate_employability_certificate(request):
-    if request.method != "POST":
-        return JsonResponse({"error": "Invalid method"}, status=405)
-    try:
-        data = json.loads(request.body)
-        student = data.get("student", {})
-        full_name = student.get("full_name", "")
-        date = student.get("end_date", "")
-
-        fields = [
-            {
-                "text": full_name,
-                "coords": (390, 350),
-                "align": "center",
-                "fontsize": 30,
-                "color": (1, 0, 0),
-            },
-            {
-                "text": date,
-                "coords": (555, 500),
-                "align": "center",
-                "fontsize": 14,
-                "color": (0, 0, 0),
-            },
-        ]
-
-        generate_certificate_pdf = _get_pdf_generator()
-        return generate_certificate_pdf(
-            TEMPLATE_PATH, 6, fields, "employability_certificate.pdf"
-        )
-    except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
+    return _render_certificate(request, "employability")
 
 
 # ===============================
@@ -237,36 +108,4 @@ def generate_employability_certificate(request):
 # ===============================
 @csrf_exempt
 def generate_workforce_certificate(request):
-    if request.method != "POST":
-        return JsonResponse({"error": "Invalid method"}, status=405)
-    try:
-        data = json.loads(request.body)
-        student = data.get("student", {})
-        full_name = student.get("full_name", "")
-        date = student.get("end_date", "")
-
-        fields = [
-            {
-                "text": full_name,
-                "coords": (450, 360),
-                "align": "center",
-                "fontsize": 40,
-                "color": (1, 0, 0),
-            },
-            {
-                "text": date,
-                "coords": (550, 475),
-                "align": "center",
-                "fontsize": 14,
-                "color": (0, 0, 0),
-            },
-        ]
-
-        generate_certificate_pdf = _get_pdf_generator()
-        return generate_certificate_pdf(
-            TEMPLATE_PATH, 7, fields, "workforce_certificate.pdf"
-        )
-    except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
-
-
+    return _render_certificate(request, "workforce")
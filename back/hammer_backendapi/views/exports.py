@@ -0,0 +1,74 @@
+# hammer_backendapi/views/exports.py
+"""
+Roster exports
+--------------
+Student outcome spreadsheets for funding and compliance reports:
+GET /api/students/export.csv and /api/students/export.xlsx (the teacher's
+own students) and the "Export selected students" admin actions.
+
+Rows come straight from a values_list() iterator - the lookup names are
+JOINed in by the same query, no model instances are built - and are
+written to a StreamingHttpResponse in ~64 KB chunks, so the download
+starts with the first chunk and memory stays flat whatever the row count.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import IsAuthenticated
+
+from hammer_backendapi.models import Student, Teacher
+from hammer_backendapi.roster_columns import EXPORT_COLUMNS
+from hammer_backendapi.views.utils.spreadsheet import stream_csv, stream_xlsx
+
+EXPORT_FORMATS = {
+    "csv": (stream_csv, "text/csv; charset=utf-8"),
+    "xlsx": (stream_xlsx, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+ITERATOR_CHUNK_SIZE = 2000
+
+
+def _rows(queryset):
+    return queryset.values_list(*(path for _, path in EXPORT_COLUMNS)).iterator(chunk_size=ITERATOR_CHUNK_SIZE)
+
+
+async def _async_chunks(chunks):
+    # Under ASGI a sync iterator is read into a list before sending; pull it a
+    # chunk at a time on the request's sync thread (where its DB cursor lives)
+    chunks = iter(chunks)
+    next_chunk = sync_to_async(lambda: next(chunks, None))
+    while (chunk := await next_chunk()) is not None:
+        yield chunk
+
+
+def export_response(request, queryset, fmt, filename_stem="students"):
+    """Stream ``queryset`` as a CSV or XLSX download; raises Http404 for other formats."""
+    if fmt not in EXPORT_FORMATS:
+        raise Http404(f"Unsupported export format: {fmt}")
+    writer, content_type = EXPORT_FORMATS[fmt]
+    chunks = writer([header for header, _ in EXPORT_COLUMNS], _rows(queryset.order_by("full_name", "id")))
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        chunks = _async_chunks(chunks)
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    filename = f"{filename_stem}-{timezone.localdate():%Y-%m-%d}.{fmt}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response["Cache-Control"] = "no-store"
+    response["X-Accel-Buffering"] = "no"  # let proxies pass chunks through as they come
+    return response
+
+
+@api_view(['GET'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def export_students(request, fmt):
+    """GET /api/students/export.<csv|xlsx> - the current teacher's roster."""
+    try:
+        teacher = Teacher.objects.get(user=request.user)
+    except Teacher.DoesNotExist:
+        raise Http404("Teacher not found")
+    return export_response(request, Student.objects.filter(teacher=teacher), fmt)
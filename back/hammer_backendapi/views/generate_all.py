@@ -24,59 +24,19 @@ def generate_all_certificates(request):
         student = data.get("student", {}) or {}
 
         full_name = student.get("full_name") or "Unnamed Student"
-        end_date = student.get("end_date") or "N/A"
-        osha_date = student.get("osha_completion_date") or "N/A"
 
-        # Clean DISC text by removing short code prefix
-        disc_raw = (student.get("disc_assessment_type") or {}).get("type_name") or "N/A"
-        if " - " in disc_raw and disc_raw != "N/A":
-            disc_text = disc_raw.split(" - ", 1)[1]  # Take everything after " - "
-        else:
-            disc_text = disc_raw
-            
-        sixteen_text = (student.get("sixteen_types_assessment") or {}).get("type_name") or "N/A"
-        enneagram_text = (student.get("enneagram_result") or {}).get("result_name") or "N/A"
-
-        # Build the map of page -> fields (1-based page numbers for generate_master_pdf_pymupdf!)
-        # Individual certificates use 0-based indexing: Portfolio(2), NCCER(3), OSHA(4), HammerMath(5), Employability(6), Workforce(7)
-        # But generate_master_pdf_pymupdf expects 1-based, so we add 1 to each page number
-        page_fields_map = {
-    1: [   
-        {"text": full_name,      "coords": (300, 450), "align": "center", "fontsize": 40, "color": (1,0,0)},
-        
-    ],
-    3: [  # Employment Portfolio Overview (Individual cert uses page 2, so 2+1=3 for 1-based) 
-        {"text": disc_text,      "coords": (510, 560), "align": "center", "fontsize": 8, "color": (0,0,0)},
-        {"text": sixteen_text,   "coords": (510, 620), "align": "center", "fontsize": 8, "color": (0,0,0)},
-        {"text": enneagram_text, "coords": (510, 675), "align": "center", "fontsize": 8, "color": (0,0,0)},
-    ],
-    4: [  # NCCER (Individual cert uses page 3, so 3+1=4 for 1-based)
-        {"text": full_name, "coords": (390, 275), "align": "center", "fontsize": 30, "color": (1,0,0)},
-        {"text": end_date,  "coords": (392, 440), "align": "center", "fontsize": 14, "color": (0,0,0)},
-    ],
-    5: [  # OSHA (Individual cert uses page 4, so 4+1=5 for 1-based)
-        {"text": full_name, "coords": (450, 290), "align": "center", "fontsize": 40, "color": (1,0,0)},
-        {"text": osha_date, "coords": (650, 470), "align": "center", "fontsize": 14, "color": (0,0,0)},
-    ],
-    6: [  # HammerMath (Individual cert uses page 5, so 5+1=6 for 1-based)
-        {"text": full_name, "coords": (385, 375), "align": "center", "fontsize": 30, "color": (1,0,0)},
-        {"text": end_date,  "coords": (560, 545), "align": "center", "fontsize": 14, "color": (0,0,0)},
-    ],
-    7: [  # Employability (Individual cert uses page 6, so 6+1=7 for 1-based)
-        {"text": full_name, "coords": (390, 350), "align": "center", "fontsize": 30, "color": (1,0,0)},
-        {"text": end_date,  "coords": (555, 500), "align": "center", "fontsize": 14, "color": (0,0,0)},
-    ],
-    8: [  # Workforce (Individual cert uses page 7, so 7+1=8 for 1-based)
-        {"text": full_name, "coords": (450, 360), "align": "center", "fontsize": 40, "color": (1,0,0)},
-        {"text": end_date,  "coords": (550, 475), "align": "center", "fontsize": 14, "color": (0,0,0)},
-    ],
-}
+        # Page -> fields map comes from the shared layout registry
+        # (views/utils/certificate_layouts.json), already 1-based for generate_master_pdf_pymupdf
+        from hammer_backendapi.views.utils.certificate_layouts import master_page_fields
+        page_fields_map = master_page_fields(student)
 
         generate_master_pdf_pymupdf = _get_master_pdf_generator()
         return generate_master_pdf_pymupdf(
             TEMPLATE_PATH,
             page_fields_map,
-            filename=f"Certificates_Master_{full_name.replace(' ', '_')}.pdf"
+            filename=f"Certificates_Master_{full_name.replace(' ', '_')}.pdf",
+            idempotency_key=request.headers.get("Idempotency-Key"),
+            user=request.user,
         )
 
     except Exception as e:
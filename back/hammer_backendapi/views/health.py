@@ -1,7 +1,23 @@
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from functools import lru_cache
 import datetime
+import importlib.util
+
+@lru_cache(maxsize=1)
+def _pdf_capability():
+    """
+    Check once per process that the PDF libraries are installed, without
+    importing them (a probe shouldn't pull PyMuPDF into a fresh worker).
+    """
+    try:
+        missing = [name for name in ("fitz", "reportlab") if importlib.util.find_spec(name) is None]
+    except Exception as e:
+        return "error", str(e)
+    if missing:
+        return "unavailable", f"Missing modules: {', '.join(missing)}"
+    return "available", None
 
 @csrf_exempt
 @require_http_methods(["GET"])
@@ -9,17 +25,7 @@ def health_check(request):
     """Health check endpoint for monitoring"""
     
     # Check PDF generation capabilities
-    pdf_status = "unavailable"
-    pdf_error = None
-    try:
-        from hammer_backendapi.views.utils.pdf_utils import generate_certificate_pdf
-        pdf_status = "available"
-    except ImportError as e:
-        pdf_status = "unavailable"
-        pdf_error = str(e)
-    except Exception as e:
-        pdf_status = "error"
-        pdf_error = str(e)
+    pdf_status, pdf_error = _pdf_capability()
     
     response_data = {
         "status": "healthy",
@@ -29,6 +35,11 @@ def health_check(request):
             "pdf_generation": pdf_status
         }
     }
+
+    # Render pool utilisation and queue depth
+    if pdf_status == "available":
+        from hammer_backendapi.views.utils.render_pool import pool_stats
+        response_data["features"]["render_pool"] = pool_stats()
     
     if pdf_error:
         response_data["features"]["pdf_error"] = pdf_error
@@ -51,3 +62,17 @@ def api_info(request):
             "health": "/api/health/",
         }
     })
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def ready_check(request):
+    """Readiness probe: 503 until this worker has finished warm-up"""
+    from hammer_backendapi.warmup import readiness, warm_up_in_background
+
+    state = readiness()
+    if state["ready"]:
+        return JsonResponse({"status": "ready", **state})
+
+    # Nothing warmed this process (runserver, or a probe racing worker boot)
+    warm_up_in_background()
+    return JsonResponse({"status": "warming", **state}, status=503)
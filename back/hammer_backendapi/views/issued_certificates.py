@@ -0,0 +1,114 @@
+# hammer_backendapi/views/issued_certificates.py
+"""
+Issued certificates
+-------------------
+Certificates for the teacher's stored students, rendered once and kept
+(see hammer_backendapi/issuance.py):
+
+- POST /api/students/<id>/certificates/<kind>/ issues one (a registry kind
+  or "master"): 201 when rendered now, 200 when the same certificate was
+  issued before. Either way the body has a ``download_url``.
+- GET /api/students/<id>/certificates/ lists what was issued.
+- GET /api/issued-certificates/<id>/download/ redirects to a presigned S3
+  URL, or streams the PDF from local storage.
+
+The payload-driven /api/generate/ endpoints are unchanged.
+"""
+
+import logging
+
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponseRedirect
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from hammer_backendapi import issuance
+from hammer_backendapi.models import IssuedCertificate, Student
+
+logger = logging.getLogger(__name__)
+
+
+def _teacher_student(request, student_id):
+    student = Student.objects.filter(pk=student_id, teacher__user=request.user).select_related(
+        "gender_identity", "disc_assessment_type", "sixteen_types_assessment",
+        "enneagram_result", "osha_type", "funding_source",
+    ).first()
+    if student is None:
+        raise Http404("No Student matches the given query.")
+    return student
+
+
+def _certificate_data(request, certificate):
+    return {
+        "id": certificate.id,
+        "student": certificate.student_id,
+        "kind": certificate.kind,
+        "template_version": certificate.template_version,
+        "fields": certificate.fields,
+        "sha256": certificate.sha256,
+        "size_bytes": certificate.size_bytes,
+        "issued_at": certificate.issued_at,
+        "download_url": request.build_absolute_uri(
+            reverse("download-issued-certificate", args=[certificate.id])
+        ),
+    }
+
+
+@api_view(['GET'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def list_issued_certificates(request, student_id):
+    """Every certificate issued to the student, newest first."""
+    student = _teacher_student(request, student_id)
+    certificates = IssuedCertificate.objects.filter(student=student).order_by("-issued_at", "-id")
+    return Response([_certificate_data(request, certificate) for certificate in certificates])
+
+
+@api_view(['POST'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def issue_certificate(request, student_id, kind):
+    """Issue (or fetch the already-issued) certificate of ``kind`` for the student's current details."""
+    from hammer_backendapi.views.utils.certificate_layouts import UnknownCertificateKind
+    from hammer_backendapi.views.utils.render_pool import RenderPoolBusy, busy_response
+
+    student = _teacher_student(request, student_id)
+    try:
+        certificate, created = issuance.issue(student, kind, user=request.user)
+    except UnknownCertificateKind:
+        return Response({"error": f"Unknown certificate type: {kind}"}, status=status.HTTP_404_NOT_FOUND)
+    except RenderPoolBusy as e:
+        return busy_response(e)
+    if created:
+        logger.info(f"Issued {kind} certificate {certificate.id} for student {student.id} by user {request.user}")
+    return Response(
+        _certificate_data(request, certificate),
+        status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+    )
+
+
+@api_view(['GET'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def download_issued_certificate(request, certificate_id):
+    """The stored PDF: a redirect to S3, or streamed from local storage."""
+    certificate = IssuedCertificate.objects.filter(pk=certificate_id, student__teacher__user=request.user).first()
+    if certificate is None:
+        raise Http404("No IssuedCertificate matches the given query.")
+
+    url = issuance.presigned_url(certificate)
+    if url:
+        return HttpResponseRedirect(url)
+    response = FileResponse(
+        default_storage.open(certificate.storage_key, "rb"),
+        as_attachment=True,
+        filename=issuance.download_filename(certificate),
+        content_type="application/pdf",
+    )
+    # A certificate id always names the same bytes
+    response["Cache-Control"] = "private, max-age=86400, immutable"
+    return response
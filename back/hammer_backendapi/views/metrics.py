@@ -0,0 +1,25 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_http_methods
+
+from hammer_backendapi import metrics
+
+
+@require_http_methods(["GET"])
+def metrics_view(request):
+    """Prometheus exposition; requires 'Authorization: Bearer <METRICS_TOKEN>' (open only under DEBUG with no token)"""
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if token:
+        supplied = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+            return JsonResponse({"error": "Unauthorized"}, status=401)
+    elif not settings.DEBUG:
+        return JsonResponse({"error": "METRICS_TOKEN is not configured"}, status=403)
+
+    if not metrics.PROMETHEUS_AVAILABLE:
+        return JsonResponse({"error": "prometheus-client is not installed"}, status=503)
+
+    body, content_type = metrics.render_latest()
+    return HttpResponse(body, content_type=content_type)
@@ -5,10 +5,6 @@ from decimal import Decimal
 from django.conf import settings
 from django.http import FileResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from borb.pdf import PDF
-from borb.pdf.canvas.layout.page_layout.multi_column_layout import SingleColumnLayout
-from borb.pdf.canvas.layout.text.paragraph import Paragraph
-from borb.pdf.canvas.geometry.rectangle import Rectangle
 
 @csrf_exempt
 def generate_certificate(request):
@@ -16,6 +12,12 @@ def generate_certificate(request):
         return JsonResponse({"error": "Invalid request"}, status=405)
 
     try:
+        # borb is slow to import; load it on first use, not at worker start-up
+        from borb.pdf import PDF
+        from borb.pdf.canvas.layout.page_layout.multi_column_layout import SingleColumnLayout
+        from borb.pdf.canvas.layout.text.paragraph import Paragraph
+        from borb.pdf.canvas.geometry.rectangle import Rectangle
+
         data = json.loads(request.body)
         student = data.get("student", {})
         certificates = data.get("certificates", [])
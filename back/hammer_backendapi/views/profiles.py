@@ -0,0 +1,24 @@
+from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.template.response import TemplateResponse
+
+from hammer_backendapi.profiling import profile_dir, profile_file_path, recent_profiles
+
+
+def profile_list(request):
+    """Admin page listing recent request profiles (ProfilingMiddleware)"""
+    context = {
+        **admin.site.each_context(request),
+        "title": "Request profiles",
+        "profiles": recent_profiles(),
+        "profile_dir": profile_dir(),
+    }
+    return TemplateResponse(request, "admin/request_profiles.html", context)
+
+
+def profile_download(request, profile_id, ext):
+    """Download one profile file (.prof, .collapsed or .json)"""
+    path = profile_file_path(profile_id, f".{ext}")
+    if path is None:
+        raise Http404("Profile not found")
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=f"{profile_id}.{ext}")
@@ -2,7 +2,8 @@
 Student Files API Views for Hammer Portfolio Django Backend
 
 Handles file upload, listing, downloading, and deletion for student files.
-Follows the existing authentication and API patterns.
+Follows the existing authentication and API patterns. Downloads are an
+async view (same token auth) so they don't tie up a worker under ASGI.
 """
 
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
@@ -10,9 +11,13 @@ from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.shortcuts import get_object_or_404
-from django.http import HttpResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.http import require_GET
+from asgiref.sync import sync_to_async
 from hammer_backendapi.models import Student, StudentFile
+from hammer_backendapi import metrics
+from hammer_backendapi.views.utils.async_api import token_auth_required
 import logging
 
 logger = logging.getLogger(__name__)
@@ -83,6 +88,7 @@ def upload_student_file(request, student_id):
             uploaded_by=request.user
         )
         
+        metrics.observe_upload(uploaded_file.size)
         logger.info(f"File uploaded successfully: {uploaded_file.name} for student {student_id} by user {request.user}")
         
         return Response({
@@ -115,54 +121,40 @@ def delete_student_file(request, file_id):
         logger.error(f"Error deleting file {file_id}: {e}")
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-@api_view(['GET'])
-@authentication_classes([TokenAuthentication])
-@permission_classes([IsAuthenticated])
-def download_student_file(request, file_id):
-    """Get download URL for a student file"""
+def _download_url(student_file):
+    """Storage URL, or a 1-hour signed URL when S3 objects are private (signing is local, no S3 call)."""
+    from django.conf import settings
+    from botocore.exceptions import ClientError
+
+    download_url = student_file.file.url
+    
+    # If using S3 with private files, generate a signed URL
+    if hasattr(settings, 'USE_S3') and settings.USE_S3 and hasattr(settings, 'AWS_DEFAULT_ACL') and settings.AWS_DEFAULT_ACL == 'private':
+        try:
+            from hammer_backendapi.views.utils.s3 import presigned_get_url
+            download_url = presigned_get_url(student_file.file.name, expires_in=3600)  # 1 hour
+            logger.info(f"Generated signed URL for file {student_file.id}")
+        except ClientError as e:
+            logger.error(f"Error generating signed URL for file {student_file.id}: {e}")
+            # Fall back to regular URL if signing fails
+            pass
+    return download_url
+
+@require_GET
+@token_auth_required
+async def download_student_file(request, file_id):
+    """Get download URL for a student file (async: no worker is held while S3/storage is consulted)"""
     try:
-        from django.conf import settings
-        import boto3
-        from botocore.exceptions import ClientError
-        
-        student_file = get_object_or_404(StudentFile, pk=file_id)
+        student_file = await aget_object_or_404(StudentFile, pk=file_id)
         
         # Log the download for audit purposes
         logger.info(f"File download requested: {student_file.original_name} (ID: {file_id}) by user {request.user}")
         
         # Generate download URL based on storage backend
-        download_url = student_file.file.url
-        
-        # If using S3 with private files, generate a signed URL
-        if hasattr(settings, 'USE_S3') and settings.USE_S3 and hasattr(settings, 'AWS_DEFAULT_ACL') and settings.AWS_DEFAULT_ACL == 'private':
-            try:
-                # Create S3 client
-                s3_client = boto3.client(
-                    's3',
-                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                    region_name=settings.AWS_S3_REGION_NAME
-                )
-                
-                # Generate signed URL (valid for 1 hour)
-                download_url = s3_client.generate_presigned_url(
-                    'get_object',
-                    Params={
-                        'Bucket': settings.AWS_STORAGE_BUCKET_NAME,
-                        'Key': student_file.file.name
-                    },
-                    ExpiresIn=3600  # 1 hour
-                )
-                
-                logger.info(f"Generated signed URL for file {file_id}")
-                
-            except ClientError as e:
-                logger.error(f"Error generating signed URL for file {file_id}: {e}")
-                # Fall back to regular URL if signing fails
-                pass
+        download_url = await sync_to_async(_download_url, thread_sensitive=False)(student_file)
         
         # Return download information
-        return Response({
+        return JsonResponse({
             'download_url': download_url,
             'filename': student_file.original_name,
             'content_type': student_file.content_type,
@@ -171,4 +163,4 @@ def download_student_file(request, file_id):
         
     except Exception as e:
         logger.error(f"Error getting download URL for file {file_id}: {e}")
-        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        return JsonResponse({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -1,19 +1,32 @@
 # hammer_backendapi/views/students.py
-from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.conf import settings
+from django.db import transaction
 from rest_framework.exceptions import NotFound
-from rest_framework.decorators import action
+from django.views.decorators.http import require_POST
 
+from hammer_backendapi import analytics, eligibility, roster_import
 from hammer_backendapi.models import Student, Teacher
+from hammer_backendapi.search import search_students
 from hammer_backendapi.serializers import StudentSerializer
+from hammer_backendapi.singleflight import IdempotencyKeyMismatch, mismatch_response
+from hammer_backendapi.serializers.serializers import (
+    CertificatesIssuedSerializer,
+    StudentBulkUpdateSerializer,
+    bulk_rule_errors,
+)
 
 from django.template.loader import render_to_string
 from django.http import HttpResponse, JsonResponse
 from django.utils import timezone
 
-from .ai_summary_fixed import generate_long_summary_html          # << key import
+from .ai_summary_fixed import SUMMARY_RELATED, agenerate_long_summary_html          # << key import
+from .utils.async_api import token_auth_required
 # Remove module-level PDF import to avoid WeasyPrint startup issues
 # from .utils import html_to_pdf_bytes                        # << pdf helper
 
@@ -61,50 +74,184 @@ class StudentViewSet(ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(teacher=self._get_teacher())
 
-    @action(detail=True, methods=["post"], url_path="personality-summary")
-    def personality_summary(self, request, pk=None):
-        # Scope to current teacher
-        student = get_object_or_404(self.get_queryset(), pk=pk)
-
-        # 1) Ask AI for the HTML body of the report
+    @action(detail=False, methods=["get"], url_path="search")
+    def search(self, request):
+        """
+        GET /api/students/search/?q=<term>&limit=<n> - ranked type-ahead over
+        full name, email and NCCER number; compact rows, best match first.
+        """
+        term = request.query_params.get("q", "").strip()
         try:
-            print("[AI] calling generate_long_summary_html")
-            summary_html = generate_long_summary_html(student)
-        except Exception as e:
-            print("[AI] ERROR:", e)
-            summary_html = "<h2>Summary Unavailable</h2><p>Please try again later.</p>"
-
-        # 2) Render that HTML inside your Django template
-        context = {
-            "name": student.full_name,
-            "generated_at": timezone.now().strftime("%B %d, %Y"),
-            "summary_html": summary_html,  # template injects this
-        }
-        html = render_to_string("personality_summary.html", context)
+            limit = max(1, min(int(request.query_params.get("limit", 20)), 50))
+        except ValueError:
+            limit = 20
+        if not term:
+            return Response({"results": []})
+        results = search_students(self._get_teacher(), term, limit=limit)
+        return Response({
+            "results": [
+                {
+                    "id": student.id,
+                    "full_name": student.full_name,
+                    "email": student.email,
+                    "nccer_number": student.nccer_number,
+                    "rank": round(student.search_rank, 4),
+                }
+                for student in results
+            ]
+        })
+
+    @action(detail=False, methods=["patch"], url_path="bulk")
+    def bulk_update(self, request):
+        """
+        PATCH /api/students/bulk/ - set progress fields on many students at once:
+        {"ids": [1, 2], "changes": {"passed_osha_10_exam": true, ...}} or
+        {"filter": {"start_date": "2025-01-06"}, "changes": {...}}.
+        The OSHA/date rules are checked for every selected student before one
+        UPDATE is run; returns the ids that actually changed.
+        """
+        payload = StudentBulkUpdateSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+        changes = payload.validated_data["changes"]
+
+        students = Student.objects.filter(teacher=self._get_teacher())
+        if "ids" in payload.validated_data:
+            requested = set(payload.validated_data["ids"])
+            students = students.filter(pk__in=requested)
+        else:
+            students = students.filter(**payload.validated_data["filter"])
+
+        with transaction.atomic():
+            errors = bulk_rule_errors(students, changes)
+            if errors:
+                return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+            # Rows already holding every new value are left alone
+            changed = students.exclude(**changes)
+            changed_ids = list(changed.select_for_update().values_list("id", flat=True))
+            analytics.mark_students_stale(changed)
+            changed.update(**changes)
+            eligibility.refresh(Student.objects.filter(pk__in=changed_ids))
+            if "start_date" in changes:  # may move students to another cohort year
+                analytics.mark_students_stale(Student.objects.filter(pk__in=changed_ids))
+
+        result = {"changed_ids": changed_ids, "changed": len(changed_ids)}
+        if "ids" in payload.validated_data:
+            found = set(students.values_list("id", flat=True))
+            result["not_found_ids"] = sorted(requested - found)
+        return Response(result)
+
+    @action(detail=False, methods=["get", "post"], url_path="certificate-queue")
+    def certificate_queue(self, request):
+        """
+        GET /api/students/certificate-queue/?kind=<kind> - students with
+        certificates they qualify for but haven't been issued (of one kind,
+        or any), by name, paginated; read from the partial queue index.
+        POST {"kind": "osha", "ids": [1, 2]} records a printed batch.
+        """
+        teacher = self._get_teacher()
+        if request.method == "POST":
+            payload = CertificatesIssuedSerializer(data=request.data)
+            payload.is_valid(raise_exception=True)
+            students = Student.objects.filter(teacher=teacher, pk__in=payload.validated_data["ids"])
+            issued = eligibility.mark_issued(students, payload.validated_data["kind"])
+            return Response({"issued": issued})
+
+        kind = request.query_params.get("kind") or None
+        if kind is not None and kind not in eligibility.BITS:
+            return Response(
+                {"error": f"Unknown certificate kind: {kind}", "kinds": list(eligibility.KINDS)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queue = eligibility.certificate_queue(teacher, kind).values(
+            "id", "full_name", "end_date", "osha_completion_date", "certificates_pending"
+        )
+        page = self.paginate_queryset(queue)
+        for row in page:
+            row["pending"] = eligibility.kinds(row.pop("certificates_pending"))
+        return self.get_paginated_response(page)
 
-        # 3) Convert HTML to PDF and return as download
+    @action(detail=False, methods=["post"], url_path="import", parser_classes=[MultiPartParser, FormParser])
+    def import_roster(self, request):
+        """
+        POST /api/students/import/ (multipart: file=<.csv|.xlsx>, dry_run=true|false)
+        - creates every row as a student of the current teacher, or none of
+        them: 201 with the new ids, or 400 with per-row errors.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "Attach the roster as 'file'."}, status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get("dry_run", "")).lower() in ("1", "true", "yes")
         try:
-            html_to_pdf = _get_html_to_pdf_converter()
-            pdf_bytes = html_to_pdf(html)
-            
-            # Return as PDF download
-            response = HttpResponse(pdf_bytes, content_type="application/pdf")
-            safe_name = student.full_name.replace(" ", "_").replace("/", "_") or "Student"
-            response["Content-Disposition"] = f'attachment; filename="{safe_name}_personality_summary.pdf"'
-            return response
-            
-        except Exception as pdf_error:
-            print(f"[AI] PDF generation failed: {pdf_error}")
-            # Return HTML content as fallback
-            return JsonResponse({
-                "success": True,
-                "student_name": student.full_name,
-                "generated_at": timezone.now().strftime("%B %d, %Y"),
-                "summary_html": summary_html,
-                "format": "html",
-                "message": f"PDF generation failed: {pdf_error}. Showing HTML content.",
-                "error": str(pdf_error)
-            })
-    
+            result = roster_import.import_roster(self._get_teacher(), upload.read(), upload.name, dry_run=dry_run)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if result["errors"]:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
+
+
+@require_POST
+@token_auth_required
+async def personality_summary(request, pk):
+    """
+    POST /api/students/<pk>/personality-summary/ - the AI summary as a PDF.
+    An async view (not a viewset action) so the OpenAI wait doesn't hold a
+    worker; the teacher scoping matches StudentViewSet.get_queryset.
+    """
+    teacher = await Teacher.objects.filter(user=request.user).afirst()
+    if teacher is None:
+        return JsonResponse({"detail": "Teacher not found"}, status=404)
+    student = await (
+        Student.objects.filter(teacher=teacher, pk=pk)
+        .select_related(*SUMMARY_RELATED)
+        .afirst()
+    )
+    if student is None:
+        return JsonResponse({"detail": "No Student matches the given query."}, status=404)
 
-    
\ No newline at end of file
+    # 1) Ask AI for the HTML body of the report
+    try:
+        print("[AI] calling agenerate_long_summary_html")
+        summary_html = await agenerate_long_summary_html(
+            student, request.headers.get("Idempotency-Key"), user=request.user
+        )
+    except IdempotencyKeyMismatch as e:
+        return mismatch_response(e)
+    except Exception as e:
+        print("[AI] ERROR:", e)
+        summary_html = "<h2>Summary Unavailable</h2><p>Please try again later.</p>"
+
+    # 2) Render that HTML inside your Django template
+    context = {
+        "name": student.full_name,
+        "generated_at": timezone.now().strftime("%B %d, %Y"),
+        "summary_html": summary_html,  # template injects this
+    }
+    html = render_to_string("personality_summary.html", context)
+
+    # 3) Convert HTML to PDF through the render pool (503 when it's full) and return as download
+    from .utils.render_pool import RenderPoolBusy, asubmit_render, busy_response
+    try:
+        html_to_pdf = _get_html_to_pdf_converter()
+        pdf_bytes = await asubmit_render(html_to_pdf, html, kind="summary")
+        
+        # Return as PDF download
+        response = HttpResponse(pdf_bytes, content_type="application/pdf")
+        safe_name = student.full_name.replace(" ", "_").replace("/", "_") or "Student"
+        response["Content-Disposition"] = f'attachment; filename="{safe_name}_personality_summary.pdf"'
+        return response
+        
+    except RenderPoolBusy as e:
+        return busy_response(e)
+    except Exception as pdf_error:
+        print(f"[AI] PDF generation failed: {pdf_error}")
+        # Return HTML content as fallback
+        return JsonResponse({
+            "success": True,
+            "student_name": student.full_name,
+            "generated_at": timezone.now().strftime("%B %d, %Y"),
+            "summary_html": summary_html,
+            "format": "html",
+            "message": f"PDF generation failed: {pdf_error}. Showing HTML content.",
+            "error": str(pdf_error)
+        })
@@ -1,5 +1,9 @@
-# Import non-WeasyPrint functions safely
-from .pdf_master import generate_master_pdf_pymupdf
+# Lazy wrappers keep PyMuPDF (fitz) out of worker start-up; it is imported
+# on the first render instead (see `manage.py import_report`)
+def generate_master_pdf_pymupdf(*args, **kwargs):
+    """Lazy wrapper for generate_master_pdf_pymupdf"""
+    from .pdf_master import generate_master_pdf_pymupdf as _generate_master_pdf_pymupdf
+    return _generate_master_pdf_pymupdf(*args, **kwargs)
 
 # Lazy import functions that depend on WeasyPrint
 def generate_certificate_pdf(*args, **kwargs):
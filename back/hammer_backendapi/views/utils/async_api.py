@@ -0,0 +1,60 @@
+# hammer_backendapi/views/utils/async_api.py
+"""
+Async view helpers
+------------------
+DRF's @api_view can't wrap coroutine functions, so the endpoints that mostly
+wait on OpenAI or S3 are plain async Django views. These helpers keep them
+interchangeable with the DRF views: the same token authentication and 401
+body, and request data from a JSON or form body.
+"""
+
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+
+def _authenticate(request):
+    """(user, None) or (None, error detail), like DRF's TokenAuthentication + IsAuthenticated."""
+    try:
+        result = TokenAuthentication().authenticate(request)
+    except AuthenticationFailed as e:
+        return None, str(e.detail)
+    if result is None:
+        return None, "Authentication credentials were not provided."
+    return result[0], None
+
+
+def token_auth_required(view):
+    """Async counterpart of @authentication_classes([TokenAuthentication]) + IsAuthenticated."""
+
+    @csrf_exempt
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user, error = await sync_to_async(_authenticate)(request)
+        if user is None:
+            response = JsonResponse({"detail": error}, status=401)
+            response["WWW-Authenticate"] = "Token"
+            return response
+        request.user = user
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def request_data(request):
+    """request.data for async views: the parsed JSON body or the form fields; None if the JSON is invalid."""
+    if request.content_type == "application/json":
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError:
+            return None
+    return request.POST
+
+
+def parse_error_response() -> JsonResponse:
+    return JsonResponse({"detail": "JSON parse error"}, status=400)
@@ -0,0 +1,190 @@
+# hammer_backendapi/views/utils/certificate_layouts.py
+"""
+Certificate layout registry
+---------------------------
+Page indexes, field positions, fonts and colours for every certificate kind
+live in one versioned JSON file (certificate_layouts.json by default, or
+settings.CERTIFICATE_LAYOUTS_PATH). The file is compiled once per process
+into a draw plan and recompiled automatically when it changes on disk.
+
+Both the single-certificate views and the "generate all" master PDF render
+from the same plan, so a new certificate kind only needs a JSON entry.
+
+Pages are 0-based everywhere in the registry; master_page_fields() converts
+to the 1-based keys generate_master_pdf_pymupdf expects.
+
+The "verification" block places the signed verification QR code and link
+(hammer_backendapi/verification.py) on the pages of issued certificates.
+"""
+
+import json
+import os
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+
+DEFAULT_LAYOUTS_PATH = os.path.join(os.path.dirname(__file__), "certificate_layouts.json")
+
+
+class UnknownCertificateKind(KeyError):
+    pass
+
+
+def _normalize_color_rgb01(rgb):
+    # Accept (0..1) or (0..255); return (0..1)
+    r, g, b = rgb or (0, 0, 0)
+    if max(r, g, b) > 1:
+        return (r/255.0, g/255.0, b/255.0)
+    return (r, g, b)
+
+
+def _clean_disc(raw):
+    # Remove short code prefix (e.g., "DC - " from "DC - Dominance/Conscientiousness")
+    if raw and " - " in raw:
+        return raw.split(" - ", 1)[1]
+    return raw
+
+
+def _nested(student, key, attr):
+    obj = student.get(key)
+    return obj.get(attr) if isinstance(obj, dict) else None
+
+
+# Derived values; any other "value" in the JSON is read straight off the student payload
+VALUE_GETTERS = {
+    "disc": lambda s: _clean_disc(_nested(s, "disc_assessment_type", "type_name")),
+    "sixteen": lambda s: _nested(s, "sixteen_types_assessment", "type_name"),
+    "enneagram": lambda s: _nested(s, "enneagram_result", "result_name"),
+}
+
+
+def _compile_field(spec: dict) -> dict:
+    return {
+        "value": spec["value"],
+        "default": spec.get("default", ""),
+        "coords": tuple(spec.get("coords", (0, 0))),
+        "fontsize": spec.get("fontsize", 14),
+        "color": _normalize_color_rgb01(spec.get("color") or (0, 0, 0)),
+        "align": (spec.get("align") or "left").lower(),
+        "font": spec.get("font", "helv"),
+    }
+
+
+@lru_cache(maxsize=4)
+def _compile(path: str, mtime_ns: int) -> dict:
+    """Parse and compile the registry; ``mtime_ns`` only participates in the cache key."""
+    with open(path, "r") as f:
+        raw = json.load(f)
+
+    layouts = {}
+    for kind, spec in raw.get("certificates", {}).items():
+        layouts[kind] = {
+            "kind": kind,
+            "title": spec.get("title", kind),
+            "page": int(spec["page"]),
+            "filename": spec.get("filename", f"{kind}_certificate.pdf"),
+            "master_only": bool(spec.get("master_only", False)),
+            "in_master": bool(spec.get("in_master", True)),
+            "fields": tuple(_compile_field(f) for f in spec.get("fields", [])),
+        }
+
+    # Pre-group the master plan by page so "generate all" is a single pass
+    master_pages: Dict[int, list] = {}
+    master_page_kinds: Dict[int, list] = {}
+    for layout in sorted(layouts.values(), key=lambda l: l["page"]):
+        if layout["in_master"]:
+            master_pages.setdefault(layout["page"], []).extend(layout["fields"])
+            master_page_kinds.setdefault(layout["page"], []).append(layout["kind"])
+
+    verification = raw.get("verification") or {}
+    return {
+        "version": raw.get("version", 1),
+        "layouts": layouts,
+        "master_pages": {page: tuple(fields) for page, fields in master_pages.items()},
+        "master_page_kinds": {page: tuple(kinds) for page, kinds in master_page_kinds.items()},
+        "verification": {
+            "size": float(verification.get("size", 54)),
+            "margin": float(verification.get("margin", 18)),
+            "caption": verification.get("caption", "Verify this certificate:"),
+            "fontsize": verification.get("fontsize", 5),
+            "color": _normalize_color_rgb01(verification.get("color") or (0, 0, 0)),
+        },
+    }
+
+
+def layouts_path() -> str:
+    return str(getattr(settings, "CERTIFICATE_LAYOUTS_PATH", None) or DEFAULT_LAYOUTS_PATH)
+
+
+def get_registry() -> dict:
+    """Return the compiled registry, recompiling if the JSON file changed."""
+    path = layouts_path()
+    return _compile(path, os.stat(path).st_mtime_ns)
+
+
+def registry_version() -> int:
+    return get_registry()["version"]
+
+
+def certificate_kinds(include_master_only: bool = False) -> List[str]:
+    layouts = get_registry()["layouts"]
+    return [k for k, l in layouts.items() if include_master_only or not l["master_only"]]
+
+
+def get_layout(kind: str) -> dict:
+    try:
+        return get_registry()["layouts"][kind]
+    except KeyError:
+        raise UnknownCertificateKind(kind)
+
+
+def certificate_values(student: dict) -> Dict[str, str]:
+    """Resolve every value referenced by the registry from a posted student payload."""
+    student = student or {}
+    values = {}
+    for layout in get_registry()["layouts"].values():
+        for field in layout["fields"]:
+            name = field["value"]
+            if name in values:
+                continue
+            getter = VALUE_GETTERS.get(name)
+            values[name] = getter(student) if getter else student.get(name)
+    return values
+
+
+def _draw_fields(fields, values) -> List[dict]:
+    return [
+        {
+            "text": str(values.get(f["value"]) or f["default"]),
+            "coords": f["coords"],
+            "fontsize": f["fontsize"],
+            "color": f["color"],
+            "align": f["align"],
+            "font": f["font"],
+        }
+        for f in fields
+    ]
+
+
+def single_certificate_fields(kind: str, student: dict) -> Tuple[int, List[dict], str]:
+    """Return (0-based page index, field dicts, download filename) for one certificate."""
+    layout = get_layout(kind)
+    values = certificate_values(student)
+    return layout["page"], _draw_fields(layout["fields"], values), layout["filename"]
+
+
+def field_names(kinds) -> List[str]:
+    """The value names drawn for the given kinds, in draw order."""
+    return [f["value"] for kind in kinds for f in get_layout(kind)["fields"]]
+
+
+def master_page_kinds() -> Dict[int, Tuple[str, ...]]:
+    """1-based master page -> the kinds drawn on it, in the order of master_page_fields()."""
+    return {page + 1: kinds for page, kinds in get_registry()["master_page_kinds"].items()}
+
+
+def master_page_fields(student: dict) -> Dict[int, List[dict]]:
+    """Return the 1-based page -> fields map for generate_master_pdf_pymupdf."""
+    values = certificate_values(student)
+    return {page + 1: _draw_fields(fields, values) for page, fields in get_registry()["master_pages"].items()}
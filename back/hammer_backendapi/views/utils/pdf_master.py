@@ -1,37 +1,24 @@
 # hammer_backendapi/views/utils/pdf_utils_master.py
+import os
 from io import BytesIO
 from typing import Dict, List
 from django.http import FileResponse
-import fitz  # PyMuPDF
+from hammer_backendapi.singleflight import IdempotencyKeyMismatch, coalesced, mismatch_response
+from .certificate_layouts import _normalize_color_rgb01
+from .pdf_template import open_template, save_to_bytes
+from .render_pool import RenderPoolBusy, busy_response, submit_render
+from .text_metrics import aligned_x
+from .verification_mark import draw_verification_mark
 
-def _normalize_color_rgb01(rgb):
-    # Accept (0..1) or (0..255); return (0..1)
-    r, g, b = rgb or (0, 0, 0)
-    if max(r, g, b) > 1:
-        return (r/255.0, g/255.0, b/255.0)
-    return (r, g, b)
-
-def generate_master_pdf_pymupdf(
-    template_path: str,
-    page_fields_map: Dict[int, List[dict]],  # 1-based page index -> list of field dicts
-    filename: str = "Certificates_Master_filled.pdf",
-) -> FileResponse:
+def render_master_bytes(template_path: str, page_fields_map: Dict[int, List[dict]], verify_urls: Dict[int, str] = None) -> bytes:
     """
-    Copy ALL pages from template and overlay text on specified pages.
-    page_fields_map keys are 1-based (human-friendly).
-    Each field = {
-      "text": str,
-      "coords": (x, y),              # PyMuPDF coords (bottom-left origin)
-      "fontsize": int,               # default 14
-      "color": (r,g,b) in 0..1 or 0..255,
-      "align": "left"|"center"|"right",
-      "font": "helv"|"tiro"|"times" ... (PyMuPDF font name)
-    }
+    Overlay text on the cached template base (every page kept, content
+    stored once as Form XObjects) and return the PDF bytes. Pages in
+    ``verify_urls`` (1-based) also get the verification mark.
+    Picklable, so it can run inline or inside the render pool.
     """
-    src = fitz.open(template_path)
-    out = fitz.open()
-    # Copy ALL pages into new doc
-    out.insert_pdf(src)  # preserves every filler page
+    # Cached base already contains ALL pages, filler pages included
+    out = open_template(template_path)
 
     # Iterate target pages and draw fields
     for page_1based, fields in (page_fields_map or {}).items():
@@ -46,13 +33,8 @@ def generate_master_pdf_pymupdf(
             align = (f.get("align") or "left").lower()
             font = f.get("font", "helv")
 
-            # alignment (measure text width)
-            if align != "left":
-                tw = fitz.get_text_length(text, fontname=font, fontsize=fontsize)
-                if align == "center":
-                    x = x - (tw / 2.0)
-                elif align == "right":
-                    x = x - tw
+            # alignment (memoised glyph-advance table, no per-string MuPDF call)
+            x = aligned_x(x, text, align, font, fontsize)
 
             page.insert_text(
                 (x, y),
@@ -62,7 +44,46 @@ def generate_master_pdf_pymupdf(
                 fontname=font,
             )
 
-    buf = BytesIO()
-    out.save(buf)
-    buf.seek(0)
-    return FileResponse(buf, as_attachment=True, filename=filename, content_type="application/pdf")
+    for page_1based, url in (verify_urls or {}).items():
+        if 1 <= page_1based <= out.page_count:
+            draw_verification_mark(out[page_1based - 1], url)
+
+    return save_to_bytes(out)
+
+def generate_master_pdf_pymupdf(
+    template_path: str,
+    page_fields_map: Dict[int, List[dict]],  # 1-based page index -> list of field dicts
+    filename: str = "Certificates_Master_filled.pdf",
+    idempotency_key: str = None,
+    user=None,
+) -> FileResponse:
+    """
+    Copy ALL pages from template and overlay text on specified pages.
+    page_fields_map keys are 1-based (human-friendly).
+    Each field = {
+      "text": str,
+      "coords": (x, y),              # PyMuPDF coords (bottom-left origin)
+      "fontsize": int,               # default 14
+      "color": (r,g,b) in 0..1 or 0..255,
+      "align": "left"|"center"|"right",
+      "font": "helv"|"tiro"|"times" ... (PyMuPDF font name)
+    }
+    The fields come from the request, so no page is signed (only issued
+    certificates are, see hammer_backendapi/issuance.py).
+    Identical concurrent requests in this worker (or a repeated Idempotency-Key
+    from the same ``user``) share one render; the PDF itself is never cached.
+    Reusing a key for another payload is a JSON 422.
+    Returns a JSON 503 with Retry-After when the render queue is full.
+    """
+    path = os.path.abspath(template_path)
+    try:
+        pdf_bytes = coalesced(
+            "certificate:master", (path, os.stat(path).st_mtime_ns, page_fields_map),
+            lambda: submit_render(render_master_bytes, path, page_fields_map, kind="master"),
+            idempotency_key=idempotency_key, user=user, share=False,
+        )
+    except RenderPoolBusy as e:
+        return busy_response(e)
+    except IdempotencyKeyMismatch as e:
+        return mismatch_response(e)
+    return FileResponse(BytesIO(pdf_bytes), as_attachment=True, filename=filename, content_type="application/pdf")
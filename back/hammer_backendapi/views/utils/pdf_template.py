@@ -0,0 +1,73 @@
+# hammer_backendapi/views/utils/pdf_template.py
+"""
+Certificate template base pages
+-------------------------------
+The master template is parsed once per process and turned into a compact
+"base" document in which every page's original content is stored as a
+reusable Form XObject. Each render then opens that base from memory and only
+appends a thin text overlay, instead of re-reading and copying the full
+master for every certificate download.
+
+Bases are cached per (template path, modification time, page), so a new
+template deployed in place is picked up without a restart.
+"""
+
+import os
+from functools import lru_cache
+from typing import Optional
+
+import fitz  # PyMuPDF
+from django.conf import settings
+
+
+def _can_wrap_as_xobject(page) -> bool:
+    """Pages with rotation, links or annotations are copied as-is."""
+    return page.rotation == 0 and not page.first_annot and not page.get_links()
+
+
+@lru_cache(maxsize=32)
+def _build_base(template_path: str, mtime_ns: int, page_index: Optional[int], use_xobjects: bool) -> bytes:
+    """Build the compacted base PDF once; ``mtime_ns`` only participates in the cache key."""
+    src = fitz.open(template_path)
+    base = fitz.open()
+    pages = range(src.page_count) if page_index is None else [page_index]
+
+    for pno in pages:
+        src_page = src[pno]
+        if use_xobjects and _can_wrap_as_xobject(src_page):
+            page = base.new_page(width=src_page.rect.width, height=src_page.rect.height)
+            page.show_pdf_page(page.rect, src, pno)
+        else:
+            base.insert_pdf(src, from_page=pno, to_page=pno)
+
+    # garbage=4 merges identical objects (logos, fonts) shared between pages
+    data = base.tobytes(garbage=4, deflate=True)
+    base.close()
+    src.close()
+    return data
+
+
+def open_template(template_path: str, page_index: Optional[int] = None):
+    """
+    Return a fresh, writable fitz.Document built from the cached base.
+
+    Args:
+        template_path (str): Path to the master PDF.
+        page_index (int | None): 0-based page to extract, or None for every page.
+    """
+    path = os.path.abspath(template_path)
+    use_xobjects = getattr(settings, "CERTIFICATE_TEMPLATE_XOBJECTS", True)
+    data = _build_base(path, os.stat(path).st_mtime_ns, page_index, use_xobjects)
+    return fitz.open("pdf", data)
+
+
+def save_to_bytes(doc) -> bytes:
+    """Serialize a rendered document; only the new overlay streams need compressing."""
+    data = doc.tobytes(deflate=True)
+    doc.close()
+    return data
+
+
+def clear_template_cache():
+    """Drop all cached bases (e.g. after replacing the template in tests)."""
+    _build_base.cache_clear()
@@ -1,41 +1,26 @@
-import fitz  # PyMuPDF
+import os
 from io import BytesIO
 from django.http import FileResponse
 from django.conf import settings
+from hammer_backendapi.singleflight import IdempotencyKeyMismatch, coalesced, mismatch_response
+from .pdf_template import open_template, save_to_bytes
+from .render_pool import RenderPoolBusy, busy_response, submit_render
+from .text_metrics import aligned_x
+from .verification_mark import draw_verification_mark
 
 # WeasyPrint functionality disabled due to system library conflicts
 WEASYPRINT_AVAILABLE = False
 HTML = None
 
-def generate_certificate_pdf(template_path, page_index, fields, filename="certificate.pdf"):
+def render_certificate_bytes(template_path, page_index, fields, verify_url=None) -> bytes:
     """
-    Generate a customized certificate PDF by copying one page of a template
-    and overlaying text with optional styles.
-
-    Args:
-        template_path (str): Path to the master PDF.
-        page_index (int): 0-based index of the page to copy.
-        fields (list): List of dicts with:
-            {
-                "text": str,
-                "coords": (x, y),
-                "fontsize": int (default=14),
-                "color": (r, g, b) in range 0-1 (default=(0,0,0)),
-                "align": "left"|"center"|"right" (default="left"),
-                "font": str (PyMuPDF font name or custom)
-            }
-        filename (str): Output filename for the download.
-
-    Returns:
-        FileResponse: The generated PDF for download.
+    Render one certificate page to PDF bytes, with the verification mark
+    when ``verify_url`` is given. Picklable, so it can run inline or inside
+    the render pool (see render_pool.py).
     """
 
-    # ✅ Load the original PDF
-    doc = fitz.open(template_path)
-
-    # ✅ Copy the selected page into a new document
-    new_doc = fitz.open()
-    new_doc.insert_pdf(doc, from_page=page_index, to_page=page_index)
+    # ✅ Open the cached single-page base (template content lives in a Form XObject)
+    new_doc = open_template(template_path, page_index)
     page = new_doc[0]
 
     # ✅ Apply text overlays
@@ -47,13 +32,8 @@ def generate_certificate_pdf(template_path, page_index, fields, filename="certif
         align = field.get("align", "left")
         font = field.get("font", "helv")  # default: Helvetica (built-in)
 
-        # ✅ Calculate alignment (center or right)
-        if align != "left":
-            text_width = fitz.get_text_length(text, fontname=font, fontsize=fontsize)
-            if align == "center":
-                x -= text_width / 2
-            elif align == "right":
-                x -= text_width
+        # ✅ Calculate alignment (center or right) from the memoised glyph table
+        x = aligned_x(x, text, align, font, fontsize)
 
         # ✅ Insert text
         page.insert_text(
@@ -64,15 +44,59 @@ def generate_certificate_pdf(template_path, page_index, fields, filename="certif
             fontname=font
         )
 
+    # ✅ Signed verification QR code and link
+    if verify_url:
+        draw_verification_mark(page, verify_url)
+
     # ✅ Save into memory
-    buffer = BytesIO()
-    new_doc.save(buffer)
-    buffer.seek(0)
+    return save_to_bytes(new_doc)
 
-    return FileResponse(buffer, as_attachment=True, filename=filename, content_type="application/pdf")
 
+def generate_certificate_pdf(template_path, page_index, fields, filename="certificate.pdf", kind="certificate", idempotency_key=None, user=None):
+    """
+    Generate a customized certificate PDF by copying one page of a template
+    and overlaying text with optional styles.
 
+    Args:
+        template_path (str): Path to the master PDF.
+        page_index (int): 0-based index of the page to copy.
+        fields (list): List of dicts with:
+            {
+                "text": str,
+                "coords": (x, y),
+                "fontsize": int (default=14),
+                "color": (r, g, b) in range 0-1 (default=(0,0,0)),
+                "align": "left"|"center"|"right" (default="left"),
+                "font": str (PyMuPDF font name or custom)
+            }
+        filename (str): Output filename for the download.
+        kind (str): Certificate kind, used to label render-time metrics.
+        idempotency_key (str | None): Client Idempotency-Key header, if sent.
+            Identical concurrent requests in this worker share one render
+            (singleflight.py); the PDF itself is never cached.
+        user: The requesting user; Idempotency-Keys are scoped to it.
 
+    The fields come from the request, so the page is not signed: only
+    certificates issued for a stored student carry a verification QR code
+    (hammer_backendapi/issuance.py).
+
+    Returns:
+        FileResponse: The generated PDF for download.
+        (JSON 503 with Retry-After when the render queue is full, JSON 422
+        when the Idempotency-Key was used for a different payload)
+    """
+    path = os.path.abspath(template_path)
+    try:
+        pdf_bytes = coalesced(
+            f"certificate:{kind}", (path, os.stat(path).st_mtime_ns, page_index, fields),
+            lambda: submit_render(render_certificate_bytes, path, page_index, fields, kind=kind),
+            idempotency_key=idempotency_key, user=user, share=False,
+        )
+    except RenderPoolBusy as e:
+        return busy_response(e)
+    except IdempotencyKeyMismatch as e:
+        return mismatch_response(e)
+    return FileResponse(BytesIO(pdf_bytes), as_attachment=True, filename=filename, content_type="application/pdf")
 
 
 def html_to_pdf_bytes(html: str, base_url: str | None = None) -> bytes:
@@ -184,70 +208,34 @@ def _html_to_pdf_pymupdf(html: str) -> bytes:
 def _parse_html_content(html: str) -> str:
     """
     Parse HTML content and extract text with proper sequential formatting.
+    Uses the single-pass summary tokenizer (summary_html.py).
     """
     import re
     from html import unescape
-    
-    # Remove HTML comments
-    html = re.sub(r'<!--.*?-->', '', html, flags=re.DOTALL)
-    
+    from .summary_html import process_summary_html
+
     content_parts = []
-    
-    # Parse HTML sequentially to maintain order
-    # Split by major elements and process in order
-    elements = re.split(r'(<h[1-3][^>]*>.*?</h[1-3]>|<p[^>]*>.*?</p>|<ul[^>]*>.*?</ul>)', html, flags=re.DOTALL | re.IGNORECASE)
-    
-    for element in elements:
-        element = element.strip()
-        if not element:
-            continue
-            
-        # Process headers
-        h_match = re.match(r'<h[1-3][^>]*>(.*?)</h[1-3]>', element, re.DOTALL | re.IGNORECASE)
-        if h_match:
-            header_text = re.sub(r'<[^>]+>', '', h_match.group(1)).strip()
-            if header_text:
-                content_parts.append(f"\n{header_text.upper()}\n{'='*len(header_text)}\n")
-            continue
-        
-        # Process paragraphs
-        p_match = re.match(r'<p[^>]*>(.*?)</p>', element, re.DOTALL | re.IGNORECASE)
-        if p_match:
-            p_text = re.sub(r'<[^>]+>', '', p_match.group(1)).strip()
-            if p_text:
-                content_parts.append(f"{p_text}\n\n")
-            continue
-        
-        # Process unordered lists
-        ul_match = re.match(r'<ul[^>]*>(.*?)</ul>', element, re.DOTALL | re.IGNORECASE)
-        if ul_match:
-            ul_content = ul_match.group(1)
-            li_items = re.findall(r'<li[^>]*>(.*?)</li>', ul_content, re.DOTALL | re.IGNORECASE)
-            if li_items:
-                for li_content in li_items:
-                    li_text = re.sub(r'<[^>]+>', '', li_content).strip()
-                    if li_text:
-                        content_parts.append(f"• {li_text}\n")
+    blocks = process_summary_html(html).blocks
+
+    for i, (kind, text) in enumerate(blocks):
+        if kind == "heading":
+            content_parts.append(f"\n{text.upper()}\n{'='*len(text)}\n")
+        elif kind == "paragraph":
+            content_parts.append(f"{text}\n\n")
+        else:
+            content_parts.append(f"• {text}\n")
+            # Blank line after the last item of a list
+            if i + 1 == len(blocks) or blocks[i + 1][0] != "bullet":
                 content_parts.append("\n")
-            continue
-        
-        # If it's just text content, clean and add it
-        if not re.search(r'<[^>]+>', element):
-            clean_text = unescape(element).strip()
-            if clean_text:
-                content_parts.append(f"{clean_text}\n\n")
-    
+
     # If no structured content found, fall back to simple cleaning
     if not content_parts:
         clean_text = re.sub(r'<[^>]+>', '', html)
         clean_text = unescape(clean_text).strip()
         content_parts.append(clean_text)
-    
-    # Join all parts and clean up
+
+    # Join all parts and clean up excessive newlines but preserve structure
     result = ''.join(content_parts)
-    result = unescape(result)
-    
-    # Clean up excessive newlines but preserve structure
     result = re.sub(r'\n\s*\n\s*\n+', '\n\n', result)
-    
+
     return result.strip()
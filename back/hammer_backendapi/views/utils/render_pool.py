@@ -0,0 +1,223 @@
+# hammer_backendapi/views/utils/render_pool.py
+"""
+PDF render pool
+---------------
+Certificate (PyMuPDF) and summary (ReportLab) rendering is CPU-bound and holds
+the GIL, so under concurrent load it competes with request handling. When
+PDF_RENDER_WORKERS > 0, render jobs are sent to a warm ProcessPoolExecutor
+whose workers preload the certificate template, layout registry and font
+metrics. With PDF_RENDER_WORKERS = 0 (the default) jobs run inline in the
+request thread, behind the same bounded queue. Each gunicorn worker starts
+its own pool at boot (warm(), from warmup.warm_worker()); a pool inherited
+across a fork is never reused.
+
+Backpressure: at most PDF_RENDER_WORKERS + PDF_RENDER_MAX_QUEUE jobs are
+admitted at once. A request that cannot get a slot within
+PDF_RENDER_QUEUE_TIMEOUT seconds gets RenderPoolBusy, which the generators
+turn into a 503 with Retry-After (busy_response). A slot is held until its
+job has finished, even when the request stopped waiting for it after
+PDF_RENDER_TIMEOUT, so the pool never runs more than its capacity.
+
+Utilisation and queue depth go to /metrics (hammer_pdf_render_pool_jobs,
+hammer_pdf_render_pool_workers, hammer_pdf_render_jobs) as well as
+/api/health/ (pool_stats()).
+
+Render functions must be module-level callables with picklable arguments
+(see render_certificate_bytes / render_master_bytes).
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+
+from hammer_backendapi import metrics
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_PATH = "static/Certificates_Master.pdf"
+
+
+class RenderPoolBusy(RuntimeError):
+    """Raised when the render queue is full."""
+
+
+_lock = threading.Lock()
+_executor = None
+_executor_pid = None
+_slots = None
+_stats = {"in_flight": 0, "completed": 0, "failed": 0, "rejected": 0, "timed_out": 0, "render_seconds": 0.0}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def pool_size() -> int:
+    return max(0, int(_setting("PDF_RENDER_WORKERS", 0)))
+
+
+def _capacity() -> int:
+    return max(1, pool_size() + int(_setting("PDF_RENDER_MAX_QUEUE", 8)))
+
+
+def _preload(template_path=TEMPLATE_PATH):
+    """Warm per-process caches: template bases, layout registry, glyph tables, summary styles, QR encoder."""
+    from .certificate_layouts import get_registry
+    from .pdf_template import open_template
+    from .summary_pdf import summary_styles
+    from .text_metrics import advance_table
+    from .verification_mark import qr_matrix
+
+    summary_styles()
+    qr_matrix("warm-up")
+
+    registry = get_registry()
+    for layout in registry["layouts"].values():
+        for field in layout["fields"]:
+            advance_table(field["font"], field["fontsize"])
+    advance_table("helv", registry["verification"]["fontsize"])
+
+    if os.path.exists(template_path):
+        open_template(template_path).close()
+        for layout in registry["layouts"].values():
+            open_template(template_path, layout["page"]).close()
+
+
+def _get_executor():
+    """Return this process's executor, creating it after a fork if needed."""
+    global _executor, _executor_pid, _slots
+    with _lock:
+        pid = os.getpid()
+        if _slots is None or _executor_pid != pid:
+            _slots = threading.BoundedSemaphore(_capacity())
+            _executor = None
+            _executor_pid = pid
+        if _executor is None and pool_size() > 0:
+            import multiprocessing
+            from hammer_backendapi.render_worker import init_worker
+            _executor = ProcessPoolExecutor(
+                max_workers=pool_size(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(os.path.abspath(TEMPLATE_PATH),),
+            )
+        return _executor
+
+
+def warm():
+    """Start the pool (or warm inline caches when the pool is disabled)."""
+    executor = _get_executor()
+    if executor is None:
+        _preload(TEMPLATE_PATH)
+    else:
+        # Force every worker to spawn and run its initializer now, not on first request
+        for future in [executor.submit(os.getpid) for _ in range(pool_size())]:
+            future.result()
+
+
+def shutdown():
+    global _executor
+    with _lock:
+        if _executor is not None and _executor_pid == os.getpid():
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _depth(in_flight):
+    """(running, queued, workers) for ``in_flight`` admitted jobs."""
+    workers = pool_size()
+    running = min(in_flight, workers) if workers else in_flight
+    return running, in_flight - running, workers
+
+
+def _finish(slots, started, outcome, kind):
+    """Account for a job that has finished running and free its slot."""
+    seconds = time.perf_counter() - started
+    with _lock:
+        _stats["in_flight"] -= 1
+        _stats[outcome] += 1
+        _stats["render_seconds"] += seconds
+        in_flight = _stats["in_flight"]
+    metrics.record_render_job(outcome)
+    if outcome == "completed":
+        metrics.observe_pdf_render(kind, seconds)
+    metrics.observe_render_pool(*_depth(in_flight))
+    slots.release()
+
+
+def submit_render(fn, *args, kind=None):
+    """Run ``fn(*args)`` in the render pool (or inline) and return its result; ``kind`` labels the render metric."""
+    executor = _get_executor()
+    slots = _slots
+    if not slots.acquire(timeout=float(_setting("PDF_RENDER_QUEUE_TIMEOUT", 10))):
+        with _lock:
+            _stats["rejected"] += 1
+        metrics.record_render_job("rejected")
+        raise RenderPoolBusy("PDF renderer is busy, please retry shortly")
+
+    with _lock:
+        _stats["in_flight"] += 1
+        in_flight = _stats["in_flight"]
+    metrics.observe_render_pool(*_depth(in_flight))
+    started = time.perf_counter()
+    if executor is None:
+        try:
+            result = fn(*args)
+        except Exception:
+            _finish(slots, started, "failed", kind)
+            raise
+        _finish(slots, started, "completed", kind)
+        return result
+
+    try:
+        future = executor.submit(fn, *args)
+    except Exception:
+        _finish(slots, started, "failed", kind)
+        raise
+    # The slot is freed when the job ends, not when this caller stops waiting
+    future.add_done_callback(lambda done: _finish(
+        slots, started, "failed" if done.cancelled() or done.exception() else "completed", kind
+    ))
+    try:
+        return future.result(timeout=float(_setting("PDF_RENDER_TIMEOUT", 60)))
+    except FuturesTimeoutError:
+        with _lock:
+            _stats["timed_out"] += 1
+        metrics.record_render_job("timed_out")
+        raise
+
+
+async def asubmit_render(fn, *args, kind=None):
+    """submit_render() for async views: the slot wait and the render happen off the event loop."""
+    return await sync_to_async(submit_render, thread_sensitive=False)(fn, *args, kind=kind)
+
+
+def busy_response(error) -> JsonResponse:
+    response = JsonResponse({"error": str(error)}, status=503)
+    response["Retry-After"] = "5"
+    return response
+
+
+def pool_stats() -> dict:
+    """Pool utilisation and queue depth for health/metrics endpoints."""
+    workers = pool_size()
+    with _lock:
+        stats = dict(_stats)
+    running, queued, _ = _depth(stats["in_flight"])
+    stats.update({
+        "mode": "process_pool" if workers else "inline",
+        "workers": workers,
+        "capacity": _capacity(),
+        "running": running,
+        "queue_depth": queued,
+        "utilisation": round(running / workers, 3) if workers else None,
+        "render_seconds": round(stats["render_seconds"], 3),
+    })
+    return stats
@@ -0,0 +1,32 @@
+# hammer_backendapi/views/utils/s3.py
+"""
+S3 helpers
+----------
+One boto3 client per process (clients are thread-safe) instead of one per
+request: building a client loads botocore's service model, which costs far
+more than signing a URL. Presigning is local HMAC work - no request to S3.
+"""
+
+from functools import lru_cache
+
+from django.conf import settings
+
+
+@lru_cache(maxsize=1)
+def s3_client():
+    import boto3  # deferred: boto3 adds ~100ms to worker start-up
+    return boto3.client(
+        's3',
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_S3_REGION_NAME
+    )
+
+
+def presigned_get_url(key, expires_in=3600, **params) -> str:
+    """Signed GET URL for ``key`` in the storage bucket; extra ``params`` e.g. ResponseContentDisposition."""
+    return s3_client().generate_presigned_url(
+        'get_object',
+        Params={'Bucket': settings.AWS_STORAGE_BUCKET_NAME, 'Key': key, **params},
+        ExpiresIn=expires_in
+    )
@@ -0,0 +1,363 @@
+# hammer_backendapi/views/utils/spreadsheet.py
+"""
+Spreadsheets
+------------
+CSV and XLSX writers that turn a row iterator into a byte-chunk generator,
+so a download starts with the first rows and memory stays flat however
+many rows follow.
+
+XLSX is written directly as a zip of SpreadsheetML parts with zipfile in
+streaming mode (data descriptors instead of seeking back), one worksheet
+with inline strings - no shared-string table to hold in memory, and no
+spreadsheet library needed. read_csv()/read_xlsx() go the other way for
+uploads: the non-blank rows of the first worksheet as (row number, values)
+pairs. Uploads are untrusted, so reading stops at ``max_rows`` rows, cells
+past ``max_columns`` are dropped, and an xlsx row or cell reference beyond
+Excel's own sheet limits rejects the file - a crafted index never sizes
+an allocation.
+"""
+
+import csv
+import datetime
+import io
+import re
+import zipfile
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+CHUNK_SIZE = 64 * 1024
+
+# Cells starting with these are evaluated as formulas by Excel/Sheets
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# Control characters XML 1.0 doesn't allow
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_EXCEL_EPOCH = datetime.datetime(1899, 12, 30)
+
+
+def _local(value):
+    # Aware datetimes (created_at) are shown in the site's time zone
+    if isinstance(value, datetime.datetime) and timezone.is_aware(value):
+        return timezone.make_naive(value)
+    return value
+
+
+def _chunked(pieces):
+    """Join small byte pieces into ~CHUNK_SIZE chunks."""
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= CHUNK_SIZE:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+# ---- CSV ----
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _csv_cell(value):
+    # Called for every cell, so the common types are checked first and exactly
+    kind = type(value)
+    if kind is str:
+        return "'" + value if value.startswith(_FORMULA_PREFIXES) else value
+    if value is None:
+        return ""
+    if kind is bool:
+        return "Yes" if value else "No"
+    if kind is datetime.datetime:
+        return _local(value).isoformat(sep=" ", timespec="minutes")
+    return value
+
+
+def stream_csv(header, rows):
+    """UTF-8 CSV (with BOM, so Excel detects the encoding) as byte chunks."""
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield "\ufeff".encode() + writer.writerow(header).encode()
+        for row in rows:
+            yield writer.writerow([_csv_cell(value) for value in row]).encode()
+
+    return _chunked(lines())
+
+
+# ---- XLSX ----
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+# Cell styles: 0 default, 1 date, 2 date-time, 3 bold (header)
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="14" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '</cellXfs>'
+    '</styleSheet>'
+)
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" state="frozen"/>'
+    '</sheetView></sheetViews><sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+
+def _text(value):
+    return escape(_ILLEGAL_XML.sub("", str(value)))
+
+
+def _xlsx_cell(value, style=0):
+    kind = type(value)
+    if kind is str:
+        style_attr = f' s="{style}"' if style else ""
+        return f'<c t="inlineStr"{style_attr}><is><t xml:space="preserve">{_text(value)}</t></is></c>'
+    if value is None:
+        return "<c/>"
+    if kind is bool:
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if kind is int or kind is float:
+        return f"<c><v>{value}</v></c>"
+    if kind is datetime.datetime:
+        serial = (_local(value) - _EXCEL_EPOCH).total_seconds() / 86400
+        return f'<c s="2"><v>{serial:.6f}</v></c>'
+    if kind is datetime.date:
+        serial = (value - _EXCEL_EPOCH.date()).days
+        return f'<c s="1"><v>{serial}</v></c>'
+    return _xlsx_cell(str(value), style)
+
+
+def _xlsx_row(values, style=0):
+    return ("<row>" + "".join(_xlsx_cell(value, style) for value in values) + "</row>").encode()
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object that hands zipfile's output back in pieces."""
+
+    def __init__(self):
+        self.pieces = []
+
+    def write(self, data):
+        self.pieces.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.pieces)
+        self.pieces.clear()
+        return data
+
+
+def stream_xlsx(header, rows, sheet_name="Sheet1"):
+    """A single-sheet .xlsx workbook as byte chunks; dates and datetimes are real Excel dates."""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _WORKBOOK.format(name=_text(sheet_name[:31])))
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        archive.writestr("xl/styles.xml", _STYLES)
+        yield sink.drain()
+
+        # force_zip64: the sheet's final size isn't known up front
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(_SHEET_START.encode() + _xlsx_row(header, style=3))
+            for chunk in _chunked(_xlsx_row(row) for row in rows):
+                sheet.write(chunk)
+                if sink.pieces:
+                    yield sink.drain()
+            sheet.write(_SHEET_END.encode())
+    yield sink.drain()
+
+
+# ---- Reading ----
+_NS = {
+    "main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+_R_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+_CELL_REF = re.compile(r"([A-Z]{1,3})[0-9]+")
+# Excel's sheet size; a larger row or column index means a malformed file
+XLSX_MAX_ROW = 1_048_576
+XLSX_MAX_COLUMN = 16_384
+
+
+class TooManyRows(ValueError):
+    """The file has more non-blank rows than the reader's ``max_rows``."""
+
+
+def excel_date(serial):
+    """Excel's day number (as stored in an unformatted cell) to a date."""
+    return (_EXCEL_EPOCH + datetime.timedelta(days=float(serial))).date()
+
+
+def _is_blank(cells):
+    return all(cell is None or (isinstance(cell, str) and not cell.strip()) for cell in cells)
+
+
+def _collect(numbered_rows, max_rows):
+    """The non-blank (number, cells) pairs; raises TooManyRows as soon as there are more than ``max_rows``."""
+    rows = []
+    for number, cells in numbered_rows:
+        if _is_blank(cells):
+            continue
+        if max_rows is not None and len(rows) >= max_rows:
+            raise TooManyRows(f"More than {max_rows} rows.")
+        rows.append((number, cells))
+    return rows
+
+
+def read_csv(data, max_rows=None, max_columns=XLSX_MAX_COLUMN):
+    """
+    Non-blank rows of an uploaded CSV (bytes) as (row number, strings);
+    UTF-8 with or without BOM, else Windows-1252.
+    """
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        text = data.decode("cp1252", errors="replace")
+    try:
+        reader = csv.reader(io.StringIO(text, newline=""))
+        return _collect(((number, row[:max_columns]) for number, row in enumerate(reader, start=1)), max_rows)
+    except csv.Error as e:
+        raise ValueError(f"Not a readable .csv file: {e}") from e
+
+
+def _column_index(ref):
+    index = 0
+    for letter in _CELL_REF.fullmatch(ref).group(1):
+        index = index * 26 + ord(letter) - 64
+    if index > XLSX_MAX_COLUMN:
+        raise ValueError(f"cell reference {ref} is outside the sheet")
+    return index - 1
+
+
+def _cell_value(cell, shared_strings):
+    kind = cell.get("t", "n")
+    if kind == "inlineStr":
+        return "".join(node.text or "" for node in cell.iterfind(".//main:t", _NS))
+    raw = cell.findtext("main:v", namespaces=_NS)
+    if raw is None:
+        return None
+    if kind == "s":
+        return shared_strings[int(raw)]
+    if kind == "b":
+        return raw == "1"
+    if kind in ("str", "e"):
+        return raw
+    number = float(raw)
+    return int(number) if number.is_integer() else number
+
+
+def _sheet_rows(sheet, shared_strings, max_columns):
+    """(row number, values) for each row stored in a worksheet part."""
+    previous = 0
+    for _, element in ElementTree.iterparse(sheet):
+        if element.tag != f"{{{_NS['main']}}}row":
+            continue
+        # Blank rows aren't stored, so numbers can skip ahead - but never back
+        number = int(element.get("r") or previous + 1)
+        if not previous < number <= XLSX_MAX_ROW:
+            raise ValueError(f"row number {number} is out of order or outside the sheet")
+        previous = number
+        row = []
+        for position, cell in enumerate(element.iterfind("main:c", _NS)):
+            ref = cell.get("r")
+            index = _column_index(ref) if ref else position
+            if index >= max_columns:
+                continue
+            row.extend([None] * (index - len(row)))
+            row.append(_cell_value(cell, shared_strings))
+        element.clear()
+        yield number, row
+
+
+def read_xlsx(data, max_rows=None, max_columns=XLSX_MAX_COLUMN):
+    """
+    Non-blank rows of the first worksheet of an uploaded .xlsx (bytes) as
+    (row number, values), values being str/int/float/bool/None. Dates come
+    back as Excel day numbers - the caller knows which columns hold dates
+    (see excel_date()). Raises TooManyRows past ``max_rows`` and
+    ValueError if the file isn't a readable workbook.
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        first_sheet = workbook.find("main:sheets/main:sheet", _NS)
+        relations = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+        target = next(
+            rel.get("Target") for rel in relations.iterfind("rel:Relationship", _NS)
+            if rel.get("Id") == first_sheet.get(_R_ID)
+        )
+        sheet_path = target.lstrip("/") if target.startswith("/") else "xl/" + target
+
+        shared_strings = []
+        if "xl/sharedStrings.xml" in archive.namelist():
+            strings = ElementTree.fromstring(archive.read("xl/sharedStrings.xml"))
+            shared_strings = [
+                "".join(node.text or "" for node in item.iterfind(".//main:t", _NS))
+                for item in strings.iterfind("main:si", _NS)
+            ]
+
+        with archive.open(sheet_path) as sheet:
+            return _collect(_sheet_rows(sheet, shared_strings, max_columns), max_rows)
+    except TooManyRows:
+        raise
+    except (zipfile.BadZipFile, KeyError, StopIteration, AttributeError, IndexError,
+            ElementTree.ParseError, ValueError) as e:
+        raise ValueError(f"Not a readable .xlsx workbook: {e}") from e
@@ -0,0 +1,154 @@
+# hammer_backendapi/views/utils/summary_html.py
+"""
+Single-pass processing of AI summary HTML
+-----------------------------------------
+The prompt only allows a small tag set (<p>, <h2>, <ul>, <li>, plus inline
+<strong>/<em>). Instead of a chain of regex passes, one streaming tokenizer
+walks the HTML once and at the same time:
+
+- normalises it: one <li> per line, blank line before each <h2>, two spaces
+  after a sentence-ending period in <p> text, no runs of 3+ spaces
+- measures it and records where the trimming cut points are
+  (every <h2>, and every ".</p>" when there are no sections)
+- collects PDF-ready (kind, text) blocks for the PDF renderers
+
+Output matches the previous _clean_html_formatting + _validate_content_length
+chain (see the benchmark_summary_html management command).
+"""
+
+import re
+from html import unescape
+from typing import List, NamedTuple, Optional, Tuple
+
+_TOKEN_RE = re.compile(r"<!--.*?-->|<(/?)([a-zA-Z][a-zA-Z0-9]*)\b[^>]*>|[^<]+|<", re.DOTALL)
+_PERIOD_RE = re.compile(r"\.(?=[A-Z])")
+_SPACES_RE = re.compile(r"  +")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Exact adjacent tag pairs and the whitespace inserted between them
+_PAIR_BREAKS = {
+    ("</li>", "<li>"): "\n",
+    ("<ul>", "<li>"): "\n",
+    ("</li>", "</ul>"): "\n",
+    ("</p>", "<h2>"): "\n\n",
+    ("</h2>", "<p>"): "\n",
+    ("</ul>", "<h2>"): "\n\n",
+}
+BLOCK_KINDS = {"p": "paragraph", "h1": "heading", "h2": "heading", "h3": "heading", "li": "bullet"}
+_SKIP_TAGS = {"head", "style", "script", "title"}
+
+Block = Tuple[str, str]  # ("heading" | "paragraph" | "bullet", plain text)
+
+
+class ProcessedSummary(NamedTuple):
+    html: str
+    blocks: List[Block]
+    length: int
+    trimmed: bool
+
+
+def process_summary_html(html: str, max_length: Optional[int] = None, trim_to: int = 4200) -> ProcessedSummary:
+    """
+    Normalise, measure and split summary HTML in one pass.
+
+    If max_length is given and the normalised HTML is longer, it is cut at
+    the last section (<h2>) boundary, keeping the intro plus at most three
+    sections, that stays under trim_to characters. Without sections it is
+    cut at the last ".</p>" under trim_to.
+    """
+    out = []          # normalised output pieces
+    pos = 0           # length of output so far
+    section_starts = []
+    sentence_ends = []
+    blocks = []       # (kind, text, end offset)
+
+    prev_raw = None   # previous token, only kept while tags are adjacent
+    prev_text_ends_with_period = False
+    in_p = False
+    skip_depth = 0
+    block_kind = None
+    block_tag = None
+    block_text = []
+
+    for match in _TOKEN_RE.finditer(html or ""):
+        raw = match.group(0)
+        name = match.group(2)
+
+        if name is None:
+            # Text (or a stray "<" / comment)
+            if raw.startswith("<!--"):
+                prev_raw = None
+                out.append(raw)
+                pos += len(raw)
+                continue
+            text = raw
+            if in_p:
+                text = _PERIOD_RE.sub(".  ", text)
+            text = _SPACES_RE.sub("  ", text)
+            out.append(text)
+            pos += len(text)
+            if block_kind and not skip_depth:
+                block_text.append(text)
+            prev_raw = None
+            prev_text_ends_with_period = text.endswith(".")
+            continue
+
+        closing = match.group(1) == "/"
+        tag = name.lower()
+
+        separator = _PAIR_BREAKS.get((prev_raw, raw))
+        if separator:
+            out.append(separator)
+            pos += len(separator)
+
+        if raw == "<h2>":
+            section_starts.append(pos)
+        out.append(raw)
+        pos += len(raw)
+
+        if raw == "</p>" and prev_raw is None and prev_text_ends_with_period:
+            sentence_ends.append(pos)
+        if raw == "<p>":
+            in_p = True
+        elif raw == "</p>":
+            in_p = False
+
+        if tag in _SKIP_TAGS:
+            skip_depth += -1 if closing else 1
+            skip_depth = max(skip_depth, 0)
+        elif tag in BLOCK_KINDS and not skip_depth:
+            if not closing and block_kind is None:
+                block_kind, block_tag, block_text = BLOCK_KINDS[tag], tag, []
+            elif closing and tag == block_tag:
+                text = unescape(_WHITESPACE_RE.sub(" ", "".join(block_text))).strip()
+                if text:
+                    blocks.append((block_kind, text, pos))
+                block_kind = block_tag = None
+
+        prev_raw = raw
+        prev_text_ends_with_period = False
+
+    result = "".join(out)
+    stripped = result.strip()
+    shift = len(result) - len(result.lstrip())
+    length = len(stripped)
+
+    cut = None
+    if max_length is not None and length > max_length:
+        if section_starts:
+            boundaries = [s - shift for s in section_starts] + [length]
+            cut = boundaries[0]
+            for end in boundaries[1:4]:
+                if end >= trim_to:
+                    break
+                cut = end
+        else:
+            cut = 0
+            for end in sentence_ends:
+                if end - shift >= trim_to:
+                    break
+                cut = end - shift
+        stripped = stripped[:cut]
+
+    kept = [(kind, text) for kind, text, end in blocks if cut is None or end - shift <= cut]
+    return ProcessedSummary(stripped, kept, len(stripped), cut is not None)
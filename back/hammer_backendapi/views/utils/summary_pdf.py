@@ -0,0 +1,139 @@
+# hammer_backendapi/views/utils/summary_pdf.py
+"""
+Personality summary PDF rendering (ReportLab)
+---------------------------------------------
+Clean, minimal single-page design (matches the Cameron Hall PDF).
+
+- Paragraph styles are built once per process, not on every render.
+- The summary HTML uses a small fixed structure (<p>, <h2>, <ul><li>), which
+  is parsed once (summary_html.py) into a list of (kind, text) blocks.
+  Blocks are cached by content hash in Django's cache next to the summary
+  itself, so re-rendering a stored summary skips parsing and style setup.
+"""
+
+import hashlib
+from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
+from typing import List
+
+from django.core.cache import cache
+
+from hammer_backendapi import metrics
+from hammer_backendapi.cache import namespaced_key
+
+from .summary_html import Block, process_summary_html
+
+BLOCKS_CACHE_TTL = 60 * 60 * 24 * 7  # a week; blocks only change if the HTML does
+
+
+def _import_reportlab():
+    try:
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Paragraph
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.colors import HexColor
+    except ImportError as e:
+        raise Exception(f"ReportLab not available: {e}")
+    return letter, SimpleDocTemplate, Paragraph, getSampleStyleSheet, ParagraphStyle, HexColor
+
+
+@lru_cache(maxsize=1)
+def summary_styles() -> dict:
+    """Build the summary paragraph styles once per process."""
+    _, _, _, getSampleStyleSheet, ParagraphStyle, HexColor = _import_reportlab()
+
+    # Simple, clean colors - minimal palette
+    dark_text = HexColor('#1a202c')      # Rich dark gray
+    light_text = HexColor('#718096')     # Light gray for dates
+    section_text = HexColor('#2c5282')   # Subtle blue for headings
+
+    styles = getSampleStyleSheet()
+
+    return {
+        "title": ParagraphStyle(
+            'CleanTitle', parent=styles['Heading1'], fontSize=18, spaceAfter=6, spaceBefore=0,
+            alignment=1, textColor=dark_text, fontName='Helvetica-Bold',
+        ),
+        "name": ParagraphStyle(
+            'CleanName', parent=styles['Heading2'], fontSize=15, spaceAfter=4, spaceBefore=2,
+            alignment=1, textColor=section_text, fontName='Helvetica-Bold',
+        ),
+        "date": ParagraphStyle(
+            'CleanDate', parent=styles['Normal'], fontSize=10, spaceAfter=18,
+            alignment=1, textColor=light_text, fontName='Helvetica-Oblique',
+        ),
+        "heading": ParagraphStyle(
+            'CleanSection', parent=styles['Heading3'], fontSize=12, spaceAfter=5, spaceBefore=12,
+            textColor=section_text, fontName='Helvetica-Bold', leftIndent=0,
+        ),
+        "paragraph": ParagraphStyle(
+            'CleanBody', parent=styles['Normal'], fontSize=10, spaceAfter=4, spaceBefore=1,
+            alignment=0, textColor=dark_text, fontName='Helvetica', leftIndent=0, rightIndent=0, leading=12,
+        ),
+        "bullet": ParagraphStyle(
+            'CleanBullet', parent=styles['Normal'], fontSize=10, spaceAfter=3,
+            alignment=0, textColor=dark_text, fontName='Helvetica', leftIndent=15, leading=12,
+        ),
+    }
+
+
+def parse_summary_blocks(html_content: str) -> List[Block]:
+    """Turn the summary HTML into ("heading" | "paragraph" | "bullet", text) blocks."""
+    return process_summary_html(html_content).blocks
+
+
+def _blocks_cache_key(html_content: str) -> str:
+    # Namespaced, so bump_namespace("summary_blocks") drops blocks from an older parser
+    return namespaced_key("summary_blocks", hashlib.sha256(html_content.encode("utf-8")).hexdigest())
+
+
+def cache_summary_blocks(html_content: str, blocks: List[Block]):
+    """Store blocks already produced while processing a new summary."""
+    cache.set(_blocks_cache_key(html_content), blocks, BLOCKS_CACHE_TTL)
+
+
+def summary_blocks(html_content: str) -> List[Block]:
+    """Cached parse_summary_blocks, keyed by the summary's content hash."""
+    key = _blocks_cache_key(html_content)
+    blocks = cache.get(key)
+    metrics.record_cache("summary_blocks", blocks is not None)
+    if blocks is None:
+        blocks = parse_summary_blocks(html_content)
+        cache.set(key, blocks, BLOCKS_CACHE_TTL)
+    return blocks
+
+
+def render_summary_pdf(html_content: str, student_name: str, blocks: List[Block] = None) -> bytes:
+    """Render a personality summary to single-page PDF bytes."""
+    letter, SimpleDocTemplate, Paragraph, _, _, _ = _import_reportlab()
+    styles = summary_styles()
+    if blocks is None:
+        blocks = summary_blocks(html_content)
+
+    buffer = BytesIO()
+
+    # Create PDF document with minimal margins for maximum content space
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        rightMargin=40,
+        leftMargin=40,
+        topMargin=30,
+        bottomMargin=30
+    )
+
+    # Simple, clean header
+    story = [
+        Paragraph("Personality Summary", styles["title"]),
+        Paragraph(student_name, styles["name"]),
+        Paragraph(datetime.now().strftime('%B %d, %Y'), styles["date"]),
+    ]
+
+    for kind, text in blocks:
+        if kind == "bullet":
+            text = f"• {text}"
+        story.append(Paragraph(text, styles[kind]))
+
+    doc.build(story)
+    return buffer.getvalue()
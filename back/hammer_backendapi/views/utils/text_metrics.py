@@ -0,0 +1,77 @@
+# hammer_backendapi/views/utils/text_metrics.py
+"""
+Text metrics for certificate field alignment
+--------------------------------------------
+Certificates only use PyMuPDF's built-in fonts (helv, at a handful of sizes),
+so glyph advances are looked up once per (font, size) and memoised. Widths
+are then plain table sums, which lets a batch run (a whole class of names)
+compute every alignment without calling into MuPDF per string.
+
+Advances are measured one glyph at a time, which also gives correct widths
+for accented Latin-1 names (MuPDF's whole-string measure miscounts them).
+"""
+
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+import fitz  # PyMuPDF
+
+_TABLE_SIZE = 256  # Latin-1 covers every name we print
+
+
+@lru_cache(maxsize=None)
+def _unit_advance(fontname: str, char: str) -> float:
+    """Advance of a single glyph at fontsize 1 (used outside the table range)."""
+    return fitz.get_text_length(char, fontname=fontname, fontsize=1)
+
+
+@lru_cache(maxsize=64)
+def advance_table(fontname: str, fontsize: float) -> Tuple[float, ...]:
+    """Glyph advances for code points 0-255 at the given font and size."""
+    return tuple(_unit_advance(fontname, chr(code)) * fontsize for code in range(_TABLE_SIZE))
+
+
+def text_length(text: str, fontname: str = "helv", fontsize: float = 14) -> float:
+    """Drop-in replacement for fitz.get_text_length backed by the memoised table."""
+    table = advance_table(fontname, fontsize)
+    width = 0.0
+    for char in text:
+        code = ord(char)
+        width += table[code] if code < _TABLE_SIZE else _unit_advance(fontname, char) * fontsize
+    return width
+
+
+def text_lengths(texts: Iterable[str], fontname: str = "helv", fontsize: float = 14) -> List[float]:
+    """Widths for a batch of strings sharing one font and size."""
+    table = advance_table(fontname, fontsize)
+    widths = []
+    for text in texts:
+        try:
+            # Fast path: one table lookup per byte for Latin-1 text
+            widths.append(sum(map(table.__getitem__, text.encode("latin-1"))))
+        except UnicodeEncodeError:
+            widths.append(text_length(text, fontname, fontsize))
+    return widths
+
+
+def aligned_x(x: float, text: str, align: str = "left", fontname: str = "helv", fontsize: float = 14) -> float:
+    """Shift an anchor x-coordinate so ``text`` is left, center or right aligned on it."""
+    align = (align or "left").lower()
+    if align == "left":
+        return x
+    width = text_length(text, fontname, fontsize)
+    if align == "center":
+        return x - width / 2.0
+    if align == "right":
+        return x - width
+    return x
+
+
+def aligned_xs(x: float, texts: Iterable[str], align: str = "left", fontname: str = "helv", fontsize: float = 14) -> List[float]:
+    """Batch version of aligned_x for many strings drawn at the same anchor."""
+    texts = list(texts)
+    align = (align or "left").lower()
+    if align not in ("center", "right"):
+        return [x] * len(texts)
+    factor = 0.5 if align == "center" else 1.0
+    return [x - width * factor for width in text_lengths(texts, fontname, fontsize)]
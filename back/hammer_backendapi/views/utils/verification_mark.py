@@ -0,0 +1,68 @@
+# hammer_backendapi/views/utils/verification_mark.py
+"""
+Verification mark
+-----------------
+The signed verification link of a certificate page (see
+hammer_backendapi/verification.py), drawn in the bottom-right corner where
+the registry's "verification" block places it. It has three parts:
+
+- a QR code drawn as vector rectangles (one per run of dark modules), not
+  a raster image, so it stays sharp and small;
+- a clickable link over the QR code;
+- the URL itself in small print for anyone typing it in.
+"""
+
+import fitz  # PyMuPDF
+
+from .certificate_layouts import get_registry
+from .text_metrics import aligned_x
+
+QUIET_ZONE = 2  # modules of white around the code
+
+
+def qr_matrix(data):
+    import qrcode  # deferred with the rest of the render path
+
+    qr = qrcode.QRCode(border=0, error_correction=qrcode.constants.ERROR_CORRECT_M)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+def draw_verification_mark(page, url):
+    spec = get_registry()["verification"]
+    matrix = qr_matrix(url)
+    size, margin = spec["size"], spec["margin"]
+    cell = size / len(matrix)
+    left = page.rect.width - margin - size
+    top = page.rect.height - margin - size
+
+    shape = page.new_shape()
+    pad = QUIET_ZONE * cell
+    shape.draw_rect(fitz.Rect(left - pad, top - pad, left + size + pad, top + size + pad))
+    shape.finish(color=None, fill=(1, 1, 1), width=0)
+    for row, modules in enumerate(matrix):
+        col = 0
+        while col < len(modules):
+            if not modules[col]:
+                col += 1
+                continue
+            start = col
+            while col < len(modules) and modules[col]:
+                col += 1
+            shape.draw_rect(fitz.Rect(left + start * cell, top + row * cell, left + col * cell, top + (row + 1) * cell))
+    shape.finish(color=None, fill=(0, 0, 0), width=0)
+    shape.commit()
+    page.insert_link({"kind": fitz.LINK_URI, "from": fitz.Rect(left, top, left + size, top + size), "uri": url})
+
+    # Caption and URL, right-aligned against the code's left edge
+    fontsize = spec["fontsize"]
+    right = left - pad - 2
+    for text, y in ((spec["caption"], top + size - fontsize * 1.4), (url, top + size)):
+        page.insert_text(
+            (aligned_x(right, text, "right", "helv", fontsize), y),
+            text,
+            fontsize=fontsize,
+            color=spec["color"],
+            fontname="helv",
+        )
@@ -0,0 +1,76 @@
+# hammer_backendapi/views/verification.py
+"""
+Certificate verification
+------------------------
+GET /api/certificates/verify/<token>/ is public. Employers reach it by
+scanning the QR code on a certificate or typing in its link. The answer
+comes from the token's HMAC alone (hammer_backendapi/verification.py):
+no database query, no session and no authentication. It never changes for
+a given token, so a valid result is sent as
+"Cache-Control: public, immutable" and any proxy or CDN in front can
+serve repeats. Browsers get an HTML page, API clients get JSON.
+"""
+
+from django.core.signing import BadSignature
+from django.http import HttpResponse, JsonResponse
+from django.template.loader import render_to_string
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_GET
+
+from hammer_backendapi import verification
+from hammer_backendapi.views.utils.certificate_layouts import UnknownCertificateKind, get_layout
+
+VALID_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Short: a token can start verifying once its key is added to the fallbacks
+INVALID_CACHE_CONTROL = "public, max-age=300"
+
+FIELD_LABELS = {
+    "full_name": "Name",
+    "end_date": "Completed",
+    "osha_completion_date": "OSHA completion date",
+    "disc": "DISC",
+    "sixteen": "16 Types",
+    "enneagram": "Enneagram",
+}
+
+
+def _title(kind):
+    try:
+        return get_layout(kind)["title"]
+    except UnknownCertificateKind:
+        return kind
+
+
+def _page_rows(claims):
+    if claims["fields"] is None:
+        return [(None, value) for value in claims["values"]]
+    return [(FIELD_LABELS.get(name, name.replace("_", " ").capitalize()), value) for name, value in claims["fields"].items()]
+
+
+@require_GET
+def verify_certificate(request, token):
+    try:
+        claims = verification.unsign(token)
+    except BadSignature as e:
+        claims, data, status = None, {"valid": False, "error": str(e)}, 404
+    else:
+        data = {
+            "valid": True,
+            "certificates": [_title(kind) for kind in claims["kinds"]],
+            "kinds": claims["kinds"],
+            "issued_on": claims["issued_on"].isoformat(),
+            "fields": claims["fields"],
+            "values": claims["values"],
+        }
+        status = 200
+
+    if "text/html" in request.headers.get("Accept", ""):
+        context = dict(data)
+        if claims is not None:
+            context.update(issued_on=claims["issued_on"], rows=_page_rows(claims))
+        response = HttpResponse(render_to_string("certificate_verification.html", context), status=status)
+    else:
+        response = JsonResponse(data, status=status)
+    response["Cache-Control"] = VALID_CACHE_CONTROL if claims is not None else INVALID_CACHE_CONTROL
+    patch_vary_headers(response, ["Accept"])
+    return response
@@ -0,0 +1,97 @@
+# hammer_backendapi/warmup.py
+"""
+Worker warm-up
+--------------
+gunicorn.conf.py preloads the app and calls warm_up() once in the master,
+so every forked worker starts with the certificate template bases, layout
+registry, glyph tables, summary styles, the openai package and the lookup
+options already in memory (shared copy-on-write). Without preload_app it
+runs in each worker before it accepts requests.
+
+reset_after_fork() drops anything that must not be shared between
+processes (DB connections, the OpenAI HTTP client). warm_worker() then
+starts the worker's own PDF render pool (render_pool.warm()), which can't
+be inherited: its processes belong to the worker that started them. The
+/ready/ probe reports 503 until warm-up has finished in the serving process.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_state = {"ready": False, "started": False, "seconds": None, "errors": []}
+
+
+def _step(name, fn):
+    try:
+        fn()
+    except Exception as e:
+        # A missing template or DB must not stop the worker from booting
+        logger.warning("Warm-up step %s failed: %s", name, e)
+        _state["errors"].append(f"{name}: {e}")
+
+
+def _render_caches():
+    from hammer_backendapi.views.utils.render_pool import TEMPLATE_PATH, _preload
+    _preload(TEMPLATE_PATH)
+
+
+def _openai():
+    import openai  # noqa: F401 - the import is the expensive part; the client is per process
+
+
+def _lookups():
+    from hammer_backendapi.lookups import lookup_options
+    lookup_options()
+
+
+def warm_up():
+    """Load shared caches once; safe to call repeatedly."""
+    with _lock:
+        if _state["started"]:
+            return
+        _state["started"] = True
+
+    started = time.perf_counter()
+    _step("render caches", _render_caches)
+    _step("openai", _openai)
+    _step("lookup options", _lookups)
+
+    from django.db import connections
+    connections.close_all()  # never hand a master DB connection to forked workers
+
+    _state["seconds"] = round(time.perf_counter() - started, 3)
+    _state["ready"] = True
+    logger.info("Warm-up finished in %.2fs", _state["seconds"])
+
+
+def warm_up_in_background():
+    """Used by the readiness probe when nothing warmed this process (e.g. runserver)."""
+    if not _state["started"]:
+        threading.Thread(target=warm_up, daemon=True).start()
+
+
+def reset_after_fork():
+    """Drop per-process resources inherited from the gunicorn master."""
+    from django.db import connections
+    connections.close_all()
+
+    from hammer_backendapi.views import ai_summary_fixed
+    ai_summary_fixed.client = None
+
+
+def warm_worker():
+    """Per-worker warm-up, after the fork: spawn the render pool's processes now, not on the first request."""
+    from hammer_backendapi.views.utils import render_pool
+    _step("render pool", render_pool.warm)
+
+
+def readiness() -> dict:
+    return {
+        "ready": _state["ready"],
+        "warmup_seconds": _state["seconds"],
+        "warmup_errors": list(_state["errors"]),
+    }
@@ -2,6 +2,8 @@
 ASGI config for hammer_backendproject project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Served by gunicorn with uvicorn workers when SERVER_INTERFACE=asgi (see
+gunicorn.conf.py).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
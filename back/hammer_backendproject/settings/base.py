@@ -5,7 +5,7 @@ This contains all the common settings shared across environments.
 Environment-specific settings inherit from this.
 """
 
-from decouple import config
+from decouple import Csv, config
 from pathlib import Path
 import os
 import dj_database_url
@@ -47,16 +47,17 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Compact orjson output; indentation and the browsable API are development-only
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
+        'hammer_backendapi.renderers.ORJSONRenderer',
     ],
-    'JSON_INDENT': 2,
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 50
 }
 
 MIDDLEWARE = [
+    'hammer_backendapi.middleware.MetricsMiddleware',
+    'hammer_backendapi.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -64,6 +65,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'hammer_backendapi.middleware.ProfilingMiddleware',
+    'hammer_backendapi.middleware.QueryInspectorMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -87,6 +90,13 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'hammer_backendproject.wsgi.application'
+ASGI_APPLICATION = 'hammer_backendproject.asgi.application'
+
+# 'wsgi' (gunicorn sync workers) or 'asgi' (gunicorn + uvicorn workers, see
+# gunicorn.conf.py); the AI summary and file download views are async.
+# Persistent DB connections are only used under WSGI.
+SERVER_INTERFACE = config('SERVER_INTERFACE', default='wsgi').lower()
+DB_CONN_MAX_AGE = 0 if SERVER_INTERFACE == 'asgi' else 600
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -133,16 +143,122 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100MB for all file types
 STUDENT_FILE_MAX_SIZE = 100 * 1024 * 1024  # 100MB
 STUDENT_FILE_ALLOWED_TYPES = ['*']  # All file types allowed (except dangerous ones)
 
+# Certificate rendering: keep master template pages as shared Form XObjects so
+# each certificate only adds a small text overlay
+CERTIFICATE_TEMPLATE_XOBJECTS = config('CERTIFICATE_TEMPLATE_XOBJECTS', default=True, cast=bool)
+
+# Certificate layout registry (page, fields, fonts and colours per certificate kind).
+# Defaults to hammer_backendapi/views/utils/certificate_layouts.json
+CERTIFICATE_LAYOUTS_PATH = config('CERTIFICATE_LAYOUTS_PATH', default='') or None
+
+# PDF render pool: 0 renders inline in the request thread, N > 0 uses a warm
+# pool of N worker processes. At most WORKERS + MAX_QUEUE renders are admitted;
+# callers wait up to QUEUE_TIMEOUT seconds for a slot before getting a 503.
+# A render still running after TIMEOUT fails the request but keeps its slot
+# until it finishes.
+PDF_RENDER_WORKERS = config('PDF_RENDER_WORKERS', default=0, cast=int)
+PDF_RENDER_MAX_QUEUE = config('PDF_RENDER_MAX_QUEUE', default=8, cast=int)
+PDF_RENDER_QUEUE_TIMEOUT = config('PDF_RENDER_QUEUE_TIMEOUT', default=10, cast=float)
+PDF_RENDER_TIMEOUT = config('PDF_RENDER_TIMEOUT', default=60, cast=float)
+
+# Issued certificates are stored once in the default storage; on S3 downloads
+# are presigned URLs valid for this many seconds
+ISSUED_CERTIFICATE_URL_TTL = config('ISSUED_CERTIFICATE_URL_TTL', default=3600, cast=int)
+
+# Certificate verification (hammer_backendapi/verification.py): every page
+# of an issued certificate gets a QR code/link to VERIFY_URL/<token>/,
+# HMAC-signed with SIGNING_KEY (SECRET_KEY when unset). Retired keys go in
+# SIGNING_FALLBACK_KEYS (comma separated) so certificates already printed
+# keep verifying.
+CERTIFICATE_VERIFY_URL = config('CERTIFICATE_VERIFY_URL', default='http://localhost:8000/api/certificates/verify/')
+CERTIFICATE_SIGNING_KEY = config('CERTIFICATE_SIGNING_KEY', default='') or None
+CERTIFICATE_SIGNING_FALLBACK_KEYS = config('CERTIFICATE_SIGNING_FALLBACK_KEYS', default='', cast=Csv())
+
+# Prometheus metrics at /metrics; scrapers must send
+# 'Authorization: Bearer <METRICS_TOKEN>'. Without a token the endpoint is
+# refused (403) unless DEBUG is on.
+METRICS_TOKEN = config('METRICS_TOKEN', default='') or None
+
+# Per-request profiling (ProfilingMiddleware). Staff trigger it with
+# 'X-Profile: 1' or '?profile=1'; SAMPLE_RATE profiles a fraction of all
+# requests. Listed in the admin at /admin/profiles/.
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_DIR = config('PROFILING_DIR', default=str(BASE_DIR / 'profiles'))
+PROFILING_KEEP = config('PROFILING_KEEP', default=200, cast=int)
+
+# N+1 / slow-query detector (QueryInspectorMiddleware), on in development.
+# A query shape repeated REPEAT_THRESHOLD+ times in one request is reported
+# as a likely N+1; read the log with `python manage.py query_report`.
+QUERY_INSPECTOR_ENABLED = config('QUERY_INSPECTOR_ENABLED', default=False, cast=bool)
+QUERY_INSPECTOR_REPEAT_THRESHOLD = config('QUERY_INSPECTOR_REPEAT_THRESHOLD', default=5, cast=int)
+QUERY_INSPECTOR_SLOW_MS = config('QUERY_INSPECTOR_SLOW_MS', default=100, cast=float)
+QUERY_INSPECTOR_LOG = config('QUERY_INSPECTOR_LOG', default=str(BASE_DIR / 'logs' / 'query_inspector.jsonl'))
+
+# Request coalescing (hammer_backendapi/singleflight.py): identical concurrent
+# renders / AI summaries run once; a repeated Idempotency-Key header from the
+# same user returns the stored result for IDEMPOTENCY_TTL seconds (422 when
+# the key comes back with a different payload).
+IDEMPOTENCY_TTL = config('IDEMPOTENCY_TTL', default=600, cast=int)
+SINGLE_FLIGHT_WAIT = config('SINGLE_FLIGHT_WAIT', default=90, cast=float)
+SINGLE_FLIGHT_LOCK_TIMEOUT = config('SINGLE_FLIGHT_LOCK_TIMEOUT', default=120, cast=int)
+
+# Admin changelists for teachers/students/files (hammer_backendapi/admin.py):
+# filtered row counts are cached for ADMIN_COUNT_CACHE_TTL seconds, and an
+# unfiltered PostgreSQL table above ADMIN_ESTIMATED_COUNT_ABOVE rows shows
+# the planner's estimate instead of running COUNT(*).
+ADMIN_COUNT_CACHE_TTL = config('ADMIN_COUNT_CACHE_TTL', default=60, cast=int)
+ADMIN_ESTIMATED_COUNT_ABOVE = config('ADMIN_ESTIMATED_COUNT_ABOVE', default=100000, cast=int)
+
+# Bulk roster import (hammer_backendapi/roster_import.py): largest file, in
+# student rows, that POST /api/students/import/ accepts
+ROSTER_IMPORT_MAX_ROWS = config('ROSTER_IMPORT_MAX_ROWS', default=5000, cast=int)
+
+# Worker cold start: `python manage.py import_report --check` fails if start-up
+# imports take longer than the budget or pull in a library that must stay lazy
+STARTUP_IMPORT_BUDGET_MS = config('STARTUP_IMPORT_BUDGET_MS', default=800, cast=int)
+STARTUP_DEFERRED_MODULES = ['fitz', 'reportlab', 'openai', 'boto3', 'botocore', 'borb']
+
 # Session Settings
 SESSION_COOKIE_AGE = 86400  # 24 hours
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 
 # Cache Configuration (default - can be overridden in environment-specific settings)
+# 'shared' is seen by every worker: Redis when REDIS_URL is set, otherwise a
+# file cache (shared by the workers on one host). 'default' puts a small
+# in-process L1 in front of it (hammer_backendapi/cache.py); values larger
+# than CACHE_L1_MAX_VALUE_BYTES skip the L1. The file cache
+# can't lock atomically, so without Redis the stampede protection of
+# get_or_compute() is off and each worker computes its own misses.
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'hammer',
+        'TIMEOUT': 3600,
+    }
+else:
+    SHARED_CACHE = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('CACHE_DIR', default=str(BASE_DIR / 'cache')),
+        'TIMEOUT': 3600,
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
-    }
+        'BACKEND': 'hammer_backendapi.cache.TieredCache',
+        'TIMEOUT': 3600,
+        'OPTIONS': {
+            'SHARED': 'shared',
+            'L1_TTL': config('CACHE_L1_TTL', default=5, cast=float),
+            'L1_MAX_ENTRIES': config('CACHE_L1_MAX_ENTRIES', default=1000, cast=int),
+            'L1_MAX_VALUE_BYTES': config('CACHE_L1_MAX_VALUE_BYTES', default=65536, cast=int),
+        },
+    },
+    'shared': SHARED_CACHE,
 }
 
 # Email Configuration (default - can be overridden in environment-specific settings)
@@ -50,7 +50,7 @@ DATABASE_URL = config('DATABASE_URL', default=None)
 if DATABASE_URL:
     # Use production database (Railway PostgreSQL)
     DATABASES = {
-        'default': dj_database_url.parse(DATABASE_URL, conn_max_age=600)
+        'default': dj_database_url.parse(DATABASE_URL, conn_max_age=DB_CONN_MAX_AGE)
     }
     DATABASES['default'].update({
         'CONN_HEALTH_CHECKS': True,
@@ -190,6 +190,18 @@ CSRF_COOKIE_SECURE = False
 SECURE_BROWSER_XSS_FILTER = False
 SECURE_CONTENT_TYPE_NOSNIFF = False
 
+# Pretty-printed JSON and the browsable API in development only
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': [
+        'hammer_backendapi.renderers.IndentedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Report N+1 queries and slow statements (python manage.py query_report)
+QUERY_INSPECTOR_ENABLED = config('QUERY_INSPECTOR_ENABLED', default=True, cast=bool)
+
 # Email backend for development (console output)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
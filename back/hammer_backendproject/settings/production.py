@@ -61,7 +61,7 @@ def get_database_config():
     if database_url:
         db_config = dj_database_url.parse(database_url)
         db_config.update({
-            'CONN_MAX_AGE': 600,
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
             'CONN_HEALTH_CHECKS': True,
             'OPTIONS': {
                 'connect_timeout': 10,
@@ -165,13 +165,8 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@hammerportfolio.com')
 
-# Production cache configuration (can be enhanced with Redis later)
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
-    }
-}
+# Production cache: shared tier from base.py (set REDIS_URL to use Redis
+# across replicas; otherwise workers on one host share a file cache)
 
 # AWS S3 Configuration for File Storage
 USE_S3 = config('USE_S3', default=True, cast=bool)
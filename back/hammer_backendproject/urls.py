@@ -5,13 +5,18 @@ from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework import routers
 from hammer_backendapi.views import login_user, StudentForeignKeyOptionsView
-from hammer_backendapi.views.students import StudentViewSet
+from hammer_backendapi.views.students import StudentViewSet, personality_summary
 # Import original certificate views
 from hammer_backendapi.views import certificates, generate_all
-from hammer_backendapi.views.health import health_check, api_info
+from hammer_backendapi.views.health import health_check, ready_check, api_info
+from hammer_backendapi.views.metrics import metrics_view
+from hammer_backendapi.views import profiles
 from hammer_backendapi.views.support import support_request
 from hammer_backendapi.views.ai_summary_fixed import generate_ai_summary, test_ai_connection_api, debug_environment
-from hammer_backendapi.views import student_files
+from hammer_backendapi.views import issued_certificates, student_files
+from hammer_backendapi.views.exports import export_students
+from hammer_backendapi.views.analytics import outcome_dashboard
+from hammer_backendapi.views.verification import verify_certificate
 # from hammer_backendapi.views.network_diagnostic import network_diagnostic_view
 # from hammer_backendapi.views.ai_diagnostic import ai_diagnostic
 
@@ -23,6 +28,9 @@ router.register(r"students", StudentViewSet, "student")
 
 # API URLs with /api/ prefix
 api_patterns = [
+    # Async view (was a StudentViewSet action)
+    path('students/<int:pk>/personality-summary/', personality_summary),
+    path('students/export.<str:fmt>', export_students, name='export-students'),  # streaming CSV/XLSX
     path('', include(router.urls)),
     path('login/', login_user),
     path("generate/all/", generate_all.generate_all_certificates),
@@ -32,11 +40,16 @@ api_patterns = [
     path("generate/hammermath/", certificates.generate_hammermath_certificate),
     path("generate/employability/", certificates.generate_employability_certificate),
     path("generate/workforce/", certificates.generate_workforce_certificate),
+    path("generate/<slug:kind>/", certificates.generate_certificate),
+    path("certificates/verify/<str:token>/", verify_certificate, name='verify-certificate'),  # public, DB-free
     path("ai/summary/", generate_ai_summary),
     path("ai/test/", test_ai_connection_api),
     path("ai/debug/", debug_environment),
     path("details/", StudentForeignKeyOptionsView.as_view()),
+    path("analytics/outcomes/", outcome_dashboard),
+    path("analytics/outcomes/<slug:dimension>/", outcome_dashboard),
     path("health/", health_check),
+    path("ready/", ready_check),
     path("info/", api_info),
     path("support/", support_request),
     # Student Files API
@@ -44,15 +57,24 @@ api_patterns = [
     path("students/<int:student_id>/files/upload/", student_files.upload_student_file, name='upload-student-file'),
     path("student-files/<int:file_id>/", student_files.delete_student_file, name='delete-student-file'),
     path("student-files/<int:file_id>/download/", student_files.download_student_file, name='download-student-file'),
+    # Issued certificates (rendered once, kept in storage)
+    path("students/<int:student_id>/certificates/", issued_certificates.list_issued_certificates, name='list-issued-certificates'),
+    path("students/<int:student_id>/certificates/<slug:kind>/", issued_certificates.issue_certificate, name='issue-certificate'),
+    path("issued-certificates/<int:certificate_id>/download/", issued_certificates.download_issued_certificate, name='download-issued-certificate'),
     # path("network-diagnostic/", network_diagnostic_view),
     # path("ai-diagnostic/", ai_diagnostic),
 ]
 
 urlpatterns = [
+    # Request profiles (ProfilingMiddleware) - before admin/ so the admin catch-all doesn't swallow them
+    path('admin/profiles/', admin.site.admin_view(profiles.profile_list), name='admin-profiles'),
+    path('admin/profiles/<str:profile_id>.<str:ext>', admin.site.admin_view(profiles.profile_download), name='admin-profile-download'),
     path('admin/', admin.site.urls),  # Django admin interface - MOVED TO TOP
     path('test-django/', test_view),  # Test if Django routing works at all
     path('api/', include(api_patterns)),
     path('health/', health_check),  # Root health check for load balancers
+    path('ready/', ready_check),  # Readiness probe: 503 until warm-up has finished
+    path('metrics', metrics_view, name='metrics'),  # Prometheus scrape endpoint
     
     # Root URL - restored after fixing routing issue
     path('', api_info, name='api_info'),
@@ -6,4 +6,5 @@ python manage.py migrate --noinput
 
 # Start gunicorn server
 echo "Starting gunicorn on port ${PORT:-8000}..."
-gunicorn hammer_backendproject.wsgi --bind 0.0.0.0:${PORT:-8000} --workers 3 --timeout 120
\ No newline at end of file
+# app (WSGI/ASGI), bind, workers and the preload + warm-up hooks live in gunicorn.conf.py
+gunicorn
\ No newline at end of file